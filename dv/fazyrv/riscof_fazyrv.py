@@ -15,6 +15,11 @@ from riscof.pluginTemplate import pluginTemplate
 
 logger = logging.getLogger()
 
+# Exit code of the testbench when the watchdog detects a hang
+EXIT_HANG = 3
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../script"))
+
 class fazyrv(pluginTemplate):
     __model__ = "fazyrv"
 
@@ -81,6 +86,7 @@ class fazyrv(pluginTemplate):
       rvc = os.environ.get('RISCOF_RVC')
       conf = os.environ.get('RISCOF_CONF')
       rftype = os.environ.get('RISCOF_RFTYPE')
+      prefetch = os.environ.get('RISCOF_PREFETCH', '0')
       
       assert chunksize is not None, "CHUNKSIZE is not set"
       assert rvc is not None, "RVC is not set"
@@ -89,15 +95,31 @@ class fazyrv(pluginTemplate):
 
       # add more utility snippets here
       build_fazyrv = 'fusesoc run --target=verilator_tb --build --work-root=work_simfsoc \
-      fsoc --MEMSIZE=8388608 --CHUNKSIZE={} --RVC={} --CONF={} --RFTYPE={} --BOOTADR={} --DEBUG=1 --SIM=1 --SIGNATURE=1'.format(
+      fsoc --MEMSIZE=8388608 --CHUNKSIZE={} --RVC={} --CONF={} --RFTYPE={} --PREFETCH={} --BOOTADR={} --DEBUG=1 --SIM=1 --SIGNATURE=1 --SPARSE_MEM=1'.format(
         chunksize,
         rvc,
         conf,
         rftype,
+        prefetch,
         0
       )
       utils.shellCommand(build_fazyrv).run()
 
+      # optional: run all tests in this process on the model built as shared library
+      self.inprocess = os.environ.get('RISCOF_INPROCESS') == '1'
+      if self.inprocess:
+        utils.shellCommand(build_fazyrv.replace('verilator_tb', 'verilator_lib')
+                                       .replace('work_simfsoc', 'work_simfsoc_lib')).run()
+        self.lib = os.path.abspath('work_simfsoc_lib/Vfsoc_sim')
+
+      # optional: run the tests packed into the slots of the batch model
+      self.batch = int(os.environ.get('RISCOF_BATCH', '0'))
+      if self.batch:
+        utils.shellCommand(build_fazyrv.replace('verilator_tb', 'verilator_batch')
+                                       .replace('work_simfsoc', 'work_simfsoc_batch')
+                           + f' --NINST={self.batch}').run()
+        self.batch_lib = os.path.abspath('work_simfsoc_batch/Vfsoc_batch')
+
     def build(self, isa_yaml, platform_yaml):
 
       # load the isa yaml as a dictionary in python.
@@ -202,6 +224,8 @@ class fazyrv(pluginTemplate):
 
     def runTests(self, testList):
 
+      batch_jobs = []
+
       # we will iterate over each entry in the testList. Each entry node will be referred to by the
       # variable testname.
       for testname in testList:
@@ -254,7 +278,14 @@ class fazyrv(pluginTemplate):
 
         self.makehex(f"{test_dir}/{fname}.bin", f"{test_dir}/{fname}.hex")
 
-        if self.target_run:
+        if self.target_run and self.batch:
+          batch_jobs.append((f"{test_dir}/{elf}", f"{test_dir}/{fname}.hex"))
+        elif self.target_run and self.inprocess:
+          logger.debug('Executing on fazyrv (in-process)...')
+          self.run_inprocess(f"{test_dir}/{elf}", f"{test_dir}/{fname}.hex",
+                             f"{test_dir}/DUT-fazyrv.signature")
+          logger.debug('done.')
+        elif self.target_run:
           # build the command for running the elf on the DUT. In this case we use spike and indicate
           # the isa arg that we parsed in the build stage, elf filename and signature filename.
           
@@ -265,7 +296,10 @@ class fazyrv(pluginTemplate):
                 f"+signature={test_dir}/DUT-fazyrv.signature",
                 f"+firmware={test_dir}/{fname}.hex"]
 
-          utils.shellCommand(' '.join(sigdump_run)).run()
+          res = subprocess.run(sigdump_run, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+          if res.returncode == EXIT_HANG:
+            hang = [l for l in res.stdout.decode().splitlines() if l.startswith('HANG')]
+            logger.error(f'{testname}: {hang[-1] if hang else "hang detected"}')
           logger.debug('done.')
           #execute = self.dut_exe + ' --isa={0} +signature={1} +signature-granularity=4 {2}'.format(self.isa, sig_file, elf)
 
@@ -276,24 +310,51 @@ class fazyrv(pluginTemplate):
         #postprocess = 'mv {0} temp.sig'.format(sig_file)'
         #utils.shellCommand(postprocess).run(cwd=test_dir)
 
+      if batch_jobs:
+        self.run_batch(batch_jobs)
+
       # if target runs are not required then we simply exit as this point after running all
       # the makefile targets.
       if not self.target_run:
           raise SystemExit
 
 
+    def run_batch(self, tests, max_cycles=10000000):
+      from fsoc_lib import read_hex_bytes, elf_symbols
+      from fsoc_batch import FsocBatch, Job
+
+      jobs = []
+      for elf, hexfile in tests:
+        symbols = elf_symbols(elf)
+        jobs.append(Job(elf, read_hex_bytes(hexfile),
+                        (symbols['begin_signature'], symbols['end_signature'])))
+
+      logger.debug(f'Executing {len(jobs)} tests on {self.batch} fazyrv instances...')
+      with FsocBatch(self.batch_lib) as batch:
+        for job, res in batch.run_queue(jobs, max_cycles):
+          if res['status'] == 'TIMEOUT':
+            logger.error(f'{job.name}: no halt within {max_cycles} cycles')
+            continue
+          with open(os.path.join(os.path.dirname(job.name), 'DUT-fazyrv.signature'), 'w') as f:
+            f.write(res['signature'])
+      logger.debug('done.')
+
+    def run_inprocess(self, elf, hexfile, sig_file, max_cycles=10000000):
+      from fsoc_lib import Fsoc, elf_symbols
+
+      symbols = elf_symbols(elf)
+      with Fsoc(self.lib) as sim:
+        sim.load_hex(hexfile)
+        sim.reset()
+        sim.run(max_cycles)
+        if sim.hang:
+          logger.error(f'{elf}: hang detected')
+        elif not sim.finished:
+          logger.error(f'{elf}: no halt within {max_cycles} cycles')
+        with open(sig_file, 'w') as f:
+          f.write(sim.signature(symbols['begin_signature'], symbols['end_signature']))
+
     def makehex(self, binfile, hexfile):
-      with open(binfile, "rb") as f, open(hexfile, "w") as fout:
-        cnt = 3
-        s = ["00"]*4
-        while True:
-          data = f.read(1)
-          if not data:
-            fout.write(''.join(s)+'\n')
-            return
-          s[cnt] = "{:02X}".format(data[0])
-          if cnt == 0:
-            fout.write(''.join(s)+'\n')
-            s = ["00"]*4
-            cnt = 4
-          cnt -= 1
\ No newline at end of file
+      # sparse image, only the populated ranges of the 8 MiB memory
+      from makehex import makehex
+      makehex(binfile, hexfile)
@@ -10,6 +10,8 @@ import subprocess
 import argparse
 from tqdm import tqdm
 
+from impact import select_checks
+
 def add_args(parser):
     parser.add_argument(
         '--espresso_file',
@@ -60,20 +62,52 @@ def add_args(parser):
         help='Marker to insert the block'
     )
 
+    parser.add_argument(
+        '--no_rvc',
+        dest='rvc',
+        action='store_false',
+        help='Do not select the riscv-formal checks of compressed instructions (riscv-formal is configured as rv32ic)'
+    )
+
+    parser.add_argument(
+        '--simulator',
+        type=str,
+        default="icarus",
+        help='Simulator for the riscv-tests ("icarus", "verilator")'
+    )
+
+    parser.add_argument(
+        '--full_checks',
+        action='store_true',
+        help='Run the full riscv-tests and riscv-formal suites for every candidate'
+    )
+
+    parser.add_argument(
+        '--confirm',
+        action='store_true',
+        help='Run the full suites on the final decoder as confirmation pass'
+    )
+
 riscv_test_logfile = "riscvtests.log"
 
 # necessary but not sufficient, thus run formal check afterwards
-def test_riscv_tests(dir):
+riscv_test_simulator = "icarus"
+
+def test_riscv_tests(dir, tests=None):
     global riscv_test_logfile
     with open(riscv_test_logfile, 'a') as log_file:
-        command = f"make -C {dir} test"
+        command = f"make -C {dir} test_split SIM={riscv_test_simulator}"
+        if tests:
+            command += f" TESTS=\"{' '.join(tests)}\""
         result = subprocess.run(command, shell=True, stdout=log_file, stderr=subprocess.STDOUT)
         return result.returncode == 0
     
-def test_riscv_formal(dir):
+def test_riscv_formal(dir, insns=None):
     global riscv_test_logfile
     with open(riscv_test_logfile, 'a') as log_file:
         command = f"make -C {dir} fv.rvformal.bmc.insn.8"
+        if insns:
+            command += f" RVF_INSN=\"{' '.join(insns)}\""
         result = subprocess.run(command, shell=True, stdout=log_file, stderr=subprocess.STDOUT)
         return result.returncode == 0
 
@@ -206,6 +240,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fuzz espresso logic analyzer")
     add_args(parser)
     args = parser.parse_args()
+    riscv_test_simulator = args.simulator
 
     data = read_espresso_file(args.espresso_file)
 
@@ -236,13 +271,21 @@ if __name__ == "__main__":
                     run_espresso(FILE_ESPRESSO, FILE_EQNTOTT)
                     assignments = read_eqntott(FILE_EQNTOTT, outputs_to_remove)
                     write_to_verilog_template(assignments, args.template_verilog, args.destination_verilog, args.template_marker)
-                    success_riscv_tests = test_riscv_tests(args.riscvtests_dir)
+
+                    # only run the checks of instructions the row can affect,
+                    # fall back to the full suites if nothing is selected
+                    formal_insns, tests = None, None
+                    if not args.full_checks:
+                        formal_insns, tests = select_checks(data["input_labels"], data["rows"][r]["inputs"], args.rvc)
+
+                    success_riscv_tests = test_riscv_tests(args.riscvtests_dir, tests)
                     success_riscv_formal = True
 
                     # if the sanity check is true, make the more extensive test
-                    # to check if it really can be set to a "don't care" value
+                    # to check if it really can be set to a "don't care" value;
+                    # rows without selected instructions run the full suite
                     if success_riscv_tests:
-                        success_riscv_formal = test_riscv_formal(args.riscvformal_dir)
+                        success_riscv_formal = test_riscv_formal(args.riscvformal_dir, formal_insns or None)
 
                     if success_riscv_tests and success_riscv_formal:
                         set_output_value(data, r, o, "-")
@@ -262,4 +305,12 @@ if __name__ == "__main__":
     print(f"Numer of non-optimized ouputs: {performance_left}")
     print(f"Numer of ignored ouputs: {performance_ignored}")
 
-    write_espresso_file(data, args.espresso_optimized)
\ No newline at end of file
+    write_espresso_file(data, args.espresso_optimized)
+
+    if args.confirm:
+        write_espresso_file(data, FILE_ESPRESSO)
+        run_espresso(FILE_ESPRESSO, FILE_EQNTOTT)
+        assignments = read_eqntott(FILE_EQNTOTT, outputs_to_remove)
+        write_to_verilog_template(assignments, args.template_verilog, args.destination_verilog, args.template_marker)
+        success = test_riscv_tests(args.riscvtests_dir) and test_riscv_formal(args.riscvformal_dir)
+        print(f"Confirmation pass: {'PASS' if success else 'FAIL'}")
\ No newline at end of file
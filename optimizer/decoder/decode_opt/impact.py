@@ -0,0 +1,135 @@
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  impact.py
+# Usage  :  Change-impact analysis for the decoder fuzzer. Maps the input cube
+#           of an espresso row to the RV32I/C instructions it covers and
+#           selects the riscv-formal insn checks and riscv-tests to run.
+# Limit. :  Compressed instructions are decoded by fazyrv_rvc before they
+#           reach the decoder; they are impacted via their expansion.
+# -----------------------------------------------------------------------------
+
+#            31    25    20    15    12    7     0
+#             |     |     |     |     |    |     |
+ENCODINGS = {
+    "lui":    "-------------------------0110111",
+    "auipc":  "-------------------------0010111",
+    "jal":    "-------------------------1101111",
+    "jalr":   "-----------------000-----1100111",
+    "beq":    "-----------------000-----1100011",
+    "bne":    "-----------------001-----1100011",
+    "blt":    "-----------------100-----1100011",
+    "bge":    "-----------------101-----1100011",
+    "bltu":   "-----------------110-----1100011",
+    "bgeu":   "-----------------111-----1100011",
+    "lb":     "-----------------000-----0000011",
+    "lh":     "-----------------001-----0000011",
+    "lw":     "-----------------010-----0000011",
+    "lbu":    "-----------------100-----0000011",
+    "lhu":    "-----------------101-----0000011",
+    "sb":     "-----------------000-----0100011",
+    "sh":     "-----------------001-----0100011",
+    "sw":     "-----------------010-----0100011",
+    "addi":   "-----------------000-----0010011",
+    "slti":   "-----------------010-----0010011",
+    "sltiu":  "-----------------011-----0010011",
+    "xori":   "-----------------100-----0010011",
+    "ori":    "-----------------110-----0010011",
+    "andi":   "-----------------111-----0010011",
+    "slli":   "0000000----------001-----0010011",
+    "srli":   "0000000----------101-----0010011",
+    "srai":   "0100000----------101-----0010011",
+    "add":    "0000000----------000-----0110011",
+    "sub":    "0100000----------000-----0110011",
+    "sll":    "0000000----------001-----0110011",
+    "slt":    "0000000----------010-----0110011",
+    "sltu":   "0000000----------011-----0110011",
+    "xor":    "0000000----------100-----0110011",
+    "srl":    "0000000----------101-----0110011",
+    "sra":    "0100000----------101-----0110011",
+    "or":     "0000000----------110-----0110011",
+    "and":    "0000000----------111-----0110011",
+    "ecall":  "000000000000-----000-----1110011",
+    "ebreak": "000000000001-----000-----1110011",
+    "mret":   "001100000010-----000-----1110011",
+    "csrrw":  "-----------------001-----1110011",
+    "csrrs":  "-----------------010-----1110011",
+    "csrrc":  "-----------------011-----1110011",
+}
+
+# Compressed instructions impacted through their 32-bit expansion
+EXPANSIONS = {
+    "addi":   ["c_addi4spn", "c_nop", "c_addi", "c_li", "c_addi16sp"],
+    "lui":    ["c_lui"],
+    "jal":    ["c_jal", "c_j"],
+    "jalr":   ["c_jr", "c_jalr"],
+    "beq":    ["c_beqz"],
+    "bne":    ["c_bnez"],
+    "lw":     ["c_lw", "c_lwsp"],
+    "sw":     ["c_sw", "c_swsp"],
+    "slli":   ["c_slli"],
+    "srli":   ["c_srli"],
+    "srai":   ["c_srai"],
+    "andi":   ["c_andi"],
+    "add":    ["c_mv", "c_add"],
+    "sub":    ["c_sub"],
+    "xor":    ["c_xor"],
+    "or":     ["c_or"],
+    "and":    ["c_and"],
+    "ebreak": ["c_ebreak"],
+}
+
+# Instructions with an insn_<name>_ch0 check in riscv-formal (rv32i, rv32ic)
+RVFORMAL_INSNS = [
+    "lui", "auipc", "jal", "jalr", "beq", "bne", "blt", "bge", "bltu", "bgeu",
+    "lb", "lh", "lw", "lbu", "lhu", "sb", "sh", "sw", "addi", "slti", "sltiu",
+    "xori", "ori", "andi", "slli", "srli", "srai", "add", "sub", "sll", "slt",
+    "sltu", "xor", "srl", "sra", "or", "and"
+] + [c for e in EXPANSIONS.values() for c in e if c != "c_ebreak"]
+
+# riscv-tests in sim/tests that exercise an instruction
+RISCV_TESTS = {
+    "sltiu":  ["slti"],
+    "sltu":   ["slt"],
+    "ebreak": ["ecall"],
+    "mret":   ["ecall"],
+    "csrrw":  ["csrrw", "ecall"],
+    "csrrs":  ["rdinstret", "rdtime"],
+    "csrrc":  ["rdinstret", "rdtime"],
+    "jal":    ["jal", "j"],
+}
+
+
+def cubes_intersect(a, b):
+    return all(x == '-' or y == '-' or x == y for x, y in zip(a, b))
+
+
+def row_instr_cube(input_labels, row_inputs):
+    """Extract the i_r[31:0] part of the row's input cube, MSB first. Returns
+       None if the row is not restricted by the instruction (e.g., trap entry)."""
+    if 'trap_entry_i' in input_labels:
+        if row_inputs[input_labels.index('trap_entry_i')] == '1':
+            return None
+    return ''.join(row_inputs[input_labels.index(f"i_r[{b}]")] for b in range(31, -1, -1))
+
+
+def covered_instructions(input_labels, row_inputs):
+    """Set of instructions whose encoding lies (partly) in the row's cube."""
+    cube = row_instr_cube(input_labels, row_inputs)
+    if cube is None:
+        return set(ENCODINGS.keys())
+    return {i for i, enc in ENCODINGS.items() if cubes_intersect(cube, enc)}
+
+
+def select_checks(input_labels, row_inputs, rvc=True):
+    """Return the riscv-formal insn checks and riscv-tests impacted by a row."""
+    insns = covered_instructions(input_labels, row_inputs)
+
+    formal = set(i for i in insns if i in RVFORMAL_INSNS)
+    if rvc:
+        formal |= set(c for i in insns for c in EXPANSIONS.get(i, []) if c in RVFORMAL_INSNS)
+
+    tests = set()
+    for i in insns:
+        tests |= set(RISCV_TESTS.get(i, [i]))
+
+    return sorted(formal), sorted(tests)
@@ -58,6 +58,9 @@
 //  - rf_mcause_int_o   Trap is interrupt.
 //  - rf_mtie_i         Interrupt enable.
 //
+//  - hpm_br_o          Event: taken branch (one cycle per branch).
+//  - hpm_shft_o        Event: shift cycle.
+//
 //  - RVFI_OUTPUTS      RVFI used for formal checks.
 // -----------------------------------------------------------------------------
 
@@ -110,7 +113,10 @@ module fazyrv_core #(
   output logic                  rf_mret_o,
   output logic [1:0]            rf_mcause30_o,
   output logic                  rf_mcause_int_o,
-  input  logic                  rf_mtie_i
+  input  logic                  rf_mtie_i,
+
+  output logic                  hpm_br_o,
+  output logic                  hpm_shft_o
 `ifdef RISCV_FORMAL
   , `RVFI_OUTPUTS
 `endif
@@ -227,6 +233,10 @@ logic mcause_30;
 
 assign br_and_taken = (id_instr_any_br & ex_cmp);
 
+// Events for the performance counters
+assign hpm_br_o   = br_and_taken & cntrl_cyc_two & cntrl_lsb;
+assign hpm_shft_o = cntrl_cyc_shft;
+
 assign trap_o = trap_entry_r; //id_except & cntrl_cyc_two;
 
 
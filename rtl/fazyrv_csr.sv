@@ -7,6 +7,7 @@
 //
 // Param
 //  - CONF          Features of core.
+//  - HPM           Implement the event counters hpmcounter3..7 (CONF CSR).
 //  - REGW          Width of the registers in bits.
 //
 // Ports
@@ -17,6 +18,7 @@
 //  - csr_rs_i      Address.
 //  - csr_hpmtc_i   Is hpmtc address.
 //  - csr_info_new_insn_i Inform about a new instruction.
+//  - hpm_evt_i     Events counted by hpmcounter3..7, one bit each.
 //
 //  - csr_rs1_en_i  Read into ra enable.
 //  - csr_rs2_en_i  Read into rb enable.
@@ -35,6 +37,7 @@
 
 module fazyrv_csr #(
   parameter CONF  = "MIN",
+  parameter HPM   = 0,
   parameter REGW  = 32
 ) (
   input  logic              clk_i,
@@ -44,6 +47,7 @@ module fazyrv_csr #(
   input  logic [4:0]        csr_rs_i,
   input  logic              csr_hpmtc_i,
   input  logic              csr_info_new_insn_i,
+  input  logic [4:0]        hpm_evt_i,
 
   input  logic              csr_rs1_en_i,
   input  logic              csr_rs2_en_i,
@@ -61,6 +65,11 @@ module fazyrv_csr #(
 
 logic [63:0]  cycle_r   = 64'bx;
 logic [63:0]  instret_r = 64'bx;
+logic [31:0]  hpm_ifstall_r;
+logic [31:0]  hpm_dmstall_r;
+logic [31:0]  hpm_br_r;
+logic [31:0]  hpm_shft_r;
+logic [31:0]  hpm_ldst_r;
 
 logic mstatus_mie_r;
 logic mstatus_mpie_r;
@@ -76,6 +85,11 @@ logic mcause_0_r;
 // time     0xC01    timeh  0xC81 -> ra_r (low), rb_r (high)
 // instret  0xC02    ...
 // 1100_0000_0000
+// With HPM, the event counters are 32 bits wide; their high part reads zero
+// hpmcounter3..7  0xC03..0xC07 (mhpmcounter3..7 0xB03..0xB07 alias them)
+//   3 instr. fetch stall cycles   4 data memory stall cycles
+//   5 taken branches              6 shift cycles
+//   7 loads and stores
 
 //localparam ADR_MSTATUS       // 0x300, 0b00 000    bits: 7, 3        ff
 //localparam ADR_MIP           // 0x344, 0b01 100    bits: 7           ff
@@ -149,11 +163,23 @@ always_comb begin
       rdata_ab_o = instret_r[31:0];
     else
       rdata_ab_o = cycle_r[31:0];
+
+    if (HPM == 1) begin
+      case (csr_rs_i[2:0])
+        3'b011:   rdata_ab_o = hpm_ifstall_r;
+        3'b100:   rdata_ab_o = hpm_dmstall_r;
+        3'b101:   rdata_ab_o = hpm_br_r;
+        3'b110:   rdata_ab_o = hpm_shft_r;
+        3'b111:   rdata_ab_o = hpm_ldst_r;
+        default:;
+      endcase
+    end
   end
 
   if (csr_rs2_en_i) begin
     casez ({csr_hpmtc_i, csr_rs_i[2:1]})
-      3'b1?1:  rdata_b_o = instret_r[63:32];
+      3'b1?1:  rdata_b_o = ((HPM == 1) && (csr_rs_i[2] | csr_rs_i[0])) ? 'b0 : instret_r[63:32];
+      3'b110:  rdata_b_o = (HPM == 1) ? 'b0 : cycle_r[63:32];
       3'b010:  rdata_b_o = {24'b0, mie_mtie_r, 7'b0};
       3'b000:  rdata_b_o = {24'b0, mstatus_mpie_r, 3'b0, mstatus_mie_r, 3'b0};
       3'b0?1:  rdata_b_o = {mcause_int_r, 28'b0, mcause_3_r|mcause_int_r, mcause_int_r, mcause_0_r|mcause_int_r};
@@ -177,6 +203,31 @@ generate
       end
     end
   end
+
+  // Event counters
+  if ((CONF == "CSR") && (HPM == 1)) begin
+    always_ff @(posedge clk_i) begin
+      if (~rst_in) begin
+        hpm_ifstall_r <= 32'b0;
+        hpm_dmstall_r <= 32'b0;
+        hpm_br_r      <= 32'b0;
+        hpm_shft_r    <= 32'b0;
+        hpm_ldst_r    <= 32'b0;
+      end else begin
+        hpm_ifstall_r <= hpm_ifstall_r + {31'b0, hpm_evt_i[0]};
+        hpm_dmstall_r <= hpm_dmstall_r + {31'b0, hpm_evt_i[1]};
+        hpm_br_r      <= hpm_br_r      + {31'b0, hpm_evt_i[2]};
+        hpm_shft_r    <= hpm_shft_r    + {31'b0, hpm_evt_i[3]};
+        hpm_ldst_r    <= hpm_ldst_r    + {31'b0, hpm_evt_i[4]};
+      end
+    end
+  end else begin
+    assign hpm_ifstall_r  = 32'b0;
+    assign hpm_dmstall_r  = 32'b0;
+    assign hpm_br_r       = 32'b0;
+    assign hpm_shft_r     = 32'b0;
+    assign hpm_ldst_r     = 32'b0;
+  end
 endgenerate
 
 
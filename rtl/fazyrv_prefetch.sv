@@ -0,0 +1,114 @@
+// Copyright (c) 2026 Meinhard Kissich
+// SPDX-License-Identifier: MIT
+// -----------------------------------------------------------------------------
+// File  :  fazyrv_prefetch.sv
+// Usage :  Next-word prefetch buffer between the core and the instruction
+//          memory. After each fetch, the word at the next sequential address
+//          is fetched while the core executes the current instruction. A
+//          fetch of that address is then acknowledged from the buffer without
+//          a memory access. Jumps, taken branches, and traps simply miss.
+//          Stores invalidate the buffer to keep self-modifying code coherent.
+//
+// Param
+//  - BOOTADR       Address of first instruction, prefetched after reset.
+//
+// Ports
+//  - clk_i         Clock input, sensitive to rising edge.
+//  - rst_in        Reset, low active.
+//
+//  - wb_core_stb_i Wishbone interface to core
+//  - wb_core_adr_i   accesses 4-byte aligned.
+//  - wb_core_dat_o
+//  - wb_core_ack_o
+//
+//  - dmem_stb_i    Data memory request of the core. No prefetch is started
+//                  while it is pending.
+//  - dmem_we_i     Data memory write enable.
+//  - dmem_ack_i    Data memory acknowledgement.
+//  - dmem_hold_o   Prefetch in progress, hold back data memory requests.
+//                  The core never accesses instr. and data memory at once.
+//
+//  - wb_mem_stb_o  Wishbone interface to memory
+//  - wb_mem_adr_o
+//  - wb_mem_dat_i
+//  - wb_mem_ack_i
+// -----------------------------------------------------------------------------
+
+module fazyrv_prefetch #(
+  parameter BOOTADR = 'h0
+) (
+  input  logic          clk_i,
+  input  logic          rst_in,
+
+  input  logic          wb_core_stb_i,
+  input  logic [31:0]   wb_core_adr_i,
+  output logic [31:0]   wb_core_dat_o,
+  output logic          wb_core_ack_o,
+
+  input  logic          dmem_stb_i,
+  input  logic          dmem_we_i,
+  input  logic          dmem_ack_i,
+  output logic          dmem_hold_o,
+
+  output logic          wb_mem_stb_o,
+  output logic [31:0]   wb_mem_adr_o,
+  input  logic [31:0]   wb_mem_dat_i,
+  input  logic          wb_mem_ack_i
+);
+
+logic [29:0] nxt_adr_r;
+logic [31:0] buf_dat_r;
+logic        buf_vld_r;
+logic        pf_pend_r;
+
+logic        match;
+logic        hit;
+logic        pf_start;
+logic        pf_bus;
+
+assign match    = (wb_core_adr_i[31:2] == nxt_adr_r);
+assign hit      = buf_vld_r & match;
+
+// Only prefetch when neither the core nor the data memory use the bus
+assign pf_start = ~buf_vld_r & ~pf_pend_r & ~wb_core_stb_i & ~dmem_stb_i;
+assign pf_bus   = pf_pend_r | pf_start;
+
+assign dmem_hold_o = pf_pend_r;
+
+assign wb_mem_stb_o = pf_bus | (wb_core_stb_i & ~hit);
+assign wb_mem_adr_o = pf_bus ? {nxt_adr_r, 2'b00} : wb_core_adr_i;
+
+// A fetch of the word being prefetched completes with the prefetch
+assign wb_core_ack_o = wb_core_stb_i & (hit | (wb_mem_ack_i & (~pf_pend_r | match)));
+assign wb_core_dat_o = hit ? buf_dat_r : wb_mem_dat_i;
+
+always_ff @(posedge clk_i) begin
+  if (~rst_in) begin
+    nxt_adr_r <= BOOTADR >> 2;
+    buf_vld_r <= 1'b0;
+    pf_pend_r <= 1'b0;
+  end else begin
+    if (wb_core_ack_o) begin
+      nxt_adr_r <= wb_core_adr_i[31:2] + 30'b1;
+      buf_vld_r <= 1'b0;
+      pf_pend_r <= 1'b0;
+    end else if (pf_bus & wb_mem_ack_i) begin
+      buf_vld_r <= 1'b1;
+      pf_pend_r <= 1'b0;
+    end else if (pf_start) begin
+      pf_pend_r <= 1'b1;
+    end
+
+    if (dmem_stb_i & dmem_we_i & dmem_ack_i) begin
+      buf_vld_r <= 1'b0;
+    end
+  end
+end
+
+always_ff @(posedge clk_i) begin
+  if (pf_bus & wb_mem_ack_i) begin
+    buf_dat_r <= wb_mem_dat_i;
+  end
+end
+
+endmodule
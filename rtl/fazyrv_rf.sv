@@ -9,6 +9,7 @@
 //  - RFTYPE      RAM type used for register file. Required in the control
 //                logic to adapt for delays.
 //  - CONF        Configuration of the processor (MIN, INT, or CSR).
+//  - HPM         Implement the event counters (with CONF CSR).
 //  - ADRWIDTH    Address width.
 //
 // Ports
@@ -32,6 +33,7 @@
 //  - csr_6_i         Bit 6 of CSR address.
 //
 //  - csr_info_new_insn_i Inform about new instruction.
+//  - hpm_evt_i       Events counted by hpmcounter3..7.
 //  - trap_i          Entering trap.
 //  - mret_i          Returning from trap.
 //  - mcause30_i      Bits 3 and 0 of mcause.
@@ -54,6 +56,7 @@ module fazyrv_rf #(
   parameter CHUNKSIZE = 2,
   parameter RFTYPE    = "BRAM_DP_BP",
   parameter CONF      = "MIN",
+  parameter HPM       = 0,
   parameter ADRWIDTH  = 5
 ) (
   input  logic              clk_i,
@@ -77,6 +80,7 @@ module fazyrv_rf #(
   input  logic              csr_6_i,
 
   input  logic              csr_info_new_insn_i,
+  input  logic [4:0]        hpm_evt_i,
   input  logic              trap_i,
   input  logic              mret_i,
   input  logic [1:0]        mcause30_i,
@@ -389,7 +393,7 @@ generate
   /* verilator lint_off WIDTHEXPAND */
   if ((CONF == "INT") || (CONF == "CSR")) begin
   /* verilator lint_on WIDTHEXPAND */
-    fazyrv_csr #( .CONF (CONF)) i_fazyrv_csr (
+    fazyrv_csr #( .CONF (CONF), .HPM (HPM) ) i_fazyrv_csr (
       .clk_i                ( clk_i   ),
       .rst_in               ( rst_in  ),
 
@@ -397,6 +401,7 @@ generate
       .csr_rs_i             ( rf_rs2_i            ),
       .csr_hpmtc_i          ( csr_hpmtc_i         ),
       .csr_info_new_insn_i  ( csr_info_new_insn_i ),
+      .hpm_evt_i            ( hpm_evt_i           ),
       .csr_rs1_en_i         ( csr_rs1_en          ),
       .csr_rs2_en_i         ( csr_rs2_en          ),
 
@@ -26,6 +26,11 @@
 //                "BRAM_DP_BP": block ram with two read ports and bypassing muxes.
 //   - MEMDLY1    Use memory with a fixed delay of 1 clock cycle instead of
 //                standard Wishbone interface.
+//   - PREFETCH   Prefetch the next sequential instruction word during
+//                execution. [0 or 1, requires MEMDLY1 = 0]
+//   - HPM        Event counters hpmcounter3..7 for fetch stall cycles, data
+//                memory stall cycles, taken branches, shift cycles, and
+//                loads/stores. [0 or 1, requires CONF = "CSR"]
 //
 // Ports
 //  - clk_i       Clock input, sensitive to rising edge.
@@ -58,7 +63,9 @@ module fazyrv_top #(
   parameter MTVAL     = 'b0,
   parameter BOOTADR   = 'h0,
   parameter RFTYPE    = "BRAM_DP_BP",
-  parameter MEMDLY1   = 0
+  parameter MEMDLY1   = 0,
+  parameter PREFETCH  = 0,
+  parameter HPM       = 0
 ) (
   input  logic        clk_i,
   input  logic        rst_in,
@@ -103,11 +110,23 @@ logic [1:0]           rf_mcause30;
 logic                 rf_mcause_int;
 logic                 rf_mtie;
 
+logic                 wb_core_imem_stb;
+logic                 wb_core_imem_cyc;
+logic [31:0]          wb_core_imem_adr;
+logic [31:0]          wb_core_imem_dat;
+logic                 wb_core_imem_ack;
+logic                 wb_core_dmem_cyc;
+logic                 wb_core_dmem_stb;
+
+logic                 hpm_br;
+logic                 hpm_shft;
+logic [4:0]           hpm_evt;
+
 
 `ifdef RISCV_FORMAL
   logic [31:0] fv_res;
   always_ff @(posedge clk_i) begin
-    if (wb_imem_ack_i)  rvfi_rd_wdata <= 'b0;
+    if (wb_core_imem_ack) rvfi_rd_wdata <= 'b0;
     if (rf_we)          rvfi_rd_wdata <= fv_res;
   end
 `endif
@@ -130,14 +149,14 @@ fazyrv_core #(
   .tirq_i           ( tirq_i            ),
   .trap_o           ( trap_o            ),
 
-  .wb_imem_stb_o    ( wb_imem_stb_o     ),
-  .wb_imem_cyc_o    ( wb_imem_cyc_o     ),
-  .wb_imem_adr_o    ( wb_imem_adr_o     ),
-  .wb_imem_dat_i    ( wb_imem_dat_i     ),
-  .wb_imem_ack_i    ( wb_imem_ack_i     ),
+  .wb_imem_stb_o    ( wb_core_imem_stb  ),
+  .wb_imem_cyc_o    ( wb_core_imem_cyc  ),
+  .wb_imem_adr_o    ( wb_core_imem_adr  ),
+  .wb_imem_dat_i    ( wb_core_imem_dat  ),
+  .wb_imem_ack_i    ( wb_core_imem_ack  ),
 
-  .wb_dmem_cyc_o    ( wb_dmem_cyc_o     ),
-  .wb_dmem_stb_o    ( wb_dmem_stb_o     ),
+  .wb_dmem_cyc_o    ( wb_core_dmem_cyc  ),
+  .wb_dmem_stb_o    ( wb_core_dmem_stb  ),
   .wb_dmem_we_o     ( wb_dmem_we_o      ),
   .wb_dmem_ack_i    ( wb_dmem_ack_i     ),
   .wb_dmem_be_o     ( wb_dmem_be_o      ),
@@ -162,12 +181,64 @@ fazyrv_core #(
   .rf_mret_o        ( rf_mret           ),
   .rf_mcause30_o    ( rf_mcause30       ),
   .rf_mcause_int_o  ( rf_mcause_int     ),
-  .rf_mtie_i        ( rf_mtie           )
+  .rf_mtie_i        ( rf_mtie           ),
+
+  .hpm_br_o         ( hpm_br            ),
+  .hpm_shft_o       ( hpm_shft          )
 `ifdef RISCV_FORMAL
   , `RVFI_CONN,
 `endif
 );
 
+// -----------------------------------------------
+
+generate
+  if (PREFETCH == 1) begin
+    logic imem_stb_pf;
+    logic dmem_hold;
+
+    fazyrv_prefetch #( .BOOTADR ( BOOTADR ) ) i_fazyrv_prefetch (
+      .clk_i          ( clk_i             ),
+      .rst_in         ( rst_in            ),
+
+      .wb_core_stb_i  ( wb_core_imem_stb  ),
+      .wb_core_adr_i  ( wb_core_imem_adr  ),
+      .wb_core_dat_o  ( wb_core_imem_dat  ),
+      .wb_core_ack_o  ( wb_core_imem_ack  ),
+
+      .dmem_stb_i     ( wb_core_dmem_stb  ),
+      .dmem_we_i      ( wb_dmem_we_o      ),
+      .dmem_ack_i     ( wb_dmem_ack_i     ),
+      .dmem_hold_o    ( dmem_hold         ),
+
+      .wb_mem_stb_o   ( imem_stb_pf       ),
+      .wb_mem_adr_o   ( wb_imem_adr_o     ),
+      .wb_mem_dat_i   ( wb_imem_dat_i     ),
+      .wb_mem_ack_i   ( wb_imem_ack_i     )
+    );
+    assign wb_imem_stb_o = imem_stb_pf;
+    assign wb_imem_cyc_o = imem_stb_pf;
+    assign wb_dmem_cyc_o = wb_core_dmem_cyc & ~dmem_hold;
+    assign wb_dmem_stb_o = wb_core_dmem_stb & ~dmem_hold;
+
+  end else begin
+    assign wb_imem_stb_o    = wb_core_imem_stb;
+    assign wb_imem_cyc_o    = wb_core_imem_cyc;
+    assign wb_imem_adr_o    = wb_core_imem_adr;
+    assign wb_core_imem_dat = wb_imem_dat_i;
+    assign wb_core_imem_ack = wb_imem_ack_i;
+    assign wb_dmem_cyc_o    = wb_core_dmem_cyc;
+    assign wb_dmem_stb_o    = wb_core_dmem_stb;
+  end
+endgenerate
+
+// Events of hpmcounter3..7, seen from the core
+assign hpm_evt = { wb_core_dmem_stb & wb_dmem_ack_i,
+                   hpm_shft,
+                   hpm_br,
+                   wb_core_dmem_stb & ~wb_dmem_ack_i,
+                   wb_core_imem_stb & ~wb_core_imem_ack };
+
 localparam REGW       = 32;
 localparam NO_X_REGS  = 32;
 localparam NO_CSRS    = (CONF == "CSR") ? 8 : 0;
@@ -230,6 +301,7 @@ generate
       .CHUNKSIZE  ( CHUNKSIZE ),
       .RFTYPE     ( RFTYPE    ),
       .CONF       ( CONF      ),
+      .HPM        ( HPM       ),
       .ADRWIDTH   ( ADR_WIDTH )
     ) i_fazyrv_regfile (
       .clk_i                ( clk_i         ),
@@ -249,7 +321,8 @@ generate
       .csr_hpmtc_i          ( rf_hpmtc      ),
       .csr_6_i              ( rf_csr_6      ),
 
-      .csr_info_new_insn_i  ( wb_imem_ack_i ),
+      .csr_info_new_insn_i  ( wb_core_imem_ack ),
+      .hpm_evt_i            ( hpm_evt       ),
       .trap_i               ( rf_trap       ),
       .mret_i               ( rf_mret       ),
       .mcause30_i           ( rf_mcause30   ),
@@ -344,7 +417,11 @@ localparam RFTYPE_OK    = (RFTYPE=="LOGIC")   ||
 
 localparam MEMDLY1_OK   = (MEMDLY1==0) || (MEMDLY1==1); 
 
-if (!(CHUNKSIZE_OK && RVC_OK && CONF_OK && RFTYPE_OK && MEMDLY1_OK)) begin
+localparam PREFETCH_OK  = (PREFETCH==0) || ((PREFETCH==1) && (MEMDLY1==0));
+
+localparam HPM_OK       = (HPM==0) || ((HPM==1) && (CONF=="CSR"));
+
+if (!(CHUNKSIZE_OK && RVC_OK && CONF_OK && RFTYPE_OK && MEMDLY1_OK && PREFETCH_OK && HPM_OK)) begin
   $fatal(1, "At least one of the parameters is not valid.");
 end
 /* verilator lint_on WIDTHEXPAND */
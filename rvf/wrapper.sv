@@ -14,6 +14,7 @@ module rvfi_wrapper (
   localparam BOOTADR    = 'h0;
   localparam RFTYPE     = "LOGIC";
   localparam MEMDLY1    = 0;
+  localparam PREFETCH   = `PREFETCH;
 
   // imem
   (* keep *)      wire [31:0] ibus_adr;
@@ -37,7 +38,8 @@ module rvfi_wrapper (
     .MTVAL      ( MTVAL       ),
     .BOOTADR    ( BOOTADR     ),
     .RFTYPE     ( RFTYPE      ),
-    .MEMDLY1    ( MEMDLY1     )
+    .MEMDLY1    ( MEMDLY1     ),
+    .PREFETCH   ( PREFETCH    )
   ) i_fazyrv_top (
     .clk_i            ( clock     ),
     .rst_in           ( ~reset    ),
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  area_modules.py
+# Usage  :  Per-module area of an fsoc variant. The design is synthesized with
+#           yosys for the architecture of the reference implementation while
+#           the module hierarchy is kept, and the cells of each module are
+#           counted as LUTs, FFs, carries, and block RAMs.
+#           python3 area_modules.py <arch> <variant> [--report <report.json>]
+#           --report adds the counts as "modules" to a report of reporting.py.
+# Limit. :  Logic is not optimized across module boundaries, so the sum of all
+#           modules slightly exceeds the flattened implementation. Only the
+#           yosys flows are supported, not xilinx (Vivado).
+# -----------------------------------------------------------------------------
+
+import re
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+from synth_cache import params
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SOURCES = ["rtl/*.v", "rtl/*.sv", "soc/rtl/*.v", "soc/rtl/*.sv"]
+TOP = "fsoc"
+
+# Parameters of the *_ref targets in fsoc.core next to those of the variant
+REF_PARAMS = {"MEMSIZE": 64, "GPOCNT": 1}
+
+SYNTH = {
+    "ice40":    "synth_ice40",
+    "ecp5":     "synth_ecp5",
+    "gowin":    "synth_gowin",
+    "gatemate": "synth_gatemate",
+}
+
+# Cell types per category and architecture
+CELLS = {
+    "ice40":    {"lut": r"SB_LUT4", "ff": r"SB_DFF\w*", "carry": r"SB_CARRY", "bram": r"SB_RAM40_4K\w*"},
+    "ecp5":     {"lut": r"LUT4|TRELLIS_DPR16X4", "ff": r"TRELLIS_FF", "carry": r"CCU2C", "bram": r"DP16KD|PDPW16KD"},
+    "gowin":    {"lut": r"LUT[1-4]|RAM16\w*", "ff": r"DFF\w*", "carry": r"ALU", "bram": r"SP|SPX9|SDPB|SDPX9B|DPB|DPX9B"},
+    "gatemate": {"lut": r"CC_LUT\w*|CC_L2T\w*|CC_MX\d", "ff": r"CC_DFF|CC_DLT", "carry": r"CC_ADDF", "bram": r"CC_BRAM\w*"},
+}
+
+# Small leaf modules that are synthesized as part of their parent
+FLATTEN = ["fazyrv_hadd", "fazyrv_fadd"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-module area of an fsoc variant")
+
+    parser.add_argument(
+        'arch',
+        choices=list(SYNTH),
+        help='Target architecture'
+    )
+
+    parser.add_argument(
+        'variant',
+        type=str,
+        help='Variant <CHUNKSIZE>-<CONF>-<RFTYPE>[-<RVC>][-PF][-HPM]'
+    )
+
+    parser.add_argument(
+        '--report',
+        type=Path,
+        default=None,
+        help='Report JSON of reporting.py to add the counts to'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Write the counts to a separate JSON file'
+    )
+
+    parser.add_argument(
+        '--yosys',
+        type=str,
+        default="yosys",
+        help='Yosys executable (default: %(default)s)'
+    )
+
+    return parser.parse_args()
+
+
+def script(arch, variant, stat_file):
+    files = [str(p) for pattern in SOURCES for p in sorted(ROOT.glob(pattern))]
+    chparam = " ".join(f'-set {k} {v}' if isinstance(v, int) or str(v).isdigit() else f'-set {k} "{v}"'
+                       for k, v in (params(variant) | REF_PARAMS).items())
+    return "\n".join([
+        "verilog_defaults -push",
+        "verilog_defaults -add -defer",
+        f"read_verilog -sv {' '.join(files)}",
+        "verilog_defaults -pop",
+        f"chparam {chparam} {TOP}",
+        f"hierarchy -top {TOP}",
+        "setattr -mod -set keep_hierarchy 1",
+        f"setattr -mod -unset keep_hierarchy {' '.join(FLATTEN)}",
+        f"{SYNTH[arch]} -top {TOP}",
+        f"tee -q -o {stat_file} stat -json",
+    ]) + "\n"
+
+
+def base_name(module):
+    """fazyrv_alu for $paramod\\fazyrv_alu\\CHUNKSIZE=... or $paramod$<hash>\\fazyrv_alu."""
+    return module.split('\\')[1] if module.startswith('$paramod') else module
+
+
+def categorize(cells_by_type, modules, arch):
+    """Cells of a module without its submodules; "cells" includes cells of
+       no category, e.g., wide muxes and I/O buffers."""
+    counts = {c: 0 for c in CELLS[arch]} | {"cells": 0}
+    for typ, n in cells_by_type.items():
+        if typ in modules or typ.startswith('$scopeinfo'):
+            continue
+        counts["cells"] += n
+        for cat, pattern in CELLS[arch].items():
+            if re.fullmatch(pattern, typ):
+                counts[cat] += n
+                break
+    return counts
+
+
+def attribute(stat, arch):
+    """Counts per module (base name): cells of the module itself times its
+       instances ("self"), and including all submodules ("incl")."""
+    # cell types of non-parametrized modules come without the leading '\\'
+    mods = {m.lstrip('\\'): v for m, v in stat["modules"].items()}
+    local = {m: categorize(v.get("num_cells_by_type", {}), mods, arch) for m, v in mods.items()}
+    subs = {m: {t: n for t, n in v.get("num_cells_by_type", {}).items() if t in mods}
+            for m, v in mods.items()}
+
+    incl = {}
+    def inclusive(m):
+        if m not in incl:
+            tot = dict(local[m])
+            for s, n in subs[m].items():
+                for k, v in inclusive(s).items():
+                    tot[k] += n * v
+            incl[m] = tot
+        return incl[m]
+
+    top = next(m for m in mods if base_name(m) == TOP)
+    inst = {top: 1}
+    def count(m, n):
+        for s, k in subs[m].items():
+            inst[s] = inst.get(s, 0) + n * k
+            count(s, n * k)
+    count(top, 1)
+
+    result = {}
+    for m, n in inst.items():
+        r = result.setdefault(base_name(m), {"instances": 0, "self": {}, "incl": {}})
+        r["instances"] += n
+        for key, src in (("self", local[m]), ("incl", inclusive(m))):
+            for k, v in src.items():
+                r[key][k] = r[key].get(k, 0) + n * v
+    return result
+
+
+def modules(arch, variant, yosys="yosys"):
+    with tempfile.TemporaryDirectory() as tmp:
+        (Path(tmp) / "modules.ys").write_text(script(arch, variant, "stat.json"))
+        p = subprocess.run([yosys, "-q", "-l", "yosys.log", "-s", "modules.ys"], cwd=tmp,
+                           stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        if p.returncode != 0:
+            sys.stdout.write(p.stdout.decode(errors='replace'))
+            raise SystemExit(f"yosys failed for {arch}-{variant} (rc {p.returncode})")
+        with open(Path(tmp) / "stat.json") as f:
+            stat = json.load(f)
+    return attribute(stat, arch)
+
+
+def main():
+    args = parse_args()
+    mods = modules(args.arch, args.variant, args.yosys)
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(mods, f, indent=4)
+    if args.report is not None:
+        with open(args.report) as f:
+            data = json.load(f)
+        data["modules"] = mods
+        with open(args.report, "w") as f:
+            json.dump(data, f, indent=4)
+    if args.output is None and args.report is None:
+        print(f"{'module':<20} {'inst':>4} {'LUT':>6} {'FF':>6} {'carry':>6} {'BRAM':>5} {'incl. LUT':>10}")
+        for m, r in sorted(mods.items(), key=lambda x: -x[1]["self"]["lut"]):
+            s = r["self"]
+            print(f"{m:<20} {r['instances']:>4} {s['lut']:>6} {s['ff']:>6} {s['carry']:>6} {s['bram']:>5} {r['incl']['lut']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,8 @@ store() {
 cd embench-iot
 mkdir -p summary
 
-prepare && python3 benchmark_speed.py --absolute --target-module fsoc_verilator --timeout 14400 --json-output --chunksize 1 --conf MIN --rftype BRAM && store fsoc_8_MIN_BRAM
+prepare && python3 benchmark_speed.py --absolute --target-module fsoc_verilator --timeout 14400 --json-output --chunksize 1 --conf MIN --rftype BRAM && store fsoc_1_MIN_BRAM
+prepare && python3 benchmark_speed.py --absolute --target-module fsoc_verilator --timeout 14400 --json-output --chunksize 1 --conf MIN --rftype BRAM --prefetch && store fsoc_1_MIN_BRAM_PF
 cd ..
 
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  elfread.py
+# Usage  :  Minimal reader for the sections and the symbol table of 32-bit
+#           little-endian ELF files, such as RV32 firmware. No dependencies.
+#           python3 elfread.py <firmware.elf>
+# Limit. :  No relocations, program headers, or debug information.
+# -----------------------------------------------------------------------------
+
+import struct
+from sys import argv
+from bisect import bisect_right
+
+SHT_SYMTAB      = 2
+SHF_EXECINSTR   = 0x4
+
+EF_RISCV_RVC    = 0x1
+
+STT_NOTYPE      = 0
+STT_FUNC        = 2
+STB_LOCAL       = 0
+
+
+class ElfError(Exception):
+    pass
+
+
+def read_elf(path):
+    """Sections and symbols of an ELF file. Returns a dict with the entry
+       point, the header flags, a list of sections, and a list of symbols
+       (dicts each)."""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:4] != b'\x7fELF':
+        raise ElfError(f"{path} is not an ELF file")
+    if data[4] != 1 or data[5] != 1:
+        raise ElfError(f"{path} is not a 32-bit little-endian ELF file")
+
+    entry, _, shoff, e_flags = struct.unpack_from('<IIII', data, 0x18)
+    shentsize, shnum, shstrndx = struct.unpack_from('<HHH', data, 0x2E)
+
+    sections = []
+    for i in range(shnum):
+        name, typ, flags, addr, offset, size, link = \
+            struct.unpack_from('<IIIIIII', data, shoff + i*shentsize)
+        sections.append({"name": name, "type": typ, "flags": flags, "addr": addr,
+                         "offset": offset, "size": size, "link": link})
+
+    def string(sec, idx):
+        start = sec["offset"] + idx
+        return data[start:data.index(b'\0', start)].decode(errors='replace')
+
+    if shstrndx < shnum:
+        for sec in sections:
+            sec["name"] = string(sections[shstrndx], sec["name"])
+
+    symbols = []
+    for sec in sections:
+        if sec["type"] != SHT_SYMTAB:
+            continue
+        strtab = sections[sec["link"]]
+        for off in range(sec["offset"], sec["offset"] + sec["size"], 16):
+            name, value, size, info, _, shndx = struct.unpack_from('<IIIBBH', data, off)
+            if name == 0:
+                continue
+            symbols.append({
+                "name":     string(strtab, name),
+                "value":    value,
+                "size":     size,
+                "type":     info & 0xf,
+                "bind":     info >> 4,
+                "exec":     shndx < shnum and bool(sections[shndx]["flags"] & SHF_EXECINSTR),
+            })
+
+    return {"entry": entry, "flags": e_flags, "sections": sections, "symbols": symbols, "data": data}
+
+
+def section_data(elf, name):
+    """Content of the section name, or None."""
+    for sec in elf["sections"]:
+        if sec["name"] == name:
+            return elf["data"][sec["offset"]:sec["offset"] + sec["size"]]
+    return None
+
+
+def functions(elf):
+    """Code symbols as sorted list of (start, end, name). Functions are
+       complemented by labels of assembly code; symbols without a size end
+       at the next symbol."""
+    syms = {}
+    for s in elf["symbols"]:
+        if not s["exec"] or s["name"].startswith(('$', '.L')):
+            continue
+        if s["type"] == STT_FUNC:
+            rank = 0
+        elif s["type"] == STT_NOTYPE:
+            rank = 1 if s["bind"] != STB_LOCAL else 2
+        else:
+            continue
+        # prefer functions, then global labels, at the same address
+        if s["value"] not in syms or rank < syms[s["value"]][0]:
+            syms[s["value"]] = (rank, s["size"], s["name"])
+
+    # labels within a function of known size, e.g., loops, belong to it
+    sized = sorted((a, a + v[1]) for a, v in syms.items() if v[0] == 0 and v[1])
+    fstarts = [s for s, _ in sized]
+    for adr in [a for a, v in syms.items() if v[0] > 0]:
+        i = bisect_right(fstarts, adr) - 1
+        if i >= 0 and adr < sized[i][1]:
+            del syms[adr]
+
+    starts = sorted(syms)
+    funcs = []
+    for i, start in enumerate(starts):
+        _, size, name = syms[start]
+        nxt = starts[i+1] if i+1 < len(starts) else start + max(size, 4)
+        funcs.append((start, start + size if size else nxt, name))
+    return funcs
+
+
+class SymbolMap:
+    """Maps addresses to the code symbol that contains them."""
+
+    def __init__(self, funcs):
+        self.funcs = funcs
+        self.starts = [f[0] for f in funcs]
+
+    def lookup(self, adr):
+        """(name, offset) of the symbol containing adr, or (None, adr)."""
+        i = bisect_right(self.starts, adr) - 1
+        if i >= 0 and adr < self.funcs[i][1]:
+            return self.funcs[i][2], adr - self.funcs[i][0]
+        return None, adr
+
+    def name(self, adr):
+        name, _ = self.lookup(adr)
+        return name if name is not None else "??"
+
+
+if __name__ == "__main__":
+    for start, end, name in functions(read_elf(argv[1])):
+        print(f"{start:08x} {end - start:6d} {name}")
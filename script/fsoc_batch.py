@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  fsoc_batch.py
+# Usage  :  Run a queue of small firmwares (arch tests, riscv-tests, fuzz
+#           candidates) on the batch model (fsoc_sim_build.py --flavor batch).
+#           Firmwares are packed into the free instance slots; each slot
+#           reports completion, status, cycles, and optionally a signature.
+#           python3 fsoc_batch.py <lib> <fw.hex> [<fw.hex> ...] [-o res.json]
+# -----------------------------------------------------------------------------
+
+import sys
+import json
+import ctypes
+import argparse
+from pathlib import Path
+
+from fsoc_lib import GPO_SUCCESS, GPO_FAIL, read_hex_bytes, elf_symbols
+
+_libs = {}
+
+def _load(path):
+    """Load the library once per path and declare the C API."""
+    path = str(Path(path).resolve())
+    if path not in _libs:
+        lib = ctypes.CDLL(path)
+        h, u32, u64 = ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint64
+        buf = ctypes.c_char_p
+        for name, res, args in [
+            ("fsoc_batch_new",      h,    []),
+            ("fsoc_batch_delete",   None, [h]),
+            ("fsoc_batch_slots",    u32,  [h]),
+            ("fsoc_batch_memsize",  u32,  [h]),
+            ("fsoc_batch_reset",    None, [h, u32, u32]),
+            ("fsoc_batch_write",    None, [h, u32, u32, buf, u32]),
+            ("fsoc_batch_clear",    None, [h, u32]),
+            ("fsoc_batch_read",     None, [h, u32, u32, buf, u32]),
+            ("fsoc_batch_run",      u64,  [h, u64, u64]),
+            ("fsoc_batch_gpo",      u32,  [h, u32]),
+            ("fsoc_batch_halted",   ctypes.c_int, [h, u32]),
+            ("fsoc_batch_cycles",   u64,  [h, u32]),
+            ("fsoc_batch_instret",  u64,  [h, u32]),
+        ]:
+            getattr(lib, name).restype = res
+            getattr(lib, name).argtypes = args
+        _libs[path] = lib
+    return _libs[path]
+
+
+class Job:
+    """A firmware to run. signature is an optional (begin, end) range that is
+       read from the slot's memory when the firmware completes."""
+
+    def __init__(self, name, data, signature=None):
+        self.name = name
+        self.data = data
+        self.signature = signature
+
+
+class FsocBatch:
+
+    def __init__(self, lib):
+        self.lib = _load(lib)
+        self.h = self.lib.fsoc_batch_new()
+        self.slots = self.lib.fsoc_batch_slots(self.h)
+        self.memsize = self.lib.fsoc_batch_memsize(self.h)
+
+    def close(self):
+        if self.h is not None:
+            self.lib.fsoc_batch_delete(self.h)
+            self.h = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self, slot, job):
+        """Clear the slot's memory, load the firmware, and reset the slot."""
+        assert len(job.data) <= self.memsize, f"{job.name} does not fit into memory"
+        self.lib.fsoc_batch_clear(self.h, slot)
+        self.lib.fsoc_batch_write(self.h, slot, 0, bytes(job.data), len(job.data))
+        self.lib.fsoc_batch_reset(self.h, slot, 4)
+
+    def result(self, slot, job, timeout=False):
+        gpo = self.lib.fsoc_batch_gpo(self.h, slot)
+        if timeout:
+            status = "TIMEOUT"
+        elif self.lib.fsoc_batch_halted(self.h, slot) or gpo & GPO_SUCCESS:
+            status = "PASS"
+        else:
+            status = "FAIL"
+
+        res = {'status': status,
+               'cycles': self.lib.fsoc_batch_cycles(self.h, slot),
+               'instret': self.lib.fsoc_batch_instret(self.h, slot)}
+
+        if job.signature is not None and not timeout:
+            begin, end = job.signature
+            data = ctypes.create_string_buffer(end - begin)
+            self.lib.fsoc_batch_read(self.h, slot, begin, data, end - begin)
+            res['signature'] = ''.join(f"{int.from_bytes(data.raw[i:i+4], 'little'):08x}\n"
+                                       for i in range(0, end - begin, 4))
+        return res
+
+    def run_queue(self, jobs, max_cycles=10000000, quantum=100000):
+        """Run all jobs, packing them into free slots. A job that does not
+           complete within max_cycles is reported as TIMEOUT. Yields
+           (job, result) as the jobs complete."""
+        queue = list(jobs)
+        active = {}     # slot -> (job, cycles run)
+
+        while queue or active:
+            for slot in range(self.slots):
+                if slot not in active and queue:
+                    active[slot] = (queue.pop(0), 0)
+                    self.start(slot, active[slot][0])
+
+            mask = sum(1 << s for s in active)
+            budget = min(quantum, min(max_cycles - c for _, c in active.values()))
+            done = self.lib.fsoc_batch_run(self.h, budget, mask)
+
+            for slot, (job, c) in list(active.items()):
+                cycles = self.lib.fsoc_batch_cycles(self.h, slot)
+                if done & (1 << slot):
+                    yield job, self.result(slot, job)
+                    del active[slot]
+                elif cycles >= max_cycles:
+                    yield job, self.result(slot, job, timeout=True)
+                    del active[slot]
+                else:
+                    active[slot] = (job, cycles)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run firmwares on the batch model")
+
+    parser.add_argument(
+        'lib',
+        type=Path,
+        help='Model built with fsoc_sim_build.py --flavor batch'
+    )
+
+    parser.add_argument(
+        'firmware',
+        type=Path,
+        nargs='+',
+        help='Firmware hex files as written by makehex.py'
+    )
+
+    parser.add_argument(
+        '--max_cycles',
+        type=int,
+        default=10000000,
+        help='Cycle limit per firmware (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--signature',
+        action='store_true',
+        help='Write DUT-fazyrv.signature next to each hex, using the symbols of the .elf next to it'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Path to the JSON results file'
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    jobs = []
+    for fw in args.firmware:
+        sig = None
+        if args.signature:
+            sym = elf_symbols(fw.with_suffix(".elf"))
+            sig = (sym['begin_signature'], sym['end_signature'])
+        jobs.append(Job(str(fw), read_hex_bytes(fw), sig))
+
+    results = {}
+    with FsocBatch(args.lib) as batch:
+        for job, res in batch.run_queue(jobs, args.max_cycles):
+            if 'signature' in res:
+                with open(Path(job.name).parent / "DUT-fazyrv.signature", 'w') as f:
+                    f.write(res.pop('signature'))
+            results[job.name] = res
+            print(f"{job.name:40} {res['status']:8} {res['cycles']}")
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if any(r['status'] != "PASS" for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  fsoc_lib.py
+# Usage  :  ctypes binding of the fsoc model built as shared library
+#           (fsoc_sim_build.py --flavor lib). Runs firmwares in-process:
+#             sim = Fsoc("work_lib/Vfsoc_sim")
+#             sim.load_hex("firmware.hex"); sim.reset()
+#             sim.run(10**6, gpo_mask=0x1)
+#           python3 fsoc_lib.py <lib> <fw.hex> prints the embench bench time.
+# -----------------------------------------------------------------------------
+
+import ctypes
+import argparse
+import subprocess
+from pathlib import Path
+
+from makehex import read_hex, read_hex_runs
+
+GPO_TIMING  = 0x1
+GPO_SUCCESS = 0x2
+GPO_FAIL    = 0x4
+
+_libs = {}
+
+def _load(path):
+    """Load the library once per path and declare the C API."""
+    path = str(Path(path).resolve())
+    if path not in _libs:
+        lib = ctypes.CDLL(path)
+        h, u32, u64 = ctypes.c_void_p, ctypes.c_uint32, ctypes.c_uint64
+        buf = ctypes.c_char_p
+        for name, res, args in [
+            ("fsoc_new",      h,    [ctypes.c_char_p]),
+            ("fsoc_delete",   None, [h]),
+            ("fsoc_reset",    None, [h, u32]),
+            ("fsoc_memsize",  u32,  [h]),
+            ("fsoc_write",    None, [h, u32, buf, u32]),
+            ("fsoc_read",     None, [h, u32, buf, u32]),
+            ("fsoc_run",      u64,  [h, u64, u32]),
+            ("fsoc_gpo",      u32,  [h]),
+            ("fsoc_cycles",   u64,  [h]),
+            ("fsoc_instret",  u64,  [h]),
+            ("fsoc_finished", ctypes.c_int, [h]),
+            ("fsoc_hang",     ctypes.c_int, [h]),
+        ]:
+            getattr(lib, name).restype = res
+            getattr(lib, name).argtypes = args
+        _libs[path] = lib
+    return _libs[path]
+
+
+def read_hex_bytes(path):
+    """Read a (sparse) hex image as written by makehex.py into bytes."""
+    return bytes(read_hex(path))
+
+
+def elf_symbols(elf):
+    """Map symbol names of an ELF to their addresses (via nm)."""
+    nm = subprocess.run(['riscv32-unknown-elf-nm', str(elf)], stdout=subprocess.PIPE, check=True)
+    symbols = {}
+    for line in nm.stdout.decode().splitlines():
+        parts = line.split()
+        if len(parts) == 3:
+            symbols[parts[2]] = int(parts[0], 16)
+    return symbols
+
+
+class Fsoc:
+    """One instance of the fsoc model. plusargs are passed to the model as on
+       the command line, e.g., "+signature=DUT-fazyrv.signature"."""
+
+    def __init__(self, lib, plusargs=""):
+        self.lib = _load(lib)
+        self.h = self.lib.fsoc_new(plusargs.encode())
+
+    def close(self):
+        if self.h is not None:
+            self.lib.fsoc_delete(self.h)
+            self.h = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def memsize(self):
+        return self.lib.fsoc_memsize(self.h)
+
+    def load(self, data, adr=0):
+        """Write firmware (or any data) to the memory at byte address adr."""
+        assert adr % 4 == 0 and adr + len(data) <= self.memsize
+        self.lib.fsoc_write(self.h, adr, bytes(data), len(data))
+
+    def load_hex(self, path, adr=0):
+        """Load the populated ranges of a (sparse) hex image only."""
+        for run_adr, data in read_hex_runs(path):
+            self.load(data, adr + run_adr)
+
+    def read(self, adr, size):
+        assert adr % 4 == 0 and adr + size <= self.memsize
+        buf = ctypes.create_string_buffer(size)
+        self.lib.fsoc_read(self.h, adr, buf, size)
+        return buf.raw
+
+    def reset(self, cycles=4):
+        """Reset the core and counters; the memory keeps its contents."""
+        self.lib.fsoc_reset(self.h, cycles)
+
+    def run(self, cycles, gpo_mask=0):
+        """Run at most the given cycles, stop early if a GPO in gpo_mask changes,
+           the model finishes, or hangs. Returns the cycles run."""
+        return self.lib.fsoc_run(self.h, cycles, gpo_mask)
+
+    @property
+    def gpo(self):
+        return self.lib.fsoc_gpo(self.h)
+
+    @property
+    def cycles(self):
+        return self.lib.fsoc_cycles(self.h)
+
+    @property
+    def instret(self):
+        return self.lib.fsoc_instret(self.h)
+
+    @property
+    def finished(self):
+        return bool(self.lib.fsoc_finished(self.h))
+
+    @property
+    def hang(self):
+        """Set when the watchdog (+watchdog=<cycles>) detected a hang."""
+        return bool(self.lib.fsoc_hang(self.h))
+
+    def signature(self, begin, end):
+        """Signature region [begin, end) formatted as RISCOF expects it."""
+        data = self.read(begin, end - begin)
+        return ''.join(f"{int.from_bytes(data[i:i+4], 'little'):08x}\n"
+                       for i in range(0, len(data), 4))
+
+    def run_embench(self, max_cycles):
+        """Run an embench firmware. Returns the cycles of the measured region,
+           or None if the run failed or did not complete."""
+        self.reset()
+        self.run(max_cycles, GPO_TIMING)
+        start = self.cycles
+        if self.hang or not self.gpo & GPO_TIMING:
+            return None
+        self.run(max_cycles, GPO_TIMING)
+        bench = self.cycles - start
+        self.run(max_cycles, GPO_SUCCESS | GPO_FAIL)
+        return bench if (self.gpo & GPO_SUCCESS) and not self.hang else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an embench firmware in-process")
+
+    parser.add_argument(
+        'lib',
+        type=Path,
+        help='Model built with fsoc_sim_build.py --flavor lib'
+    )
+
+    parser.add_argument(
+        'firmware',
+        type=Path,
+        help='Firmware hex as written by makehex.py'
+    )
+
+    parser.add_argument(
+        '--max_cycles',
+        type=int,
+        default=10**9,
+        help='Cycle limit per phase (default: %(default)s)'
+    )
+
+    args = parser.parse_args()
+
+    with Fsoc(args.lib) as sim:
+        sim.load_hex(args.firmware)
+        bench = sim.run_embench(args.max_cycles)
+    print(f"Bench time: {bench if bench is not None else 0}")
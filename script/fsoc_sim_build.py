@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  fsoc_sim_build.py
+# Usage  :  Build the fsoc Verilator model (Vfsoc_sim) in different flavors:
+#           plain, fast (-O3, --x-assign fast), mt (fast + --threads) and pgo
+#           (fast + two-pass profile-guided C++ build trained on a firmware).
+#           lib builds a shared library for in-process use (fsoc_lib.py),
+#           batch one with --ninst instances (fsoc_batch.py).
+# -----------------------------------------------------------------------------
+
+import os
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+
+fazyrv_root = Path(__file__).resolve().parent.parent
+
+FLAVORS = {
+    "plain": "verilator_tb",
+    "fast":  "verilator_tb_fast",
+    "mt":    "verilator_tb_mt",
+    "pgo":   "verilator_tb_fast",
+    "lib":   "verilator_lib",
+    "batch": "verilator_batch",
+}
+
+# Flavors that build an executable model (lib and batch are shared libraries)
+EXECUTABLES = ["plain", "fast", "mt", "pgo"]
+
+def build_args(parser):
+    parser.add_argument(
+        '--flavor',
+        type=str,
+        default="plain",
+        choices=FLAVORS.keys(),
+        help='Build flavor of the simulation model (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--work_root',
+        type=Path,
+        default=Path("work_simfsoc"),
+        help='FuseSoC work root of the model (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--chunksize',
+        type=int,
+        default=8,
+        help='Bit width of data path (1, 2, 4, 8)'
+    )
+
+    parser.add_argument(
+        '--conf',
+        type=str,
+        default="MIN",
+        help='Config of core ("MIN", "INT", "CSR")'
+    )
+
+    parser.add_argument(
+        '--rftype',
+        type=str,
+        default="BRAM",
+        help='Regfile implementation ("LOGIC", "BRAM", "BRAM_BP")'
+    )
+
+    parser.add_argument(
+        '--rvc',
+        type=str,
+        default="NONE",
+        help='Compressed instruction support ("NONE", "COMB", "REG", "HYBR")'
+    )
+
+    parser.add_argument(
+        '--memsize',
+        type=int,
+        default=131072,
+        help='Memory size in bytes (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--train',
+        type=Path,
+        default=None,
+        help='Firmware hex to train the pgo flavor on'
+    )
+
+    parser.add_argument(
+        '--train_cycles',
+        type=int,
+        default=2000000,
+        help='Cycles to simulate for pgo training (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--signature',
+        action='store_true',
+        help='Build with signature dump and halt (RISCOF)'
+    )
+
+    parser.add_argument(
+        '--sparse_mem',
+        action='store_true',
+        help='Build with the paged memory backend, for large memsizes'
+    )
+
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Build the core with the instruction prefetch buffer'
+    )
+
+    parser.add_argument(
+        '--hpm',
+        action='store_true',
+        help='Build the core with the event counters (CONF CSR)'
+    )
+
+    parser.add_argument(
+        '--ninst',
+        type=int,
+        default=8,
+        help='Number of instances of the batch flavor (default: %(default)s)'
+    )
+
+
+def fusesoc_cmd(target, work_root, chunksize, conf, rftype, rvc, memsize, signature=False,
+                ninst=None, sparse_mem=False, prefetch=False, hpm=False):
+    return ["fusesoc", "run", f"--target={target}", "--build", f"--work-root={work_root}", "fsoc",
+            f"--MEMSIZE={memsize}", f"--CHUNKSIZE={chunksize}", f"--CONF={conf}",
+            f"--RFTYPE={rftype}", f"--RVC={rvc}", "--BOOTADR=0", "--DEBUG=1", "--SIM=1"] \
+            + (["--SIGNATURE=1"] if signature else []) \
+            + (["--SPARSE_MEM=1"] if sparse_mem else []) \
+            + (["--PREFETCH=1"] if prefetch else []) \
+            + (["--HPM=1"] if hpm else []) \
+            + ([f"--NINST={ninst}"] if ninst is not None else [])
+
+
+def model_path(work_root, flavor="plain"):
+    return Path(work_root) / ("Vfsoc_batch" if flavor == "batch" else "Vfsoc_sim")
+
+
+def build(flavor, work_root, chunksize, conf, rftype, rvc="NONE", memsize=131072,
+          train=None, train_cycles=2000000, signature=False, ninst=8, sparse_mem=False,
+          prefetch=False, hpm=False):
+    """Build the model and return the path to the executable."""
+    work_root = Path(work_root).resolve()
+    cmd = fusesoc_cmd(FLAVORS[flavor], work_root, chunksize, conf, rftype, rvc, memsize, signature,
+                      ninst if flavor == "batch" else None, sparse_mem, prefetch, hpm)
+    if flavor != "pgo":
+        subprocess.run(cmd, check=True)
+        return model_path(work_root, flavor)
+
+    if train is None:
+        raise ValueError("pgo flavor requires a training firmware")
+
+    # Both passes build in work_root: with -fprofile-generate=DIR, gcc names
+    # the profile after the absolute object path, which must match in pass 2.
+    profile_dir = work_root.with_name(work_root.name + "_profile")
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    shutil.rmtree(work_root, ignore_errors=True)
+
+    # pass 1: instrumented model, collect the profile on the training firmware
+    gen_env = os.environ | {"OPT": f"-fprofile-generate={profile_dir}",
+                            "LDFLAGS": f"-fprofile-generate={profile_dir}"}
+    subprocess.run(cmd, env=gen_env, check=True)
+    subprocess.run([model_path(work_root), f"+firmware={Path(train).resolve()}",
+                    f"+max_cycles={train_cycles}"], cwd=work_root, check=True)
+    if not any(profile_dir.glob("*.gcda")):
+        raise RuntimeError(f"pgo training wrote no profile to {profile_dir}")
+
+    # pass 2: optimized model using the collected profile; remove the
+    # instrumented objects so that make compiles them again
+    for f in [*work_root.glob("*.o"), *work_root.glob("*.a"), model_path(work_root)]:
+        f.unlink(missing_ok=True)
+    use_env = os.environ | {"OPT": f"-fprofile-use={profile_dir} -fprofile-correction",
+                            "LDFLAGS": f"-fprofile-use={profile_dir}"}
+    subprocess.run(cmd, env=use_env, check=True)
+    return model_path(work_root)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the fsoc simulation model")
+    build_args(parser)
+    args = parser.parse_args()
+    if args.flavor == "pgo" and args.train is None:
+        parser.error("the pgo flavor requires --train")
+
+    model = build(args.flavor, args.work_root, args.chunksize, args.conf, args.rftype,
+                  args.rvc, args.memsize, args.train, args.train_cycles, args.signature, args.ninst,
+                  args.sparse_mem, args.prefetch, args.hpm)
+    print(model)
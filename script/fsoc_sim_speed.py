@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  fsoc_sim_speed.py
+# Usage  :  Benchmark the simulation speed (simulated cycles per second) of
+#           the fsoc Verilator model for each build flavor.
+# -----------------------------------------------------------------------------
+
+import re
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+from fsoc_sim_build import EXECUTABLES, build
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Report simulated cycles per second for each model flavor"
+    )
+
+    parser.add_argument(
+        "firmware",
+        type=Path,
+        help="Firmware hex to simulate (also used to train the pgo flavor)"
+    )
+
+    parser.add_argument(
+        "--flavors",
+        type=str,
+        nargs="+",
+        choices=EXECUTABLES,
+        default=EXECUTABLES,
+        help="Flavors to benchmark (default: all executable flavors)"
+    )
+
+    parser.add_argument(
+        "--cycles",
+        type=int,
+        default=5000000,
+        help="Cycles to simulate per run (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        default=Path("work_simspeed"),
+        help="Directory for the models (default: %(default)s)"
+    )
+
+    parser.add_argument("--chunksize", type=int, default=1, help="Bit width of data path")
+    parser.add_argument("--conf", type=str, default="MIN", help="Config of core")
+    parser.add_argument("--rftype", type=str, default="BRAM", help="Regfile implementation")
+    parser.add_argument("--rvc", type=str, default="NONE", help="Compressed instruction support")
+
+    return parser.parse_args()
+
+
+def measure(model, firmware, cycles):
+    """Run the model and return (simulated cycles, wall-clock seconds)."""
+    start = time.perf_counter()
+    res = subprocess.run([model, f"+firmware={firmware.resolve()}", f"+max_cycles={cycles}"],
+                         cwd=model.parent, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+
+    sim_re = re.findall(r'(?<=Simulated cycles: )[0-9]+', res.stdout.decode('utf-8'))
+    return (int(sim_re[-1]) if sim_re else 0), elapsed
+
+
+def main():
+    args = parse_args()
+
+    rows = []
+    for flavor in args.flavors:
+        model = build(flavor, args.workdir / flavor, args.chunksize, args.conf, args.rftype,
+                      args.rvc, train=args.firmware, train_cycles=args.cycles // 4)
+        cycles, elapsed = measure(model, args.firmware, args.cycles)
+        rows.append((flavor, cycles, elapsed))
+
+    base = rows[0][1] / rows[0][2] if rows and rows[0][2] > 0 else 0
+    print(f"{'Flavor':8} {'Cycles':>12} {'Time/s':>10} {'Cycles/s':>12} {'Speedup':>8}")
+    for flavor, cycles, elapsed in rows:
+        cps = cycles / elapsed if elapsed > 0 else 0
+        print(f"{flavor:8} {cycles:12} {elapsed:10.2f} {cps:12.0f} {cps / base if base else 0:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
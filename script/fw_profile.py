@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  fw_profile.py
+# Usage  :  Attributes the cycles of an instruction timing trace (+timing=<file>
+#           of the fsoc model) to the functions and basic blocks of the
+#           firmware, using the symbol table of its ELF file.
+#           python3 fw_profile.py <firmware.elf> <trace[.gz]> [--collapsed <file>]
+#           Prints a flat profile and the hottest basic blocks; --collapsed
+#           writes the call stacks in the collapsed format of flamegraph.pl.
+# Limit. :  An instruction is charged the cycles until the next one is
+#           fetched, i.e., its execution plus the next fetch. Call stacks are
+#           reconstructed from jal/jalr that link ra or t0 and returns via
+#           these registers; traps replace the frame they interrupt.
+# -----------------------------------------------------------------------------
+
+import argparse
+from pathlib import Path
+from collections import defaultdict
+
+from elfread import read_elf, functions, SymbolMap
+from hpm_decode import parse_timing
+
+BRANCH  = {"beq", "bne", "blt", "bge", "bltu", "bgeu", "c.beqz", "c.bnez"}
+JUMP    = {"jal", "jalr", "c.j", "c.jal", "c.jr", "c.jalr", "mret", "ecall", "ebreak", "c.ebreak"}
+
+LINK    = {1, 5}
+
+# Kind of control transfer of an instruction
+PLAIN, CALL, RET, OTHER = range(4)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Per-function cycle profile of an instruction timing trace")
+
+    parser.add_argument(
+        'elf',
+        type=Path,
+        help='Firmware ELF file with symbol table'
+    )
+
+    parser.add_argument(
+        'timing',
+        type=Path,
+        help='Instruction timing trace (+timing=<file>) of the firmware'
+    )
+
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=25,
+        help='Number of functions in the flat profile (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--blocks',
+        type=int,
+        default=10,
+        help='Number of basic blocks to report (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--collapsed',
+        type=Path,
+        default=None,
+        help='Write the call stacks with their cycles in collapsed format'
+    )
+
+    return parser.parse_args()
+
+
+def insn_len(instr):
+    return 4 if (instr & 0b11) == 0b11 else 2
+
+
+def transfer(mnem, instr):
+    """Whether an instruction calls, returns, or otherwise changes the flow."""
+    if mnem in ("jal", "jalr"):
+        rd, rs1 = (instr >> 7) & 0x1f, (instr >> 15) & 0x1f
+        if rd in LINK:
+            return CALL
+        if mnem == "jalr" and rd == 0 and rs1 in LINK:
+            return RET
+        return OTHER
+    if mnem in ("c.jal", "c.jalr"):
+        return CALL
+    if mnem == "c.jr":
+        return RET if ((instr >> 7) & 0x1f) in LINK else OTHER
+    if mnem in BRANCH or mnem in JUMP:
+        return OTHER
+    return PLAIN
+
+
+def profile(entries, syms):
+    """Cycles per function, basic block, and call stack of the trace."""
+    funcs   = defaultdict(lambda: {"self": 0, "incl": 0, "instrs": 0, "calls": 0})
+    blocks  = defaultdict(lambda: {"cycles": 0, "instrs": 0, "execs": 0})
+    stacks  = defaultdict(int)
+
+    stack = []
+    kind = OTHER
+    block = None
+    prev = None
+    # last entry has no successor to derive its cycles from
+    for i in range(len(entries) - 1):
+        mnem, cycle, instr, pc = entries[i]
+        cycles = entries[i+1][1] - cycle
+        fn = syms.name(pc)
+
+        if not stack:
+            stack = [fn]
+        elif kind == CALL:
+            stack.append(fn)
+            funcs[fn]["calls"] += 1
+        elif kind == RET and len(stack) > 1:
+            stack.pop()
+        if stack[-1] != fn:
+            stack[-1] = fn
+
+        # a block starts after a control transfer or at a discontinuity
+        if kind != PLAIN or prev is None or pc != prev[3] + insn_len(prev[2]):
+            block = pc
+            blocks[block]["execs"] += 1
+
+        funcs[fn]["self"] += cycles
+        funcs[fn]["instrs"] += 1
+        blocks[block]["cycles"] += cycles
+        blocks[block]["instrs"] += 1
+        stacks[tuple(stack)] += cycles
+
+        kind = transfer(mnem, instr)
+        prev = entries[i]
+
+    for stk, cycles in stacks.items():
+        for fn in set(stk):
+            funcs[fn]["incl"] += cycles
+
+    return funcs, blocks, stacks
+
+
+def print_flat(funcs, total, top):
+    print(f"{'self cyc':>12} {'self %':>7} {'incl cyc':>12} {'incl %':>7} "
+          f"{'instrs':>10} {'CPI':>6} {'calls':>8}  function")
+    for fn, f in sorted(funcs.items(), key=lambda x: -x[1]["self"])[:top]:
+        print(f"{f['self']:>12} {100*f['self']/total:>7.2f} {f['incl']:>12} {100*f['incl']/total:>7.2f} "
+              f"{f['instrs']:>10} {f['self']/max(f['instrs'], 1):>6.2f} {f['calls']:>8}  {fn}")
+
+
+def print_blocks(blocks, syms, total, top):
+    print(f"{'cycles':>12} {'%':>7} {'execs':>10} {'instrs':>7} {'CPI':>6}  block")
+    for adr, b in sorted(blocks.items(), key=lambda x: -x[1]["cycles"])[:top]:
+        name, off = syms.lookup(adr)
+        loc = f"{name}+0x{off:x}" if name is not None else "??"
+        print(f"{b['cycles']:>12} {100*b['cycles']/total:>7.2f} {b['execs']:>10} "
+              f"{b['instrs']/b['execs']:>7.1f} {b['cycles']/max(b['instrs'], 1):>6.2f}  0x{adr:08x} {loc}")
+
+
+def write_collapsed(stacks, path):
+    with open(path, 'w') as f:
+        for stk, cycles in sorted(stacks.items()):
+            f.write(f"{';'.join(stk)} {cycles}\n")
+
+
+def main():
+    args = parse_args()
+    syms = SymbolMap(functions(read_elf(args.elf)))
+    entries = parse_timing(args.timing)
+    if len(entries) < 2:
+        print(f"No instructions in {args.timing}")
+        exit(1)
+    if entries[0][3] is None:
+        print(f"{args.timing} has no pc, rebuild the model to record it")
+        exit(1)
+
+    funcs, blocks, stacks = profile(entries, syms)
+    total = max(entries[-1][1] - entries[0][1], 1)
+
+    print(f"{len(entries)} instructions, {total} cycles, CPI {total/len(entries):.2f}\n")
+    print_flat(funcs, total, args.top)
+    if args.blocks:
+        print()
+        print_blocks(blocks, syms, total, args.blocks)
+    if args.collapsed:
+        write_collapsed(stacks, args.collapsed)
+
+
+if __name__ == "__main__":
+    main()
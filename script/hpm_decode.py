@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  hpm_decode.py
+# Usage  :  Decodes the counter records that firmware stores with
+#           fazyrv_hpm_snapshot() (soc/embench/verilator/fazyrv_hpm.h) from a
+#           memory dump. The dump is a (sparse) hex image, as written by the
+#           fsoc model with +memdump=<file>, or a raw binary, e.g., read from
+#           a board. Two consecutive records are reported as region.
+#           python3 hpm_decode.py <dump> [--timing <trace>]
+#           --timing cross-checks the region with the instruction timing trace
+#           (+timing=<file>) of the same run.
+# Limit. :  The counters are 32 bits wide and wrap after 2^32 events.
+# -----------------------------------------------------------------------------
+
+import gzip
+import argparse
+from pathlib import Path
+
+from makehex import read_hex
+
+MAGIC = 0x4d504846
+
+# Words of struct fazyrv_hpm after magic
+RECORD = ["tag", "cycle", "instret", "ifstall", "dmstall", "branch", "shift", "ldst"]
+
+COUNTERS = {
+    "cycle":    "cycles",
+    "instret":  "instructions retired",
+    "ifstall":  "instr. fetch stall cycles",
+    "dmstall":  "data memory stall cycles",
+    "branch":   "taken branches",
+    "shift":    "shift cycles",
+    "ldst":     "loads and stores",
+}
+
+LDST = {"lb", "lh", "lw", "lbu", "lhu", "sb", "sh", "sw",
+        "c.lw", "c.sw", "c.lwsp", "c.swsp"}
+BRANCH = {"beq", "bne", "blt", "bge", "bltu", "bgeu", "c.beqz", "c.bnez"}
+
+# Instruction classes of the timing trace; others are "alu"
+CLASSES = {
+    "load":     {"lb", "lh", "lw", "lbu", "lhu", "c.lw", "c.lwsp"},
+    "store":    {"sb", "sh", "sw", "c.sw", "c.swsp"},
+    "branch":   BRANCH,
+    "jump":     {"jal", "jalr", "c.j", "c.jal", "c.jr", "c.jalr"},
+    "shift":    {"sll", "srl", "sra", "slli", "srli", "srai", "c.slli", "c.srli", "c.srai"},
+    "csr":      {"csrrw", "csrrs", "csrrc", "csrrwi", "csrrsi", "csrrci"},
+    "system":   {"ecall", "ebreak", "c.ebreak", "mret", "wfi", "fence"},
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Decode FazyRV performance counters from a memory dump")
+
+    parser.add_argument(
+        'dump',
+        type=Path,
+        help='Memory dump, hex image or raw binary (.bin)'
+    )
+
+    parser.add_argument(
+        '--base',
+        type=lambda x: int(x, 0),
+        default=0,
+        help='Address of the first byte of the dump (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--timing',
+        type=Path,
+        default=None,
+        help='Instruction timing trace of the same run to cross-check'
+    )
+
+    return parser.parse_args()
+
+
+def read_dump(path):
+    if path.suffix == ".bin":
+        return path.read_bytes()
+    return bytes(read_hex(path))
+
+
+def records(data, base=0):
+    """Find all records in the dump. Returns a list of dicts incl. the
+       address, ordered by cycle."""
+    recs = []
+    words = len(RECORD) + 1
+    for adr in range(0, len(data) - 4*words + 1, 4):
+        if int.from_bytes(data[adr:adr+4], 'little') != MAGIC:
+            continue
+        vals = [int.from_bytes(data[adr+4*i:adr+4*i+4], 'little') for i in range(1, words)]
+        recs.append({"adr": base + adr} | dict(zip(RECORD, vals)))
+    return sorted(recs, key=lambda r: r["cycle"])
+
+
+def region(start, stop):
+    """Counter differences between two records, modulo the counter width."""
+    return {k: (stop[k] - start[k]) % 2**32 for k in COUNTERS}
+
+
+def derived(cnt):
+    """Ratios that explain where the cycles were spent."""
+    cyc, ins = max(cnt["cycle"], 1), max(cnt["instret"], 1)
+    return {
+        "CPI":                  cnt["cycle"] / ins,
+        "fetch stall share":    cnt["ifstall"] / cyc,
+        "data stall share":     cnt["dmstall"] / cyc,
+        "shift share":          cnt["shift"] / cyc,
+        "taken branches/insn":  cnt["branch"] / ins,
+        "loads+stores/insn":    cnt["ldst"] / ins,
+    }
+
+
+def parse_timing(path):
+    """Entries (mnemonic, cycle, instruction word, pc) of a timing trace,
+       which may be gzipped. The pc is None for traces of models that do not
+       record it."""
+    entries = []
+    with (gzip.open if str(path).endswith(".gz") else open)(path, 'rt') as f:
+        for line in f:
+            if not line.startswith("##"):
+                continue
+            mnem, rest = line[2:].split(None, 1)
+            cycle, instr = rest.split(',')[:2]
+            fields = instr.split()
+            pc = int(fields[1], 16) if len(fields) > 1 else None
+            entries.append((mnem, int(cycle), int(fields[0], 16), pc))
+    return entries
+
+
+def insn_class(mnem):
+    return next((c for c, m in CLASSES.items() if mnem in m), "alu")
+
+
+def class_cycles(entries):
+    """{class: (instructions, cycles)} of a timing trace. The cycles of an
+       instruction last until the next one starts; the last one is not
+       counted."""
+    out = {}
+    for cur, nxt in zip(entries, entries[1:]):
+        n, c = out.get(insn_class(cur[0]), (0, 0))
+        out[insn_class(cur[0])] = (n + 1, c + nxt[1] - cur[1])
+    return out
+
+
+def taken(entries, i):
+    """Whether the branch entries[i] is taken, or None without pc."""
+    pc, nxt = entries[i][3], entries[i+1][3]
+    if pc is None or nxt is None:
+        return None
+    return nxt != pc + (4 if (entries[i][2] & 0b11) == 0b11 else 2)
+
+
+def timing_region(entries):
+    """Counts of the trace between the first two cycle reads, which are the
+       first instructions of fazyrv_hpm_snapshot()."""
+    # csrrs rd, cycle, x0
+    marks = [i for i, e in enumerate(entries) if (e[2] & 0xfff0707f) == 0xc0002073]
+    if len(marks) < 2:
+        return None
+    seg = range(marks[0], marks[1])
+    branches = [i for i in seg if entries[i][0] in BRANCH]
+    with_pc = entries[marks[0]][3] is not None
+    return {
+        "cycle":    entries[marks[1]][1] - entries[marks[0]][1],
+        "instret":  len(seg),
+        "ldst":     sum(entries[i][0] in LDST for i in seg),
+        "branch":   sum(bool(taken(entries, i)) for i in branches) if with_pc else len(branches),
+        "with_pc":  with_pc,
+    }
+
+
+def print_counters(cnt, ref=None):
+    for k, name in COUNTERS.items():
+        line = f"  {name:<28} {cnt[k]:>12}"
+        if ref is not None and k in ref:
+            line += f"   trace: {ref[k]:>12}"
+            if k == "branch" and not ref["with_pc"]:
+                line += " (executed)"
+            elif ref[k] != cnt[k]:
+                line += "   MISMATCH"
+        print(line)
+
+
+def main():
+    args = parse_args()
+    recs = records(read_dump(args.dump), args.base)
+    if not recs:
+        print(f"No counter records in {args.dump}")
+        exit(1)
+
+    for r in recs:
+        print(f"Record tag {r['tag']} @ 0x{r['adr']:08x}")
+        print_counters(r)
+
+    if len(recs) < 2:
+        return
+
+    cnt = region(recs[0], recs[1])
+    ref = timing_region(parse_timing(args.timing)) if args.timing else None
+    print(f"Region tag {recs[0]['tag']} -> {recs[1]['tag']}")
+    print_counters(cnt, ref)
+    for k, v in derived(cnt).items():
+        print(f"  {k:<28} {v:>12.3f}")
+    if args.timing and ref is None:
+        print(f"  No snapshot found in {args.timing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,78 @@
-
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  makehex.py
+# Usage  :  python3 makehex.py <firmware.bin> <firmware.hex>
+#           Writes a sparse $readmemh image: only populated ranges are
+#           emitted, each preceded by an @<word address> record. Runs of
+#           zero words are skipped, the memory reads them as zero.
+# -----------------------------------------------------------------------------
 
 from sys import argv
 
-binfile = argv[1]
-hexfile = argv[2]
-
-with open(binfile, "rb") as f, open(hexfile, "w") as fout:
-  cnt = 3
-  s = ["00"]*4
-  while True:
-    data = f.read(1)
-    if not data:
-      fout.write(''.join(s)+'\n')
-      exit(0)
-    s[cnt] = "{:02X}".format(data[0])
-    if cnt == 0:
-      fout.write(''.join(s)+'\n')
-      s = ["00"]*4
-      cnt = 4
-    cnt -= 1
\ No newline at end of file
+# Zero runs shorter than this are emitted rather than skipped
+MIN_GAP = 8
+
+def hex_lines(data, min_gap=MIN_GAP):
+    """Yield the lines of a sparse hex image of data (little endian words)."""
+    data = bytes(data) + bytes(-len(data) % 4)
+    words = [int.from_bytes(data[i:i+4], 'little') for i in range(0, len(data), 4)]
+    i = 0
+    while i < len(words):
+        if words[i] == 0:
+            i += 1
+            continue
+        # populated range up to the next gap of min_gap zero words
+        end, zeros = i, 0
+        while end < len(words) and zeros < min_gap:
+            zeros = zeros + 1 if words[end] == 0 else 0
+            end += 1
+        end -= zeros
+        yield f"@{i:08X}"
+        for w in words[i:end]:
+            yield f"{w:08X}"
+        i = end
+
+
+def write_hex(data, hexfile):
+    with open(hexfile, "w") as fout:
+        for line in hex_lines(data):
+            fout.write(line + '\n')
+
+
+def makehex(binfile, hexfile):
+    with open(binfile, "rb") as f:
+        write_hex(f.read(), hexfile)
+
+
+def read_hex_runs(path):
+    """Read a dense or sparse hex image. Returns a list of (byte address, data)."""
+    runs, adr, cur = [], 0, bytearray()
+    with open(path, 'r') as f:
+        for tok in f.read().split():
+            if tok.startswith('@'):
+                if cur:
+                    runs.append((adr, cur))
+                adr, cur = 4*int(tok[1:], 16), bytearray()
+            else:
+                cur += int(tok, 16).to_bytes(4, 'little')
+    if cur:
+        runs.append((adr, cur))
+    return runs
+
+
+def read_hex(path, size=None):
+    """Read a dense or sparse hex image into a flat bytearray. Its length is
+       size if given, else the end of the last populated range."""
+    runs = read_hex_runs(path)
+    if size is None:
+        size = max((adr + len(d) for adr, d in runs), default=0)
+    mem = bytearray(size)
+    for adr, d in runs:
+        assert adr + len(d) <= size, f"{path} exceeds {size} bytes"
+        mem[adr:adr+len(d)] = d
+    return mem
+
+
+if __name__ == "__main__":
+    makehex(argv[1], argv[2])
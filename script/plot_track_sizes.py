@@ -11,6 +11,8 @@ import argparse
 from pathlib import Path
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+from seed_sweep import significant, MIN_SEEDS
+import results_db
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -26,7 +28,9 @@ def parse_args():
     parser.add_argument(
         "report_soc_dir",
         type=Path,
-        help="Path to the directory containing the soc summary reports"
+        nargs="?",
+        default=None,
+        help="Path to the directory containing the soc summary reports (or use --db)"
     )
     
     parser.add_argument(
@@ -50,22 +54,168 @@ def parse_args():
         help="Path to write the ascii plot (default: %(default)s)"
     )
 
+    parser.add_argument(
+        "--modules_svg",
+        type=Path,
+        default=None,
+        help="Path to write the LUTs per module as stacked bars (default: none)"
+    )
+
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Directory of baseline reports (revision with --db); per-module deltas and significant fmax changes are added to the ascii plot"
+    )
+
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="Read the reports from a results database (results_db.py) instead of report_soc_dir"
+    )
+
+    parser.add_argument(
+        "--rev",
+        type=str,
+        default=None,
+        help="Revision of the reports in --db (default: latest)"
+    )
+
+    parser.add_argument(
+        "--trend_svg",
+        type=Path,
+        default=None,
+        help="Path to write LUTs and fmax of each config over the revisions in --db (default: none)"
+    )
+
+    parser.add_argument(
+        "--ref",
+        type=str,
+        default=None,
+        help="Directory of reference reports (revision with --db) for the thresholds (default with --db: previous revision)"
+    )
+
+    parser.add_argument(
+        "--base",
+        type=str,
+        default=None,
+        help="Directory of fixed baseline reports (revision with --db), checked against the thresholds in addition to --ref to catch growth over several revisions"
+    )
+
+    parser.add_argument(
+        "--lut_threshold",
+        type=float,
+        default=None,
+        help="Fail if the LUTs of a config grow by more than this percentage over the reference"
+    )
+
+    parser.add_argument(
+        "--fmax_threshold",
+        type=float,
+        default=None,
+        help="Fail if the fmax of a config drops by more than this percentage below the reference"
+    )
+
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level of fmax changes over placement seeds (default: %(default)s)"
+    )
+
     args = parser.parse_args()
+    if args.report_soc_dir is None and args.db is None:
+        parser.error("report_soc_dir or --db is required")
+    if args.trend_svg is not None and args.db is None:
+        parser.error("--trend_svg requires --db")
     return args
 
-def from_json_summary(file_path, element):
-    with open(file_path, 'r') as file:
-        d = json.load(file)
+def load(folder, file_prefix):
+    """Reports of an arch, {config: report}."""
+    configs = {}
+    for f in glob.glob(f"{folder}/{file_prefix}-*"):
+        with open(f, 'r') as file:
+            configs['-'.join(Path(f).stem.split("-")[1:])] = json.load(file)
+    return configs
+
+def from_json_summary(d, element):
+    """The fmax is the median over placement seeds if there is a seed sweep."""
+    if element == "fmax" and 'fmax_seeds' in d:
+        return float(d['fmax_seeds']['median'])
     return float(d['summary'][element])
 
-def get_ascii_plot(folder, file_prefix, plot_title, element, commit):
-    file_paths = glob.glob(f"{folder}/{file_prefix}-*")
+def read_seeds(reports):
+    return {config: d['fmax_seeds'] for config, d in reports.items() if d.get('fmax_seeds')}
+
+def read_modules(reports):
+    """LUTs per module (without submodules) of each config, {config: {module: lut}}."""
+    return {config: {m: r['self']['lut'] for m, r in d['modules'].items()}
+            for config, d in reports.items() if d.get('modules')}
+
+def get_ascii_deltas(reports, baseline, plot_title, commit):
+    new = read_modules(reports)
+    old = read_modules(baseline)
+    txt = ""
+
+    graph = Pyasciigraph(
+        separator_length=2,
+        titlebar='-',
+        graphsymbol='*'
+        )
+
+    for config in sorted(set(new) & set(old)):
+        deltas = [(m, new[config].get(m, 0) - old[config].get(m, 0))
+                  for m in sorted(set(new[config]) | set(old[config]))]
+        deltas = [(m, d) for m, d in deltas if d != 0]
+        if not deltas:
+            continue
+        for line in graph.graph(f'{plot_title} {config} (latest update: {commit})', sorted(deltas, key=lambda x: x[1])):
+            txt += line + "\n"
+    return txt
+
+def get_ascii_fmax_changes(reports, baseline, alpha, commit):
+    new = read_seeds(reports)
+    old = read_seeds(baseline)
+    common = sorted(set(new) & set(old))
+    if not common:
+        return ""
 
+    changes = []
+    few = []
+    for config in common:
+        p, flag = significant(new[config], old[config], alpha)
+        if flag is None:
+            few.append(config)
+        elif flag:
+            changes.append((f"{config} (p {p:.3f})", round(new[config]['median'] - old[config]['median'], 2)))
+
+    title = f'fsoc: significant change of median fmax, p < {alpha} (latest update: {commit})'
+    txt = ""
+    if few:
+        txt += (f"Warning: Too few seeds to reach p < {alpha} (at least {MIN_SEEDS} on each side "
+                f"at 0.05) in {len(few)} configurations: {', '.join(few)}\n")
+    if not changes:
+        return f"{title}\n{txt}No significant change in {len(common) - len(few)} configurations\n"
+
+    graph = Pyasciigraph(
+        separator_length=2,
+        titlebar='-',
+        graphsymbol='*'
+        )
+    for line in graph.graph(title, sorted(changes, key=lambda x: x[1])):
+        txt += line + "\n"
+    return txt
+
+def get_ascii_plot(reports, plot_title, element, commit):
     lables = []
     data = []
-    for f in file_paths:
-        lables.append('-'.join(Path(f).stem.split("-")[1:]))
-        data.append(from_json_summary(f, element))
+    for lable, d in reports.items():
+        seeds = d.get('fmax_seeds') if element == "fmax" else None
+        if seeds:
+            lable += f" ({seeds['min']:.1f}..{seeds['max']:.1f})"
+        lables.append(lable)
+        data.append(from_json_summary(d, element))
 
     data, lables = zip(*sorted(zip(data, lables)))
     txt = ""
@@ -80,7 +230,7 @@ def get_ascii_plot(folder, file_prefix, plot_title, element, commit):
         txt += line + "\n"
     return txt
 
-def get_vect_plot(folder, file_prefix, commit, save_to):
+def get_vect_plot(reports, commit, save_to):
     fig, axs = plt.subplots(figsize=(7, 2), ncols=2, sharey=True, gridspec_kw={'width_ratios': [1.5, 1]})
     fig.subplots_adjust(left=0.28, right=0.99, bottom=0.2, wspace=0.05)
 
@@ -89,9 +239,9 @@ def get_vect_plot(folder, file_prefix, commit, save_to):
     lables = []
     data = []
 
-    for f in glob.glob(f"{folder}/{file_prefix}-*"):
-        lables.append('-'.join(Path(f).stem.split("-")[1:]))
-        data.append(from_json_summary(f, "lut"))
+    for lable, d in reports.items():
+        lables.append(lable)
+        data.append(from_json_summary(d, "lut"))
 
     lables, data = zip(*sorted(zip(lables, data), reverse=True))
     
@@ -105,14 +255,20 @@ def get_vect_plot(folder, file_prefix, commit, save_to):
     
     # fmax
     #
+    # median and range over placement seeds, if available
     lables = []
     data = []
+    spread = [[], []]
 
-    for f in glob.glob(f"{folder}/{file_prefix}*"):
-        lables.append('-'.join(Path(f).stem.split("-")[1:]))
-        data.append(from_json_summary(f, "fmax"))
+    for lable, d in reports.items():
+        lables.append(lable)
+        data.append(from_json_summary(d, "fmax"))
+        seeds = d.get('fmax_seeds')
+        spread[0].append(data[-1] - seeds['min'] if seeds else 0)
+        spread[1].append(seeds['max'] - data[-1] if seeds else 0)
 
-    axs[1].barh(lables, data, color='dimgray')
+    axs[1].barh(lables, data, color='dimgray', xerr=spread if any(spread[0] + spread[1]) else None,
+                error_kw={'ecolor': 'black', 'capsize': 2, 'elinewidth': 1})
     axs[1].set_xlabel("fmax / MHz", labelpad=0)
     axs[1].grid(True, which='both', axis='x', linestyle='--', linewidth=1)
     axs[1].xaxis.set_major_locator(ticker.MultipleLocator(20))
@@ -122,32 +278,183 @@ def get_vect_plot(folder, file_prefix, commit, save_to):
         fig.savefig(save_to)
 
 
+def get_modules_plot(reports, file_prefix, commit, save_to):
+    configs = read_modules(reports)
+    if not configs:
+        print("No per-module counts in the reports, see area_modules.py.")
+        return
+
+    lables = sorted(configs, reverse=True)
+    total = {}
+    for mods in configs.values():
+        for m, n in mods.items():
+            total[m] = total.get(m, 0) + n
+    order = sorted(total, key=lambda m: -total[m])
+
+    fig, ax = plt.subplots(figsize=(7, max(2.5, 0.8 + 0.25*len(lables))))
+    fig.subplots_adjust(left=0.28, right=0.75, bottom=0.15)
+    fig.suptitle(f"fsoc: LUTs per module, {file_prefix} (latest update: {commit})", fontsize=10)
+
+    left = [0] * len(lables)
+    colors = plt.get_cmap('tab20')
+    for i, m in enumerate(order):
+        data = [configs[l].get(m, 0) for l in lables]
+        ax.barh(lables, data, left=left, color=colors(i % 20), label=m)
+        left = [a + b for a, b in zip(left, data)]
+
+    ax.set_xlabel("#LUT", labelpad=0)
+    ax.grid(True, which='both', axis='x', linestyle='--', linewidth=1)
+    ax.set_axisbelow(True)
+    ax.legend(loc='center left', bbox_to_anchor=(1.01, 0.5), fontsize=6, frameon=False)
+
+    if save_to is not None:
+        fig.savefig(save_to)
+
+
+def rev_order(series):
+    """Revisions of all configs by commit date, oldest first."""
+    return [r for _, r in sorted({(date, r) for points in series.values() for r, date, _, _ in points})]
+
+def get_trend_plot(series, file_prefix, commit, save_to):
+    """LUTs and fmax of each config over the revisions, oldest first."""
+    revs = rev_order(series)
+    pos = {r: i for i, r in enumerate(revs)}
+
+    fig, axs = plt.subplots(figsize=(7, 4.5), nrows=2, sharex=True)
+    fig.subplots_adjust(left=0.1, right=0.72, bottom=0.15, hspace=0.1)
+    fig.suptitle(f"fsoc: LUTs and fmax over commits, {file_prefix} (latest update: {commit})", fontsize=10)
+
+    colors = plt.get_cmap('tab20')
+    for i, (config, points) in enumerate(sorted(series.items())):
+        x = [pos[rev] for rev, _, _, _ in points]
+        axs[0].plot(x, [lut for _, _, lut, _ in points], marker='.', color=colors(i % 20), label=config)
+        axs[1].plot(x, [fmax for _, _, _, fmax in points], marker='.', color=colors(i % 20))
+
+    axs[0].set_ylabel("#LUT", labelpad=0)
+    axs[1].set_ylabel("fmax / MHz", labelpad=0)
+    for ax in axs:
+        ax.grid(True, which='both', axis='y', linestyle='--', linewidth=1)
+    axs[1].set_xticks(range(len(revs)))
+    axs[1].set_xticklabels(revs, rotation=60, fontsize=6)
+    axs[0].legend(loc='upper left', bbox_to_anchor=(1.01, 1.0), fontsize=6, frameon=False)
+
+    if save_to is not None:
+        fig.savefig(save_to)
+
+def previous_rev(series, rev):
+    """The revision before rev (or before the latest) over all configs."""
+    revs = rev_order(series)
+    idx = revs.index(rev) if rev in revs else len(revs)
+    return revs[idx - 1] if idx > 0 else None
+
+def check_thresholds(reports, ref, lut_threshold, fmax_threshold):
+    """Configs whose LUTs grew or whose fmax dropped by more than the
+       thresholds (percent) relative to the reference, as (config, text).
+       The fmax medians over seeds are compared if both have a seed sweep,
+       the fmax of the single runs otherwise."""
+    violations = []
+    for config in sorted(set(reports) & set(ref)):
+        for element, threshold, sign in (("lut", lut_threshold, 1), ("fmax", fmax_threshold, -1)):
+            if threshold is None:
+                continue
+            if element == "fmax" and all('fmax_seeds' in d for d in (reports[config], ref[config])):
+                name, new, old = "fmax (median)", from_json_summary(reports[config], element), from_json_summary(ref[config], element)
+            else:
+                name, new, old = element, float(reports[config]['summary'][element]), float(ref[config]['summary'][element])
+            change = (new - old) / old * 100 if old else 0.0
+            if sign * change > threshold:
+                violations.append((config, f"{name} {old:g} -> {new:g} ({change:+.1f}%, threshold {sign*threshold:+g}%)"))
+    return violations
+
 def main():
     args = parse_args()
 
-    if not os.path.exists(args.report_soc_dir):
-        print("Error: Folder does not exist.")
+    db = results_db.connect(args.db) if args.db is not None else None
+    if args.report_soc_dir is not None:
+        if not os.path.exists(args.report_soc_dir):
+            print("Error: Folder does not exist.")
+            sys.exit(1)
+        reports = load(args.report_soc_dir, args.arch)
+    else:
+        reports = results_db.reports(db, args.rev, args.arch).get(args.arch, {})
+
+    if db is not None:
+        baseline = results_db.reports(db, args.baseline, args.arch).get(args.arch, {}) if args.baseline is not None else None
+    else:
+        baseline = load(args.baseline, args.arch) if args.baseline is not None else None
+
+    if not reports:
+        print(f"Error: No reports of {args.arch}.")
         sys.exit(1)
 
-    txt = get_ascii_plot(folder=args.report_soc_dir,
-                        file_prefix=args.arch,
+    txt = get_ascii_plot(reports=reports,
                         plot_title="fsoc: FazyRV minimal reference SoC, iCE40 Number of LUTs",
                         element="lut",
                         commit=args.commit_hash)
 
-    txt += get_ascii_plot(folder=args.report_soc_dir,
-                        file_prefix=args.arch,
+    txt += get_ascii_plot(reports=reports,
                         plot_title="fsoc: FazyRV minimal reference SoC, iCE40 Number of fmax",
                         element="fmax",
                         commit=args.commit_hash)
 
+    if baseline is not None:
+        txt += get_ascii_deltas(reports=reports,
+                                baseline=baseline,
+                                plot_title="fsoc: change of LUTs per module,",
+                                commit=args.commit_hash)
+        txt += get_ascii_fmax_changes(reports=reports,
+                                      baseline=baseline,
+                                      alpha=args.alpha,
+                                      commit=args.commit_hash)
+
     with open(args.ascii, 'w') as f:
         f.write(txt)
 
-    get_vect_plot(folder=args.report_soc_dir,
-                  file_prefix=args.arch,
+    get_vect_plot(reports=reports,
                   commit=args.commit_hash, save_to=args.svg)
 
+    if args.modules_svg is not None:
+        get_modules_plot(reports=reports,
+                         file_prefix=args.arch,
+                         commit=args.commit_hash, save_to=args.modules_svg)
+
+    series = results_db.series(db, args.arch) if db is not None else {}
+    if args.trend_svg is not None:
+        get_trend_plot(series=series,
+                       file_prefix=args.arch,
+                       commit=args.commit_hash, save_to=args.trend_svg)
+
+    if args.lut_threshold is not None or args.fmax_threshold is not None:
+        ref_name = args.ref
+        if db is not None and ref_name is None:
+            ref_name = previous_rev(series, args.rev if args.rev is not None else results_db.latest(db, "impl", args.arch))
+
+        failed = False
+        for kind, name in (("reference", ref_name), ("baseline", args.base)):
+            if kind == "baseline" and name is None:
+                continue
+            if name is None:
+                ref = {}
+            elif db is not None:
+                ref = results_db.reports(db, name, args.arch).get(args.arch, {})
+            else:
+                ref = load(name, args.arch)
+            # e.g., the first revision or an evicted database
+            if not ref:
+                print(f"Warning: No {kind} reports of {args.arch} ({name}), thresholds not checked against it.")
+                continue
+
+            violations = check_thresholds(reports, ref, args.lut_threshold, args.fmax_threshold)
+            txt = f"fsoc: {args.arch} configs exceeding the thresholds relative to the {kind} {name} (latest update: {args.commit_hash})\n"
+            txt += "".join(f"{config}: {text}\n" for config, text in violations) if violations else \
+                   f"None of {len(set(reports) & set(ref))} configs\n"
+            with open(args.ascii, 'a') as f:
+                f.write(txt)
+            print(txt, end="")
+            failed |= bool(violations)
+
+        if failed:
+            sys.exit(1)
 
 if __name__ == "__main__":
     main()
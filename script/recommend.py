@@ -0,0 +1,578 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  recommend.py
+# Usage  :  Recommends fsoc configurations for a firmware on an architecture
+#           within a LUT/BRAM budget. The instruction mix of the firmware's
+#           measured region (gpo[0] high, or the whole run) is taken from
+#           rviss.py or a timing trace. The cycles of every legal
+#           configuration are predicted from the cycles per instruction
+#           class of the Embench timing traces, and the runtime from the
+#           fmax of the cached implementation results. The best candidates
+#           are simulated on the RTL model to confirm the prediction.
+#           python3 recommend.py <firmware.elf> <arch> --luts 1000 [--brams 2]
+#                   --embench <embench-iot/summary> | --db <results.sqlite>
+#                   [--cache <synth cache>] [--reportdir <summary_fsoc_soc>]
+#                   [--top 5] [--simulate 3]
+# Limit. :  rviss.py runs RV32I firmware only; for RVC firmware, pass a
+#           timing trace of it (--trace). Configurations without an
+#           implementation result cannot be ranked. The cycle model does not
+#           distinguish CONF.
+# -----------------------------------------------------------------------------
+
+import os
+import re
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+from math import sqrt, isnan
+from pathlib import Path
+from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import summary
+import results_db
+import synth_cache
+from rviss import Iss, IssHalt
+from elfread import read_elf, SHF_EXECINSTR, EF_RISCV_RVC
+from hpm_decode import parse_timing, class_cycles
+from fsoc_sim_build import build
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHUNKSIZES  = (1, 2, 4, 8)
+CONFS       = ("MIN", "INT", "CSR")
+RFTYPES     = ("LOGIC", "BRAM", "BRAM_BP", "BRAM_DP", "BRAM_DP_BP")
+RVCS        = synth_cache.RVC
+
+# Memory of the simulation model (sim_fsoc.py)
+MEMSIZE = 131072
+
+SHF_ALLOC   = 0x2
+SHT_NOBITS  = 8
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recommend fsoc configurations for a firmware")
+
+    parser.add_argument(
+        'elf',
+        type=Path,
+        help='Firmware ELF file'
+    )
+
+    parser.add_argument(
+        'arch',
+        type=str,
+        help='Target architecture'
+    )
+
+    parser.add_argument(
+        '--luts',
+        type=float,
+        required=True,
+        help='LUT budget'
+    )
+
+    parser.add_argument(
+        '--brams',
+        type=float,
+        default=None,
+        help='Block RAM budget (default: unlimited)'
+    )
+
+    parser.add_argument(
+        '--conf',
+        type=str,
+        nargs='+',
+        choices=CONFS,
+        default=None,
+        help='Allowed CONF values (default: all the firmware can run on)'
+    )
+
+    parser.add_argument(
+        '--embench',
+        type=Path,
+        default=None,
+        help='Embench result directories with timing traces to calibrate the cycle model'
+    )
+
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=None,
+        help='Results database (results_db.py) to calibrate the cycle model and read reports from'
+    )
+
+    parser.add_argument(
+        '--cache',
+        type=Path,
+        default=Path.home() / ".cache" / "fazyrv" / "synth",
+        help='Cache of implementation results (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--reportdir',
+        type=Path,
+        default=None,
+        help='Directory of the reports of reporting.py, in addition to the cache'
+    )
+
+    parser.add_argument(
+        '--trace',
+        type=Path,
+        default=None,
+        help='Timing trace of the firmware (any configuration) instead of running it on rviss.py'
+    )
+
+    parser.add_argument(
+        '--max_insns',
+        type=int,
+        default=100_000_000,
+        help='Instruction limit of rviss.py (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--top',
+        type=int,
+        default=5,
+        help='Number of configurations to list (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--simulate',
+        type=int,
+        default=3,
+        help='Simulate the best configurations on the RTL model (default: %(default)s, 0 disables)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Parallel simulations (default: available CPUs)'
+    )
+
+    parser.add_argument(
+        '--workdir',
+        type=Path,
+        default=Path("work_recommend"),
+        help='Directory for the models of the simulated configurations (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Write the candidates as JSON'
+    )
+
+    args = parser.parse_args()
+    if args.embench is None and args.db is None:
+        parser.error("--embench or --db is required to calibrate the cycle model")
+    return args
+
+
+# --- Firmware ---
+
+def image(elf):
+    """Memory image of the allocated sections."""
+    mem = bytearray(MEMSIZE)
+    for sec in elf["sections"]:
+        if not sec["flags"] & SHF_ALLOC or sec["type"] == SHT_NOBITS or sec["addr"] >= MEMSIZE:
+            continue
+        data = elf["data"][sec["offset"]:sec["offset"] + sec["size"]]
+        mem[sec["addr"]:sec["addr"] + len(data)] = data[:MEMSIZE - sec["addr"]]
+    return mem
+
+
+def requirements(elf):
+    """Whether the firmware is built for compressed instructions (RVC flag of
+       the ELF header, as padding or data in the code also look compressed)
+       and whether its code accesses CSRs."""
+    rvc = bool(elf["flags"] & EF_RISCV_RVC)
+    csr = False
+    for sec in elf["sections"]:
+        if not sec["flags"] & SHF_EXECINSTR or sec["type"] == SHT_NOBITS:
+            continue
+        code = elf["data"][sec["offset"]:sec["offset"] + sec["size"]]
+        i = 0
+        while i + 1 < len(code):
+            if rvc and code[i] & 0x3 != 0x3:
+                i += 2
+                continue
+            instr = int.from_bytes(code[i:i+4], 'little')
+            if instr & 0x7F == 0x73 and (instr >> 12) & 0x7:
+                csr = True
+            i += 4
+    return rvc, csr
+
+
+def insn_class(instr):
+    """Class of an uncompressed instruction word, as hpm_decode.insn_class."""
+    opcode, f3 = instr & 0x7F, (instr >> 12) & 0x7
+    if opcode == 0x03:
+        return "load"
+    if opcode == 0x23:
+        return "store"
+    if opcode == 0x63:
+        return "branch"
+    if opcode in (0x6F, 0x67):
+        return "jump"
+    if opcode in (0x13, 0x33) and f3 in (1, 5):
+        return "shift"
+    if opcode == 0x73:
+        return "csr" if f3 else "system"
+    if opcode == 0x0F:
+        return "system"
+    return "alu"
+
+
+def iss_mix(mem, max_insns):
+    """Instructions per class of the measured region (gpo[0] high) on
+       rviss.py, or of the whole run if the firmware never enters it."""
+    iss = Iss(mem)
+    region, total = {}, {}
+    entered = False
+    try:
+        while iss.instret < max_insns:
+            if iss.gpo & 0x1:
+                entered = True
+            elif entered:
+                break
+            cls = insn_class(int.from_bytes(iss.mem[iss.pc:iss.pc+4], 'little'))
+            total[cls] = total.get(cls, 0) + 1
+            if entered:
+                region[cls] = region.get(cls, 0) + 1
+            iss.step()
+    except IssHalt:
+        pass
+    except NotImplementedError as e:
+        raise SystemExit(f"rviss.py cannot run the firmware ({e}), pass a timing trace with --trace")
+    return region if entered else total
+
+
+def trace_mix(path):
+    return {c: n for c, (n, _) in class_cycles(parse_timing(path)).items()}
+
+
+# --- Cycle model ---
+
+def steps(p):
+    """Serial steps per 32-bit word of a configuration."""
+    return 32 / int(p["CHUNKSIZE"])
+
+
+def calibration(args):
+    """{variant: {bench: {class: (count, cycles)}}} of the timing traces."""
+    if args.embench is not None:
+        return {v: c for v, (_, c) in results_db.embench_results(args.embench).items() if c}
+    db = results_db.connect(args.db)
+    cal = {}
+    for row in db.execute("SELECT c.variant, c.benchmark, c.class, c.count, c.cycles FROM embench_classes c "
+                          "JOIN revs r ON r.rev = c.rev ORDER BY COALESCE(r.date, r.imported)"):
+        # the latest revision wins
+        cal.setdefault(row["variant"], {}).setdefault(row["benchmark"], {})[row["class"]] = (row["count"], row["cycles"])
+    return cal
+
+
+class CycleModel:
+    """Cycles per instruction of each class: measured for calibrated
+       configurations, otherwise a least-squares fit over all of them, linear
+       in the serial steps per word, with offsets for the prefetcher, the
+       register file, and RVC. Only what varies in the calibration is
+       fitted; with a single CHUNKSIZE, the cycles scale with the steps per
+       word, and unseen register files or RVC types are assumed to take as
+       many cycles as the most common calibrated one. The spread over the
+       benchmarks and the residuals of the fit give the uncertainty."""
+
+    def __init__(self, cal):
+        self.measured = {}
+        params = {v: synth_cache.params(v) for v in cal}
+        self.steps = sorted({steps(p) for p in params.values()})
+        self.levels = {}
+        for k in ("PREFETCH", "RFTYPE", "RVC"):
+            seen = [p[k] for p in params.values()]
+            # the most common level is the reference of the offsets
+            ref = max(set(seen), key=seen.count)
+            self.levels[k] = [ref] + sorted(set(seen) - {ref}, key=str)
+
+        samples = {}
+        for variant, benches in cal.items():
+            x = self.features(params[variant])
+            per_class = {}
+            for bench, classes in benches.items():
+                for cls, (n, cyc) in classes.items():
+                    if n:
+                        per_class.setdefault(cls, []).append(cyc / n)
+                        samples.setdefault(cls, []).append((x, cyc / n))
+            self.measured[variant] = {c: (float(np.mean(v)), float(np.std(v))) for c, v in per_class.items()}
+
+        self.coef, self.sd = {}, {}
+        for cls, s in samples.items():
+            X = np.array([x for x, _ in s])
+            y = np.array([c for _, c in s])
+            self.coef[cls] = np.linalg.lstsq(X, y, rcond=None)[0]
+            dof = len(y) - np.linalg.matrix_rank(X)
+            # no estimate of the error without redundant samples
+            self.sd[cls] = float(np.sqrt(np.sum((X @ self.coef[cls] - y) ** 2) / dof)) if dof > 0 else float("nan")
+
+    def features(self, p):
+        x = [1.0]
+        if len(self.steps) > 1:
+            x.append(steps(p))
+        for k, levels in self.levels.items():
+            x += [float(p[k] == level) for level in levels[1:]]
+        return x
+
+    def basis(self, variant):
+        """measured, interpolated within the calibration, or extrapolated."""
+        if variant in self.measured:
+            return "measured"
+        p = synth_cache.params(variant)
+        if len(self.steps) > 1 and self.steps[0] <= steps(p) <= self.steps[-1] and \
+                all(p[k] in levels for k, levels in self.levels.items()):
+            return "interpolated"
+        return "extrapolated"
+
+    def cpi(self, variant, cls):
+        """(mean, sd) of the cycles per instruction of a class."""
+        if variant in self.measured and cls in self.measured[variant]:
+            return self.measured[variant][cls]
+        if cls not in self.coef:
+            # classes without calibration behave like alu instructions
+            cls = "alu"
+        p = synth_cache.params(variant)
+        scale = 1.0 if len(self.steps) > 1 else steps(p) / self.steps[0]
+        return max(float(np.array(self.features(p)) @ self.coef[cls]) * scale, 1.0), self.sd[cls] * scale
+
+    def cycles(self, variant, mix):
+        """(cycles, sd) of an instruction mix; the sd is nan if unknown."""
+        total, var = 0.0, 0.0
+        for cls, n in mix.items():
+            mean, sd = self.cpi(variant, cls)
+            total += n * mean
+            var += (n * sd) ** 2
+        return total, sqrt(var)
+
+
+# --- Implementation results ---
+
+def canonical(variant):
+    return results_db.config("", variant)[1]
+
+
+def cached_reports(cache, arch):
+    """Reports of the synthesis cache, {variant: (report, current)}; current
+       if the entry matches the sources of the checked out tree. Current
+       entries win over stale ones, then seed sweeps, then newer entries."""
+    entries = {}
+    if cache is None or not cache.is_dir():
+        return {}
+    files = synth_cache.source_files()
+    for meta in cache.glob("*/*/meta.json"):
+        with open(meta) as f:
+            m = json.load(f)
+        if m.get("arch") != arch or not (meta.parent / "report.json").exists():
+            continue
+        rank = (m.get("files") == files, bool(m.get("seeds")), m.get("date", ""))
+        variant = canonical(m["variant"])
+        if variant not in entries or rank > entries[variant][0]:
+            entries[variant] = (rank, meta.parent / "report.json")
+
+    found = {}
+    for variant, (rank, path) in entries.items():
+        with open(path) as f:
+            found[variant] = (json.load(f), rank[0])
+    return found
+
+
+def reports(args):
+    found = cached_reports(args.cache, args.arch)
+    extra = {}
+    if args.reportdir is not None:
+        extra = summary.load(args.reportdir).get(args.arch, {})
+    elif args.db is not None:
+        extra = results_db.reports(results_db.connect(args.db), None, args.arch).get(args.arch, {})
+    for config, report in extra.items():
+        if not found.get(canonical(config), (None, False))[1]:
+            found[canonical(config)] = (report, True)
+    return found
+
+
+def brams(report):
+    """Block RAMs of an implementation, from the summary or the per-module
+       counts (area_modules.py); None if unknown."""
+    for k in ("bram", "ram", "BRAM"):
+        if k in report.get("summary", {}):
+            return float(report["summary"][k])
+    top = report.get("modules", {}).get("fsoc")
+    return float(top["incl"]["bram"]) if top else None
+
+
+def fmax_range(report):
+    """(median, min, max) of fmax over placement seeds, or the single run."""
+    if 'fmax_seeds' in report:
+        s = report['fmax_seeds']
+        return float(s['median']), float(s['min']), float(s['max'])
+    f = float(report['summary']['fmax'])
+    return f, f, f
+
+
+# --- Candidates ---
+
+def legal(rvc, csr, confs):
+    """Configurations the firmware can run on."""
+    for cs, conf, rf, rv, pf in product(CHUNKSIZES, CONFS, RFTYPES, RVCS, (0, 1)):
+        if conf == "CSR" and rf == "LOGIC":
+            continue
+        if csr and conf != "CSR" or confs and conf not in confs:
+            continue
+        if rvc and rv == "NONE":
+            continue
+        yield "-".join([str(cs), conf, rf, rv] + ["PF"] * pf)
+
+
+def candidates(variants, mix, model, impl, luts, bram_budget):
+    """Predicted runtime of each configuration within the budget, best
+       first, and the configurations without implementation result."""
+    rows, missing = [], []
+    for v in variants:
+        if v not in impl:
+            missing.append(v)
+            continue
+        report, current = impl[v]
+        lut = float(report['summary']['lut'])
+        bram = brams(report)
+        if lut > luts or (bram_budget is not None and bram is not None and bram > bram_budget):
+            continue
+        cycles, sd = model.cycles(v, mix)
+        f, fmin, fmax = fmax_range(report)
+        rows.append({
+            "config":       v,
+            "lut":          lut,
+            "bram":         bram,
+            "fmax":         f,
+            "fmax_min":     fmin,
+            "fmax_max":     fmax,
+            "cycles":       round(cycles),
+            "cycles_sd":    None if isnan(sd) else round(sd),
+            "runtime":      cycles / f / 1e3,
+            # 2 sd of the cycles and the fmax range over seeds
+            "runtime_lo":   None if isnan(sd) else max(cycles - 2 * sd, 0) / fmax / 1e3,
+            "runtime_hi":   None if isnan(sd) else (cycles + 2 * sd) / fmin / 1e3,
+            "basis":        model.basis(v),
+            "synthesis":    "current" if current else "stale",
+        })
+    rows.sort(key=lambda r: r["runtime"])
+    separate(rows)
+    return rows, missing
+
+
+def separate(rows):
+    """Whether the runtime range of each candidate is below the next one."""
+    for a, b in zip(rows, rows[1:]):
+        a["separated"] = None not in (a["runtime_hi"], b["runtime_lo"]) and a["runtime_hi"] < b["runtime_lo"]
+
+
+# --- RTL simulation ---
+
+def build_model(variant, workdir):
+    """Build the fast model of a configuration (fsoc_sim_build.py) and return
+       its path, or None if the build failed."""
+    p = synth_cache.params(variant)
+    try:
+        return build("fast", Path(workdir) / variant, p["CHUNKSIZE"], p["CONF"], p["RFTYPE"], p["RVC"],
+                     prefetch=bool(p["PREFETCH"]))
+    except subprocess.CalledProcessError:
+        return None
+
+
+def simulate(elf, variant, model, timeout=None):
+    """Cycles of the measured region on the prebuilt model of the
+       configuration (sim_fsoc.py --model), or None."""
+    if model is None:
+        return None
+    p = synth_cache.params(variant)
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copyfile(elf, Path(tmp) / "fw")
+        cmd = ["python3", str(ROOT / "script" / "sim_fsoc.py"), "--bench", "fw",
+               "--chunksize", p["CHUNKSIZE"], "--conf", p["CONF"], "--rftype", p["RFTYPE"], "--rvc", p["RVC"],
+               "--model", str(Path(model).resolve())]
+        if p["PREFETCH"]:
+            cmd.append("--prefetch")
+        try:
+            res = subprocess.run(cmd, cwd=tmp, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return None
+    m = re.search(r"Bench time: (\d+)", res.stdout.decode(errors='replace'))
+    return int(m.group(1)) if res.returncode == 0 and m and int(m.group(1)) else None
+
+
+def main():
+    args = parse_args()
+
+    elf = read_elf(args.elf)
+    rvc, csr = requirements(elf)
+    mix = trace_mix(args.trace) if args.trace is not None else iss_mix(image(elf), args.max_insns)
+    insns = sum(mix.values())
+    print(f"{args.elf.name}: {insns:,} instructions "
+          f"({', '.join(f'{c} {n / insns:.0%}' for c, n in sorted(mix.items(), key=lambda x: -x[1]))})"
+          f"{', RVC' if rvc else ''}{', CSR' if csr else ''}")
+
+    cal = calibration(args)
+    if not cal:
+        raise SystemExit("No timing traces to calibrate the cycle model, run Embench with --insn_timing")
+    model = CycleModel(cal)
+
+    variants = list(legal(rvc, csr, args.conf))
+    rows, missing = candidates(variants, mix, model, reports(args), args.luts, args.brams)
+    print(f"{len(variants)} legal configurations, {len(variants) - len(missing)} implemented for {args.arch}, "
+          f"{len(rows)} within the budget; calibrated on {len(cal)} configurations")
+    if missing:
+        print(f"Not implemented (make report.soc.{args.arch}-<config>): {len(missing)}")
+    if not rows:
+        raise SystemExit("No implemented configuration within the budget")
+
+    if args.simulate:
+        configs = list(dict.fromkeys(r["config"] for r in rows[:args.simulate]))
+        with ThreadPoolExecutor(max_workers=args.jobs or len(os.sched_getaffinity(0))) as pool:
+            models = dict(zip(configs, pool.map(lambda c: build_model(c, args.workdir), configs)))
+            sims = list(pool.map(lambda r: simulate(args.elf, r["config"], models[r["config"]]),
+                                 rows[:args.simulate]))
+        for r, cyc in zip(rows, sims):
+            r["simulated"] = cyc
+            if cyc is not None:
+                r["error"] = r["cycles"] / cyc - 1
+                r["runtime"] = cyc / r["fmax"] / 1e3
+                r["runtime_lo"] = cyc / r["fmax_max"] / 1e3
+                r["runtime_hi"] = cyc / r["fmax_min"] / 1e3
+                r["basis"] = "simulated"
+        # a simulated candidate may fall behind predicted ones
+        rows.sort(key=lambda r: r["runtime"])
+        separate(rows)
+
+    print(f"{'config':<24} {'LUT':>6} {'BRAM':>5} {'fmax':>7} {'cycles':>13} {'runtime/ms':>11} "
+          f"{'range/ms':>17} {'basis':<13} {'synthesis':<9} {'sim. error':>10}")
+    for r in rows[:args.top]:
+        rng = f"{r['runtime_lo']:.3f}..{r['runtime_hi']:.3f}" if r['runtime_lo'] is not None else "?"
+        err = f"{r['error']:+.1%}" if r.get("error") is not None else ("failed" if "simulated" in r else "-")
+        print(f"{r['config']:<24} {r['lut']:>6g} {r['bram'] if r['bram'] is not None else '?':>5} {r['fmax']:>7.2f} "
+              f"{r['cycles']:>13,} {r['runtime']:>11.3f} {rng:>17} "
+              f"{r['basis']:<13} {r['synthesis']:<9} {err:>10}")
+    if len(rows) > 1:
+        print(f"{rows[0]['config']} is the best configuration "
+              f"{'with' if rows[0].get('separated') and rows[0]['basis'] != 'extrapolated' else 'without'} "
+              f"a clear margin to {rows[1]['config']}")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump({"elf": str(args.elf), "arch": args.arch, "mix": mix, "candidates": rows[:args.top]}, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
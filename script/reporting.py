@@ -3,6 +3,7 @@ import os
 import json
 import argparse
 from pathlib import Path
+from timing_paths import extract
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -29,6 +30,13 @@ def parse_args():
         help="Path to the report file (default: %(default)s)"
     )
 
+    parser.add_argument(
+        "--paths",
+        type=int,
+        default=10,
+        help="Number of critical paths to keep (default: %(default)s)"
+    )
+
     args = parser.parse_args()
     return args
 
@@ -65,6 +73,8 @@ def main():
             data["timing"][t] = json.loads(js)
     else:
         raise ValueError(f"Unsupported architecture: {args.arch}")
+
+    data["critical_paths"] = extract(args.arch, args.workdir, args.paths)
     
     os.makedirs(args.output.parent, exist_ok=True)
     with open(args.output, "w") as f:
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  results_db.py
+# Usage  :  Local SQLite store of the results of implementations (reporting.py),
+#           riscv-tests, RISCOF, and Embench, indexed by revision, arch, and
+#           configuration. Importing a revision and configuration again
+#           replaces its results.
+#           python3 results_db.py [--db <file>] import impl <summary_fsoc_soc>
+#           python3 results_db.py [--db <file>] import rvtests <summary_riscvtests>
+#           python3 results_db.py [--db <file>] import riscof <summary_riscof>
+#           python3 results_db.py [--db <file>] import embench <embench-iot/summary>
+#           python3 results_db.py [--db <file>] revs
+#           python3 results_db.py [--db <file>] sql "<query>"
+#           --rev sets the revision of an import (default: git HEAD).
+# -----------------------------------------------------------------------------
+
+import re
+import json
+import gzip
+import sqlite3
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+
+from synth_cache import params
+from hpm_decode import parse_timing, class_cycles
+
+ROOT = Path(__file__).resolve().parent.parent
+DB = Path.home() / ".cache" / "fazyrv" / "results.sqlite"
+
+# Configuration of a result; arch is empty for simulations
+CONFIG = "arch TEXT, variant TEXT, chunksize INTEGER, conf TEXT, rftype TEXT, rvc TEXT, prefetch INTEGER, hpm INTEGER"
+CONFIG_COLS = ["arch", "variant", "chunksize", "conf", "rftype", "rvc", "prefetch", "hpm"]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS revs (rev TEXT PRIMARY KEY, date TEXT, imported TEXT);
+CREATE TABLE IF NOT EXISTS impl (rev TEXT, {CONFIG}, lut REAL, fmax REAL,
+    fmax_min REAL, fmax_median REAL, fmax_max REAL, seeds INTEGER, report TEXT);
+CREATE TABLE IF NOT EXISTS impl_modules (rev TEXT, arch TEXT, variant TEXT, module TEXT,
+    instances INTEGER, lut INTEGER, ff INTEGER, carry INTEGER, bram INTEGER, incl_lut INTEGER);
+CREATE TABLE IF NOT EXISTS rvtests (rev TEXT, {CONFIG}, rc INTEGER);
+CREATE TABLE IF NOT EXISTS riscof (rev TEXT, {CONFIG}, passed INTEGER, failed INTEGER, failures TEXT);
+CREATE TABLE IF NOT EXISTS embench (rev TEXT, {CONFIG}, benchmark TEXT, cycles INTEGER);
+CREATE TABLE IF NOT EXISTS embench_classes (rev TEXT, arch TEXT, variant TEXT, benchmark TEXT,
+    class TEXT, count INTEGER, cycles INTEGER);
+CREATE INDEX IF NOT EXISTS impl_idx ON impl (rev, arch, chunksize, conf, rftype, rvc);
+CREATE INDEX IF NOT EXISTS impl_modules_idx ON impl_modules (rev, arch, variant);
+CREATE INDEX IF NOT EXISTS rvtests_idx ON rvtests (rev, chunksize, conf, rftype, rvc);
+CREATE INDEX IF NOT EXISTS riscof_idx ON riscof (rev, chunksize, conf, rftype, rvc);
+CREATE INDEX IF NOT EXISTS embench_idx ON embench (rev, chunksize, conf, rftype, rvc, benchmark);
+CREATE INDEX IF NOT EXISTS embench_classes_idx ON embench_classes (rev, arch, variant, benchmark);
+"""
+
+RE_RISCOF = re.compile(r"(\S+\.S)\s*:.*:\s*(Passed|Failed)\s*$")
+RE_EMBENCH = re.compile(r'"([\w-]+)"\s*:\s*(\d+)')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Store of implementation, test, and benchmark results")
+
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=DB,
+        help='SQLite file (default: %(default)s)'
+    )
+
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    imp = sub.add_parser('import', help='Import results')
+
+    imp.add_argument(
+        'source',
+        choices=['impl', 'rvtests', 'riscof', 'embench'],
+        help='Kind of results'
+    )
+
+    imp.add_argument(
+        'dir',
+        type=Path,
+        help='Directory of the results'
+    )
+
+    imp.add_argument(
+        '--rev',
+        type=str,
+        default=None,
+        help='Revision of the results (default: git HEAD)'
+    )
+
+    sub.add_parser('revs', help='List the revisions and their results')
+
+    sql = sub.add_parser('sql', help='Run a query and print the rows')
+
+    sql.add_argument(
+        'query',
+        type=str,
+        help='SQL query'
+    )
+
+    return parser.parse_args()
+
+
+def connect(path=DB):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def head():
+    """Short hash of the checked out revision, or None outside of git."""
+    p = subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    return p.stdout.decode().strip() or None if p.returncode == 0 else None
+
+
+def add_rev(db, rev):
+    p = subprocess.run(["git", "-C", str(ROOT), "show", "-s", "--format=%cI", rev],
+                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    date = p.stdout.decode().strip() if p.returncode == 0 else None
+    db.execute("INSERT INTO revs VALUES (?, ?, ?) ON CONFLICT(rev) DO UPDATE SET "
+               "date = COALESCE(excluded.date, date), imported = excluded.imported",
+               (rev, date, datetime.now(timezone.utc).isoformat()))
+
+
+def config(arch, variant):
+    """Values of CONFIG_COLS; variant is canonical, e.g., 4-MIN-BRAM-NONE-PF."""
+    p = params(variant)
+    canon = "-".join([p["CHUNKSIZE"], p["CONF"], p["RFTYPE"], p["RVC"]]
+                     + ["PF"] * p["PREFETCH"] + ["HPM"] * p["HPM"])
+    return [arch, canon, int(p["CHUNKSIZE"]), p["CONF"], p["RFTYPE"], p["RVC"], p["PREFETCH"], p["HPM"]]
+
+
+def _replace(db, table, rev, cfg, rows):
+    db.execute(f"DELETE FROM {table} WHERE rev = ? AND arch = ? AND variant = ?", (rev, cfg[0], cfg[1]))
+    for row in rows:
+        db.execute(f"INSERT INTO {table} VALUES ({', '.join('?' * len(row))})", row)
+
+
+# --- Importers ---------------------------------------------------------------
+
+def import_impl(db, rev, root_dir):
+    """Reports <arch>-<variant>.json of reporting.py, with the optional
+       per-module counts and seed sweeps."""
+    n = 0
+    for path in sorted(Path(root_dir).rglob("*.json")):
+        if "-" not in path.stem:
+            continue
+        arch, variant = path.stem.split("-", 1)
+        with open(path) as f:
+            rep = json.load(f)
+        if "summary" not in rep:
+            continue
+        cfg = config(arch, variant)
+        seeds = rep.get("fmax_seeds", {})
+        _replace(db, "impl", rev, cfg, [[rev, *cfg, rep["summary"].get("lut"), rep["summary"].get("fmax"),
+                                         seeds.get("min"), seeds.get("median"), seeds.get("max"),
+                                         len(seeds.get("fmax", [])) or None, json.dumps(rep)]])
+        _replace(db, "impl_modules", rev, cfg,
+                 [[rev, cfg[0], cfg[1], m, r["instances"], r["self"]["lut"], r["self"]["ff"],
+                   r["self"]["carry"], r["self"]["bram"], r["incl"]["lut"]]
+                  for m, r in rep.get("modules", {}).items()])
+        n += 1
+    return n
+
+
+def import_rvtests(db, rev, root_dir):
+    """<variant>.log files of sim.riscvtests.% holding the exit code."""
+    n = 0
+    for path in sorted(Path(root_dir).glob("*.log")):
+        cfg = config("", path.stem)
+        rc = int(path.read_text().strip() or -1)
+        _replace(db, "rvtests", rev, cfg, [[rev, *cfg, rc]])
+        n += 1
+    return n
+
+
+def import_riscof(db, rev, root_dir):
+    """<variant>.log files of riscof.run.% with the test status table."""
+    n = 0
+    for path in sorted(Path(root_dir).glob("*.log")):
+        status = {}
+        with open(path, errors='replace') as f:
+            for line in f:
+                m = RE_RISCOF.search(line)
+                if m:
+                    status[m.group(1)] = m.group(2)
+        failed = sorted(t for t, s in status.items() if s == "Failed")
+        cfg = config("", path.stem)
+        _replace(db, "riscof", rev, cfg, [[rev, *cfg, len(status) - len(failed), len(failed), " ".join(failed)]])
+        n += 1
+    return n
+
+
+def embench_variant(name):
+    """Variant of a result directory of benchmark_run_embench_all.sh, e.g.,
+       fsoc_4_MIN_BRAM_DP_PF."""
+    f = name.split("_")[1:]
+    flags = [x for x in f[2:] if x in ("PF", "HPM")]
+    rf = "_".join(x for x in f[2:] if x not in ("PF", "HPM"))
+    return "-".join([f[0], f[1], rf, "NONE"] + flags)
+
+
+def embench_cycles(log):
+    """Cycles per benchmark of the "detailed speed results" of a log of
+       benchmark_speed.py (--absolute --json-output). These are milliseconds
+       at --cpu-mhz, 1 for benchmark_run_embench_all.sh, i.e., kilocycles."""
+    cycles = {}
+    inside = False
+    with open(log, errors='replace') as f:
+        for line in f:
+            if "detailed speed results" in line:
+                inside = True
+            elif inside:
+                for b, c in RE_EMBENCH.findall(line):
+                    cycles[b] = int(c) * 1000
+                if "}" in line:
+                    break
+    return cycles
+
+
+def embench_results(root_dir):
+    """Result directories fsoc_<CS>_<CONF>_<RF>[_PF][_HPM] with the speed
+       logs and the gzipped timing traces (--insn_timing), {variant: (cycles,
+       classes)}. The cycles of a benchmark with a trace are exact, otherwise
+       rounded to kilocycles."""
+    results = {}
+    for d in sorted(p for p in Path(root_dir).iterdir() if p.is_dir() and p.name.startswith("fsoc_")):
+        logs = sorted(d.glob("speed*.log"))
+        if not logs:
+            continue
+        cycles = embench_cycles(logs[-1])
+        classes = {}
+        for t in sorted(d.glob("*.timing.gz")) + sorted(d.glob("*.timing")):
+            bench = t.name.split(".timing")[0]
+            classes[bench] = class_cycles(parse_timing(t))
+            cycles[bench] = sum(cyc for _, cyc in classes[bench].values())
+        results[embench_variant(d.name)] = (cycles, classes)
+    return results
+
+
+def import_embench(db, rev, root_dir):
+    n = 0
+    for variant, (cycles, classes) in embench_results(root_dir).items():
+        cfg = config("", variant)
+        _replace(db, "embench_classes", rev, cfg,
+                 [[rev, cfg[0], cfg[1], bench, cls, count, cyc]
+                  for bench, c in classes.items() for cls, (count, cyc) in c.items()])
+        _replace(db, "embench", rev, cfg, [[rev, *cfg, b, c] for b, c in cycles.items()])
+        n += 1
+    return n
+
+
+IMPORTERS = {
+    "impl":     import_impl,
+    "rvtests":  import_rvtests,
+    "riscof":   import_riscof,
+    "embench":  import_embench,
+}
+
+
+# --- Queries -----------------------------------------------------------------
+
+def latest(db, table, arch=None):
+    """Most recent revision with results in table (by commit date)."""
+    q = f"SELECT t.rev FROM {table} t JOIN revs r ON r.rev = t.rev"
+    args = []
+    if arch is not None:
+        q += " WHERE t.arch = ?"
+        args.append(arch)
+    q += " ORDER BY COALESCE(r.date, r.imported) DESC LIMIT 1"
+    row = db.execute(q, args).fetchone()
+    return row["rev"] if row else None
+
+
+def reports(db, rev=None, arch=None):
+    """Reports of reporting.py as imported, {arch: {variant: report}}; of the
+       latest revision per arch if rev is None."""
+    archs = [arch] if arch is not None else [r["arch"] for r in db.execute("SELECT DISTINCT arch FROM impl ORDER BY arch")]
+    out = {}
+    for a in archs:
+        r = rev if rev is not None else latest(db, "impl", a)
+        for row in db.execute("SELECT variant, report FROM impl WHERE rev = ? AND arch = ? ORDER BY variant",
+                              (r, a)):
+            out.setdefault(a, {})[row["variant"]] = json.loads(row["report"])
+    return out
+
+
+def embench(db, rev=None):
+    """Cycles per benchmark of each configuration, {variant: {bench: cycles}};
+       of the latest revision per configuration if rev is None."""
+    out, revs = {}, {}
+    for row in db.execute("SELECT e.rev, e.variant, e.benchmark, e.cycles FROM embench e JOIN revs r ON r.rev = e.rev "
+                          "WHERE ? IS NULL OR e.rev = ? ORDER BY COALESCE(r.date, r.imported) DESC", (rev, rev)):
+        if revs.setdefault(row["variant"], row["rev"]) == row["rev"]:
+            out.setdefault(row["variant"], {})[row["benchmark"]] = row["cycles"]
+    return out
+
+
+def series(db, arch):
+    """LUTs and fmax (median over seeds, if any) of each configuration over
+       the revisions in order of their commit dates,
+       {variant: [(rev, date, lut, fmax)]}."""
+    out = {}
+    for row in db.execute("SELECT i.rev, COALESCE(r.date, r.imported) AS date, i.variant, i.lut, "
+                          "COALESCE(i.fmax_median, i.fmax) AS fmax FROM impl i JOIN revs r ON r.rev = i.rev "
+                          "WHERE i.arch = ? ORDER BY date, i.variant", (arch,)):
+        out.setdefault(row["variant"], []).append((row["rev"], row["date"], row["lut"], row["fmax"]))
+    return out
+
+def main():
+    args = parse_args()
+    db = connect(args.db)
+
+    if args.cmd == "import":
+        rev = args.rev or head()
+        if rev is None:
+            raise SystemExit("No git revision, set --rev")
+        with db:
+            add_rev(db, rev)
+            n = IMPORTERS[args.source](db, rev, args.dir)
+        print(f"Imported {n} {args.source} results of {rev} into {args.db}")
+    elif args.cmd == "revs":
+        for r in db.execute("SELECT * FROM revs ORDER BY COALESCE(date, imported)"):
+            counts = [f"{t} {db.execute(f'SELECT COUNT(DISTINCT arch || variant) FROM {t} WHERE rev = ?', (r['rev'],)).fetchone()[0]}"
+                      for t in ("impl", "rvtests", "riscof", "embench")]
+            print(f"{r['rev']:<12} {r['date'] or '-':<26} {', '.join(counts)}")
+    else:
+        cur = db.execute(args.query)
+        if cur.description is None:
+            db.commit()
+            return
+        print("\t".join(c[0] for c in cur.description))
+        for row in cur:
+            print("\t".join("" if v is None else str(v) for v in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  runtime.py
+# Usage  :  Wall-clock runtime of the Embench benchmarks at the fmax that each
+#           configuration achieves on an architecture. Joins the reports of
+#           reporting.py with the Embench cycles of the same configuration and
+#           ranks the configurations by runtime, by runtime x LUTs, and marks
+#           the Pareto frontier of LUTs and runtime.
+#           python3 runtime.py <summary_fsoc_soc> --embench <embench-iot/summary>
+#           python3 runtime.py --db <results.sqlite> [--rev <rev>]
+#           [--arch ice40] [--benchmarks] [-o runtime.md] [--svg pareto.svg]
+# Limit. :  The Embench runs do not vary RVC; their cycles are joined with
+#           the RVC=NONE implementations only.
+# -----------------------------------------------------------------------------
+
+import sys
+import argparse
+from math import exp, log
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+from py_markdown_table.markdown_table import markdown_table
+
+import summary
+import results_db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runtime of Embench at the achieved fmax")
+
+    parser.add_argument(
+        'reportdir',
+        type=Path,
+        nargs='?',
+        default=None,
+        help='Directory of the reports of reporting.py (or use --db)'
+    )
+
+    parser.add_argument(
+        '--embench',
+        type=Path,
+        default=None,
+        help='Result directories of benchmark_run_embench_all.sh (default with --db: the database)'
+    )
+
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=None,
+        help='Results database (results_db.py)'
+    )
+
+    parser.add_argument(
+        '--rev',
+        type=str,
+        default=None,
+        help='Revision of the results in --db (default: latest)'
+    )
+
+    parser.add_argument(
+        '--arch',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Architectures (default: all with reports)'
+    )
+
+    parser.add_argument(
+        '--benchmarks',
+        action='store_true',
+        help='Add the runtime of each benchmark'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Write the markdown tables to this file (default: stdout)'
+    )
+
+    parser.add_argument(
+        '--svg',
+        type=Path,
+        default=None,
+        help='Plot runtime over LUTs with the Pareto frontier'
+    )
+
+    args = parser.parse_args()
+    if args.reportdir is None and args.db is None:
+        parser.error("reportdir or --db is required")
+    if args.embench is None and args.db is None:
+        parser.error("--embench or --db is required")
+    return args
+
+
+def fmax(report):
+    """Median over placement seeds, if any (MHz)."""
+    if 'fmax_seeds' in report:
+        return float(report['fmax_seeds']['median'])
+    return float(report['summary']['fmax'])
+
+
+def geomean(values):
+    return exp(sum(log(v) for v in values) / len(values))
+
+
+def pareto(points):
+    """Keys of the points (lut, runtime) that no other point beats in both."""
+    front = []
+    best = None
+    for key, (lut, rt) in sorted(points.items(), key=lambda x: x[1]):
+        if best is None or rt < best:
+            front.append(key)
+            best = rt
+    return front
+
+
+def join(reports, cycles):
+    """Runtime (ms) per benchmark of each configuration of an arch with both
+       a report and cycles, {config: {"lut", "fmax", "runtime": {bench: ms}}}.
+       Only the benchmarks of all these configurations are kept. Benchmarks
+       without cycles (failed or hung runs report 0) are left out."""
+    joined = {}
+    for config, report in reports.items():
+        variant = results_db.config("", config)[1]
+        if variant not in cycles or not fmax(report):
+            continue
+        failed = sorted(b for b, c in cycles[variant].items() if c <= 0)
+        if failed:
+            print(f"Warning: No cycles of {', '.join(failed)} ({variant}), left out.", file=sys.stderr)
+        runtime = {b: c / fmax(report) / 1e3 for b, c in cycles[variant].items() if c > 0}
+        if not runtime:
+            continue
+        joined[config] = {
+            "lut":      float(report['summary']['lut']),
+            "fmax":     fmax(report),
+            "runtime":  runtime,
+        }
+    common = set.intersection(*(set(j["runtime"]) for j in joined.values())) if joined else set()
+    if not common:
+        return {}
+    for j in joined.values():
+        j["runtime"] = {b: j["runtime"][b] for b in sorted(common)}
+    return joined
+
+
+def rank(joined):
+    """Rows ranked by the geometric mean of the runtime."""
+    rt = {c: geomean(j["runtime"].values()) for c, j in joined.items()}
+    by_rt = sorted(rt, key=lambda c: rt[c])
+    by_area = sorted(rt, key=lambda c: rt[c] * joined[c]["lut"])
+    front = pareto({c: (joined[c]["lut"], rt[c]) for c in rt})
+    return [{
+        'Config':           c,
+        'LUT':              f"{joined[c]['lut']:g}",
+        'fmax':             f"{joined[c]['fmax']:.2f}",
+        'runtime / ms':     f"{rt[c]:.3f}",
+        'total / ms':       f"{sum(joined[c]['runtime'].values()):.3f}",
+        'runtime x LUT':    f"{rt[c] * joined[c]['lut']:.1f}",
+        '# runtime':        by_rt.index(c) + 1,
+        '# runtime x LUT':  by_area.index(c) + 1,
+        'Pareto':           "yes" if c in front else "",
+    } for c in by_rt], front
+
+
+def benchmarks_table(joined):
+    configs = sorted(joined, key=lambda c: geomean(joined[c]["runtime"].values()))
+    benches = next(iter(joined.values()))["runtime"]
+    rows = [{'Benchmark': b} | {c: f"{joined[c]['runtime'][b]:.3f}" for c in configs} for b in benches]
+    return markdown_table(rows).set_params(row_sep = 'markdown', quote = False).get_markdown()
+
+
+def plot(results, save_to):
+    fig, axs = plt.subplots(figsize=(max(4.5, 3.5 * len(results)), 3), ncols=len(results), squeeze=False)
+    fig.subplots_adjust(left=0.15, right=0.97, bottom=0.17, top=0.82, wspace=0.35)
+    fig.suptitle("fsoc: Embench runtime at fmax (geometric mean)", fontsize=10)
+
+    for ax, (arch, (joined, front)) in zip(axs[0], results.items()):
+        rt = {c: geomean(j["runtime"].values()) for c, j in joined.items()}
+        ax.scatter([joined[c]["lut"] for c in rt], list(rt.values()), color='dimgray', s=10)
+        ax.step([joined[c]["lut"] for c in front], [rt[c] for c in front], where='post', color='black')
+        for c in front:
+            ax.annotate(c, (joined[c]["lut"], rt[c]), fontsize=5, xytext=(3, 3), textcoords='offset points')
+        ax.set_title(arch, fontsize=8)
+        ax.set_xlabel("#LUT", labelpad=0)
+        ax.set_ylabel("runtime / ms", labelpad=0)
+        ax.grid(True, which='both', linestyle='--', linewidth=1)
+        ax.set_axisbelow(True)
+
+    fig.savefig(save_to)
+
+
+def main():
+    args = parse_args()
+
+    db = results_db.connect(args.db) if args.db is not None else None
+    reports = summary.load(args.reportdir) if args.reportdir is not None else results_db.reports(db, args.rev)
+    if args.embench is not None:
+        cycles = {v: c for v, (c, _) in results_db.embench_results(args.embench).items()}
+    else:
+        cycles = results_db.embench(db, args.rev)
+
+    txt = "# Runtime at fmax\n\n"
+    results = {}
+    for arch in args.arch or sorted(reports):
+        joined = join(reports.get(arch, {}), cycles)
+        txt += f"## {arch}\n\n"
+        if not joined:
+            txt += "No configuration with both a report and Embench cycles.\n\n"
+            continue
+        rows, front = rank(joined)
+        results[arch] = (joined, front)
+        benches = len(next(iter(joined.values()))["runtime"])
+        txt += f"Geometric mean and sum over {benches} benchmarks.\n\n"
+        txt += markdown_table(rows).set_params(row_sep = 'markdown', quote = False).get_markdown()
+        txt += "\n\n"
+        if args.benchmarks:
+            txt += f"### {arch}: runtime / ms per benchmark\n\n"
+            txt += benchmarks_table(joined)
+            txt += "\n\n"
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(txt)
+    else:
+        sys.stdout.write(txt)
+
+    if args.svg is not None and results:
+        plot(results, args.svg)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  rviss.py
+# Usage  :  Minimal RV32I instruction set simulator for the fsoc memory map.
+#           Used to profile firmware (e.g., basic-block vectors) much faster
+#           than the RTL model. Not cycle accurate.
+# Limit. :  No compressed instructions, CSR accesses read as zero, no traps.
+# -----------------------------------------------------------------------------
+
+from makehex import read_hex as _read_hex
+
+GPIO_ADR = 0x10000000
+
+def read_hex(path, memsize):
+    """Read a (sparse) hex image as written by script/makehex.py."""
+    return _read_hex(path, memsize)
+
+
+def sext(val, bits):
+    sign = 1 << (bits - 1)
+    return (val & (sign - 1)) - (val & sign)
+
+
+class IssHalt(Exception):
+    pass
+
+
+class Iss:
+    """RV32I hart with a flat memory at 0 and the fsoc GPIO at GPIO_ADR."""
+
+    def __init__(self, mem, pc=0):
+        self.mem = mem
+        self.pc = pc
+        self.x = [0] * 32
+        self.gpo = 0
+        self.instret = 0
+
+    def load(self, adr, size, signed):
+        if adr & 0xF0000000 == GPIO_ADR:
+            return 0
+        val = int.from_bytes(self.mem[adr:adr+size], 'little')
+        return sext(val, 8*size) & 0xFFFFFFFF if signed else val
+
+    def store(self, adr, size, val):
+        if adr & 0xF0000000 == GPIO_ADR:
+            self.gpo = val & 0x7
+            return
+        self.mem[adr:adr+size] = (val & ((1 << 8*size) - 1)).to_bytes(size, 'little')
+
+    def step(self):
+        """Execute one instruction. Returns True if control flow was redirected
+           (taken branch or jump), which ends a basic block."""
+        pc = self.pc
+        x = self.x
+        instr = int.from_bytes(self.mem[pc:pc+4], 'little')
+        if instr & 0x3 != 0x3:
+            raise NotImplementedError(f"compressed instruction at {pc:08x}")
+
+        opcode = instr & 0x7F
+        rd = (instr >> 7) & 0x1F
+        f3 = (instr >> 12) & 0x7
+        rs1 = x[(instr >> 15) & 0x1F]
+        rs2 = x[(instr >> 20) & 0x1F]
+        imm_i = sext(instr >> 20, 12)
+        npc = (pc + 4) & 0xFFFFFFFF
+        res = None
+        redirect = False
+
+        if opcode == 0x37:      # lui
+            res = instr & 0xFFFFF000
+        elif opcode == 0x17:    # auipc
+            res = (pc + (instr & 0xFFFFF000)) & 0xFFFFFFFF
+        elif opcode == 0x6F:    # jal
+            imm = sext(((instr >> 31) << 20) | (((instr >> 12) & 0xFF) << 12)
+                       | (((instr >> 20) & 0x1) << 11) | (((instr >> 21) & 0x3FF) << 1), 21)
+            res, npc, redirect = npc, (pc + imm) & 0xFFFFFFFF, True
+        elif opcode == 0x67:    # jalr
+            res, npc, redirect = npc, (rs1 + imm_i) & 0xFFFFFFFE, True
+        elif opcode == 0x63:    # branches
+            imm = sext(((instr >> 31) << 12) | (((instr >> 7) & 0x1) << 11)
+                       | (((instr >> 25) & 0x3F) << 5) | (((instr >> 8) & 0xF) << 1), 13)
+            a, b = sext(rs1, 32), sext(rs2, 32)
+            taken = [rs1 == rs2, rs1 != rs2, False, False, a < b, a >= b, rs1 < rs2, rs1 >= rs2][f3]
+            if taken:
+                npc, redirect = (pc + imm) & 0xFFFFFFFF, True
+        elif opcode == 0x03:    # loads
+            adr = (rs1 + imm_i) & 0xFFFFFFFF
+            res = self.load(adr, [1, 2, 4, 0, 1, 2][f3], f3 < 4)
+        elif opcode == 0x23:    # stores
+            imm = sext(((instr >> 25) << 5) | ((instr >> 7) & 0x1F), 12)
+            self.store((rs1 + imm) & 0xFFFFFFFF, [1, 2, 4][f3], rs2)
+        elif opcode in (0x13, 0x33):
+            b = imm_i & 0xFFFFFFFF if opcode == 0x13 else rs2
+            alt = (instr >> 30) & 0x1
+            if f3 == 0:
+                res = rs1 - b if (opcode == 0x33 and alt) else rs1 + b
+            elif f3 == 1:
+                res = rs1 << (b & 0x1F)
+            elif f3 == 2:
+                res = int(sext(rs1, 32) < sext(b, 32))
+            elif f3 == 3:
+                res = int(rs1 < b)
+            elif f3 == 4:
+                res = rs1 ^ b
+            elif f3 == 5:
+                res = (sext(rs1, 32) >> (b & 0x1F)) if alt else (rs1 >> (b & 0x1F))
+            elif f3 == 6:
+                res = rs1 | b
+            else:
+                res = rs1 & b
+            res &= 0xFFFFFFFF
+        elif opcode == 0x73:    # system
+            if f3 == 0:
+                raise IssHalt(f"ecall/ebreak/mret at {pc:08x}")
+            res = 0
+        elif opcode == 0x0F:    # fence
+            pass
+        else:
+            raise NotImplementedError(f"illegal instruction {instr:08x} at {pc:08x}")
+
+        if res is not None and rd != 0:
+            x[rd] = res
+        self.pc = npc
+        self.instret += 1
+        return redirect
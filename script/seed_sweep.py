@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  seed_sweep.py
+# Usage  :  Reruns place and route of a finished implementation (impl.soc.%)
+#           with several nextpnr seeds in parallel, reusing its synthesized
+#           netlist, and records the distribution of fmax.
+#           python3 seed_sweep.py <arch> <workdir> --seeds 5 [--report <report.json>]
+#           --report adds the distribution as "fmax_seeds" to a report of
+#           reporting.py.
+# Limit. :  nextpnr flows only (not xilinx). The area does not depend on the
+#           seed and is taken from the original run. A comparison of two
+#           sweeps needs at least MIN_SEEDS = 4 seeds on each side: with n <= 3,
+#           the smallest two-sided p-value is 0.1, and no change is
+#           significant at the default alpha of 0.05.
+# -----------------------------------------------------------------------------
+
+import os
+import re
+import json
+import shlex
+import argparse
+import statistics
+import subprocess
+from math import comb
+from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+ARCHS = ("ice40", "ecp5", "gowin", "gatemate")
+
+# Options of nextpnr whose value is an output file
+OUTPUTS = ("--asc", "--textcfg", "--write", "--sdf", "--report", "--placed-svg", "--routed-svg")
+
+RE_FMAX = re.compile(r"Max frequency for clock\s+'([^']+)':\s+([\d.]+) MHz")
+
+# Seeds per side for which the Mann-Whitney U test can reach p < 0.05
+MIN_SEEDS = 4
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="fmax distribution over nextpnr seeds")
+
+    parser.add_argument(
+        'arch',
+        choices=ARCHS,
+        help='Target architecture'
+    )
+
+    parser.add_argument(
+        'workdir',
+        type=Path,
+        help='Work directory of a finished implementation'
+    )
+
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        default=5,
+        help='Number of seeds, 1 .. SEEDS (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Parallel runs of nextpnr (default: available CPUs)'
+    )
+
+    parser.add_argument(
+        '--report',
+        type=Path,
+        default=None,
+        help='Report JSON of reporting.py to add the distribution to'
+    )
+
+    return parser.parse_args()
+
+
+def pnr_command(workdir):
+    """The nextpnr command of the Makefile generated by edalize."""
+    with open(workdir / "Makefile") as f:
+        for line in f:
+            if "nextpnr" in line and "--gui" not in line:
+                return shlex.split(line.replace("$(EDALIZE_LAUNCHER)", ""))
+    raise RuntimeError(f"No nextpnr command in {workdir / 'Makefile'}")
+
+
+def seed_command(cmd, seed):
+    """cmd writing its log and outputs to seed-specific files."""
+    out = []
+    prev = None
+    for arg in cmd:
+        if prev in OUTPUTS or prev in ("-l", "--log"):
+            arg = f"seed{seed}_{arg}"
+        elif prev in ("-o", "--vopt") and arg.startswith("out="):
+            # output of the himbaechel flows, e.g., -o out=<file>
+            arg = f"out=seed{seed}_{arg[4:]}"
+        out.append(arg)
+        prev = arg
+    return out + ["--seed", str(seed)]
+
+
+def fmax_from_log(log):
+    """fmax of the routed design: the last value reported for each clock,
+       and the lowest of these. None if no clock is constrained."""
+    last = {}
+    with open(log, errors='replace') as f:
+        for line in f:
+            m = RE_FMAX.search(line)
+            if m:
+                last[m.group(1)] = float(m.group(2))
+    return min(last.values()) if last else None
+
+
+def run_seed(workdir, cmd, seed):
+    cmd = seed_command(cmd, seed)
+    p = subprocess.run(cmd, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    log = workdir / cmd[cmd.index("-l") + 1]
+    if p.returncode != 0 or not log.exists():
+        return seed, None
+    return seed, fmax_from_log(log)
+
+
+def distribution(fmax):
+    return {
+        "min":      min(fmax),
+        "median":   statistics.median(fmax),
+        "max":      max(fmax),
+        "mean":     statistics.mean(fmax),
+        "stdev":    statistics.stdev(fmax) if len(fmax) > 1 else 0.0,
+    }
+
+
+def sweep(workdir, seeds, jobs=None):
+    cmd = pnr_command(workdir)
+    if "-l" not in cmd:
+        cmd[1:1] = ["-l", "next.log"]
+    jobs = jobs or len(os.sched_getaffinity(0))
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(lambda s: run_seed(workdir, cmd, s), range(1, seeds + 1)))
+    ok = [(s, f) for s, f in results if f is not None]
+    if not ok:
+        raise RuntimeError(f"No seed of {workdir} finished place and route")
+    return {
+        "seeds":    [s for s, _ in ok],
+        "failed":   [s for s, f in results if f is None],
+        "fmax":     [f for _, f in ok],
+    } | distribution([f for _, f in ok])
+
+
+@lru_cache(maxsize=None)
+def _u_count(m, n, u):
+    """Number of orderings of m + n values with Mann-Whitney statistic u."""
+    if u < 0 or u > m * n:
+        return 0
+    if m == 0 or n == 0:
+        return 1 if u == 0 else 0
+    return _u_count(m - 1, n, u - n) + _u_count(m, n - 1, u)
+
+
+def mann_whitney(a, b):
+    """Two-sided exact p-value that a and b come from the same distribution
+       (Mann-Whitney U, ties count half)."""
+    m, n = len(a), len(b)
+    if m == 0 or n == 0:
+        return 1.0
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in a for y in b)
+    total = comb(m + n, m)
+    lo = sum(_u_count(m, n, k) for k in range(0, int(u) + 1)) / total
+    hi = sum(_u_count(m, n, k) for k in range(int(-(-u // 1)), m * n + 1)) / total
+    return min(1.0, 2 * min(lo, hi))
+
+
+def min_p(m, n):
+    """Smallest two-sided p-value of mann_whitney for samples of size m and n."""
+    if m == 0 or n == 0:
+        return 1.0
+    return min(1.0, 2 / comb(m + n, m))
+
+
+def significant(new, old, alpha=0.05):
+    """(p, flag) for two fmax distributions of "fmax_seeds". The flag is None
+       if the samples are too small to reach p < alpha."""
+    p = mann_whitney(new["fmax"], old["fmax"])
+    if min_p(len(new["fmax"]), len(old["fmax"])) >= alpha:
+        return p, None
+    return p, p < alpha
+
+
+def main():
+    args = parse_args()
+    if args.seeds < MIN_SEEDS:
+        print(f"Warning: With fewer than {MIN_SEEDS} seeds, no fmax change can be significant at alpha 0.05.")
+    dist = sweep(args.workdir.resolve(), args.seeds, args.jobs)
+
+    print(f"{args.workdir.name}: fmax over {len(dist['seeds'])} seeds "
+          f"min {dist['min']:.2f}, median {dist['median']:.2f}, max {dist['max']:.2f} MHz "
+          f"(stdev {dist['stdev']:.2f})")
+    if dist["failed"]:
+        print(f"Failed seeds: {' '.join(str(s) for s in dist['failed'])}")
+
+    if args.report is not None:
+        with open(args.report) as f:
+            data = json.load(f)
+        data["fmax_seeds"] = dist
+        with open(args.report, "w") as f:
+            json.dump(data, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,11 @@ from pathlib import Path
 import argparse
 import os
 
+from elfread import read_elf, EF_RISCV_RVC
+
+# Exit code of the testbench when the watchdog detects a hang
+EXIT_HANG = 3
+
 def sim_args(parser):
     parser.add_argument("--bench",
         default=None,
@@ -41,6 +46,121 @@ def sim_args(parser):
         help='Use compressed instructions'
     )
 
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Build the core with the instruction prefetch buffer'
+    )
+
+    parser.add_argument(
+        '--hpm',
+        action='store_true',
+        help='Build the core with the event counters (CONF CSR), dump the memory to <bench>.mem'
+    )
+
+    parser.add_argument(
+        '--model',
+        type=str,
+        default=None,
+        help='Prebuilt Vfsoc_sim (e.g., from fsoc_sim_build.py) instead of building one'
+    )
+
+    parser.add_argument(
+        '--save_at_gpio',
+        type=str,
+        default=None,
+        help='Save a checkpoint when the measured region starts'
+    )
+
+    parser.add_argument(
+        '--save_every',
+        type=int,
+        default=None,
+        help='Save a checkpoint (checkpoint.vlt) every given number of cycles'
+    )
+
+    parser.add_argument(
+        '--restore',
+        type=str,
+        default=None,
+        help='Resume from a checkpoint of the same model'
+    )
+
+    parser.add_argument(
+        '--max_cycles',
+        type=int,
+        default=None,
+        help='Stop the simulation after the given number of cycles'
+    )
+
+    parser.add_argument(
+        '--watchdog',
+        type=int,
+        default=None,
+        help='Cycles without progress until a hang is reported (0 disables)'
+    )
+
+    parser.add_argument(
+        '--sampled',
+        action='store_true',
+        help='Estimate the bench time from sampled intervals (script/simpoint.py, RV32I only)'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=int,
+        default=100000,
+        help='Instructions per interval in sampled mode (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--imem_latency',
+        type=int,
+        default=None,
+        help='Wait states of instruction fetches (soc/tb/wb_latency.sv)'
+    )
+
+    parser.add_argument(
+        '--imem_burst',
+        type=int,
+        default=None,
+        help='Wait states of sequential instruction fetches (default: imem_latency)'
+    )
+
+    parser.add_argument(
+        '--dmem_latency',
+        type=int,
+        default=None,
+        help='Wait states of data accesses'
+    )
+
+    parser.add_argument(
+        '--dmem_burst',
+        type=int,
+        default=None,
+        help='Wait states of sequential data accesses (default: dmem_latency)'
+    )
+
+    parser.add_argument(
+        '--mem_jitter',
+        type=int,
+        default=None,
+        help='Random 0..n additional wait states per memory access'
+    )
+
+    parser.add_argument(
+        '--mem_seed',
+        type=int,
+        default=None,
+        help='Seed of the memory jitter'
+    )
+
+MEM_TIMING = ["imem_latency", "imem_burst", "dmem_latency", "dmem_burst", "mem_jitter", "mem_seed"]
+
+def mem_plusargs(args):
+    """Plusargs of the memory wait-state model."""
+    return ' '.join(f"+{a}={getattr(args, a)}" for a in MEM_TIMING if getattr(args, a) is not None)
+
 if __name__ == "__main__":
 
     fazyrv_root = Path(__file__).parent.parent
@@ -50,28 +170,59 @@ if __name__ == "__main__":
     sim_args(parser)
     args = parser.parse_args()
 
+    # the sampled mode profiles on rviss.py, which does not decode RVC
+    if args.sampled and (args.rvc not in (0, "0", "NONE")
+                         or read_elf(f"{cur}/{args.bench}")["flags"] & EF_RISCV_RVC):
+        parser.error("--sampled supports RV32I firmware only, not RVC")
+
     abs_bench = cur + f"/{args.bench}"
 
     assert args.chunksize is not None
     assert args.conf is not None
     assert args.rftype is not None
 
+    model = "work_simfsoc/Vfsoc_sim" if args.model is None else args.model
+
     cmd = ""
-    cmd += f"fusesoc library add fazyrv {fazyrv_root}"
-    cmd += f" && fusesoc library add fsoc {fazyrv_root}"
-    cmd += f" && riscv32-unknown-elf-objcopy -O binary {abs_bench} {abs_bench}.bin"
+    cmd += f"riscv32-unknown-elf-objcopy -O binary {abs_bench} {abs_bench}.bin"
     cmd += f" && python3 {fazyrv_root}/script/makehex.py {abs_bench}.bin {abs_bench}.hex"
-    cmd += f" && fusesoc run --target=verilator_tb --build --work-root=work_simfsoc fsoc \
---MEMSIZE=131072 --CHUNKSIZE={args.chunksize} --CONF={args.conf} --RFTYPE={args.rftype} --RVC={args.rvc} --BOOTADR=0 --DEBUG=1 --SIM=1"
-    cmd += f" && work_simfsoc/Vfsoc_sim \
-+firmware={abs_bench}.hex +embench=result"
-    if args.insn_timing:
-        cmd += f" +timing={args.bench}.timing"
+    if args.model is None:
+        cmd += f" && fusesoc library add fazyrv {fazyrv_root}"
+        cmd += f" && fusesoc library add fsoc {fazyrv_root}"
+        cmd += f" && fusesoc run --target=verilator_tb --build --work-root=work_simfsoc fsoc \
+--MEMSIZE=131072 --CHUNKSIZE={args.chunksize} --CONF={args.conf} --RFTYPE={args.rftype} --RVC={args.rvc} --PREFETCH={int(args.prefetch)} --HPM={int(args.hpm)} --BOOTADR=0 --DEBUG=1 --SIM=1"
+    if args.sampled:
+        cmd += f" && python3 {fazyrv_root}/script/simpoint.py {abs_bench}.hex \
+--model {os.path.abspath(model)} --interval {args.interval} --output result"
+        if mem_plusargs(args):
+            cmd += f" --plusargs '{mem_plusargs(args)}'"
+    else:
+        cmd += f" && {model} \
++firmware={abs_bench}.hex +embench=result {mem_plusargs(args)}"
+        if args.insn_timing:
+            cmd += f" +timing={args.bench}.timing"
+        if args.hpm:
+            cmd += f" +memdump={args.bench}.mem"
+        if args.max_cycles is not None:
+            cmd += f" +max_cycles={args.max_cycles}"
+        if args.watchdog is not None:
+            cmd += f" +watchdog={args.watchdog}"
+        if args.save_at_gpio is not None:
+            cmd += f" +save_at_gpio={os.path.abspath(args.save_at_gpio)}"
+        if args.save_every is not None:
+            cmd += f" +save_every={args.save_every}"
+        if args.restore is not None:
+            cmd += f" +restore={os.path.abspath(args.restore)}"
     cmd += " > sim.log 2>&1"
 
-    if os.system(cmd) == 0:
+    ret = os.waitstatus_to_exitcode(os.system(cmd))
+    if ret == 0:
         with open(f'{cur}/result', 'r') as f:
             print(f.read())
         exit(0)
     
     print("Bench time: 0")
+    if ret == EXIT_HANG:
+        with open(f'{cur}/sim.log', 'r') as f:
+            print(''.join(l for l in f if l.startswith("HANG")), end='')
+        exit(EXIT_HANG)
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  simpoint.py
+# Usage  :  Sampled simulation of an embench firmware on the fsoc model.
+#           The measured region (gpo[0] high) is profiled on rviss.py and
+#           split into intervals of a fixed instruction count. The intervals
+#           are clustered by their basic-block vectors, a few random intervals
+#           per cluster are simulated on the RTL model, and the cycle count
+#           of the region is estimated with a 95% confidence bound.
+#           python3 simpoint.py <fw.hex> --model <Vfsoc_sim> [--output result]
+# Limit. :  RV32I firmware only (rviss.py). Cache-less core, hence a short
+#           warmup before each interval is sufficient.
+# -----------------------------------------------------------------------------
+
+import re
+import math
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from rviss import Iss, IssHalt, read_hex
+from makehex import write_hex
+
+# instructions executed from reset until the interval's first one: jump to the
+# stub, restore word 0 (li, sw), restore x1..x31 (li), jump to the pc
+STUB_INSTRS = 1 + 2 + 1 + 2*31 + 1
+
+# instructions until the measured region must have started; crt0 loops forever
+# after main, so firmware that never sets gpo[0] would not halt the ISS
+MAX_START = 50000000
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sampled simulation of the measured region")
+
+    parser.add_argument(
+        'firmware',
+        type=Path,
+        help='Firmware hex as written by makehex.py'
+    )
+
+    parser.add_argument(
+        '--model',
+        type=Path,
+        required=True,
+        help='Path to the Vfsoc_sim executable'
+    )
+
+    parser.add_argument(
+        '--memsize',
+        type=int,
+        default=131072,
+        help='Memory size of the model in bytes (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=int,
+        default=100000,
+        help='Instructions per interval (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=2000,
+        help='Instructions simulated before each interval (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--clusters',
+        type=int,
+        default=6,
+        help='Maximum number of clusters (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--per_cluster',
+        type=int,
+        default=2,
+        help='Intervals simulated per cluster (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of parallel RTL simulations (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='Seed for clustering and sample selection (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--max_start',
+        type=int,
+        default=MAX_START,
+        help='Instructions until the measured region must have started (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--workdir',
+        type=Path,
+        default=Path("sampled"),
+        help='Directory for the resume images (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=None,
+        help='Write "Bench time" and "Bench error" to this file'
+    )
+
+    parser.add_argument(
+        '--plusargs',
+        type=str,
+        default="",
+        help='Additional plusargs of the model, e.g., memory wait states'
+    )
+
+    return parser.parse_args()
+
+
+# --- Profiling ---
+
+def profile(mem, interval, max_start=MAX_START):
+    """Run the firmware on the ISS and return the instret at which the measured
+       region starts, the basic-block vector of each interval of it, and the
+       lowest stack pointer seen."""
+    iss = Iss(bytearray(mem))
+    bbvs = []
+    region_start = None
+    bb = 0
+    sp_min = len(mem)
+    bbv = {}
+    try:
+        while region_start is None:
+            if iss.instret >= max_start:
+                raise RuntimeError(f"firmware did not enter the measured region (gpo[0]) "
+                                   f"within {max_start} instructions")
+            iss.step()
+            if iss.gpo & 0x1:
+                region_start, bb = iss.instret, iss.pc
+
+        while iss.gpo & 0x1:
+            bbv[bb] = bbv.get(bb, 0) + 1
+            if iss.step():
+                bb = iss.pc
+            sp_min = min(sp_min, iss.x[2])
+            if (iss.instret - region_start) % interval == 0:
+                bbvs.append(bbv)
+                bbv = {}
+    except IssHalt:
+        pass
+
+    if region_start is None:
+        raise RuntimeError("firmware halted before the measured region (gpo[0])")
+    if bbv:
+        bbvs.append(bbv)
+    return region_start, bbvs, sp_min
+
+
+def snapshots(mem, points):
+    """Run the firmware again and capture the architectural state at the given
+       instret values (ascending)."""
+    iss = Iss(bytearray(mem))
+    states = {}
+    for p in points:
+        while iss.instret < p:
+            iss.step()
+        states[p] = (bytes(iss.mem), list(iss.x), iss.pc)
+    return states
+
+
+# --- Clustering ---
+
+def bbv_matrix(bbvs, dims=15, seed=0):
+    """Normalize the BBVs and reduce them by a random projection (SimPoint)."""
+    blocks = sorted({b for v in bbvs for b in v})
+    index = {b: i for i, b in enumerate(blocks)}
+    m = np.zeros((len(bbvs), len(blocks)))
+    for r, v in enumerate(bbvs):
+        for b, n in v.items():
+            m[r, index[b]] = n
+        m[r] /= m[r].sum()
+    rng = np.random.default_rng(seed)
+    return m @ rng.uniform(-1, 1, (len(blocks), dims))
+
+
+def kmeans(data, k, seed=0, iters=100):
+    rng = np.random.default_rng(seed)
+    centers = data[rng.choice(len(data), k, replace=False)]
+    for _ in range(iters):
+        dist = ((data[:, None, :] - centers[None, :, :])**2).sum(axis=2)
+        labels = dist.argmin(axis=1)
+        new = np.array([data[labels == c].mean(axis=0) if (labels == c).any() else centers[c]
+                        for c in range(k)])
+        if np.allclose(new, centers):
+            break
+        centers = new
+    return labels
+
+
+def select(labels, per_cluster, seed=0):
+    """Pick a simple random sample of intervals within each cluster."""
+    rng = np.random.default_rng(seed)
+    picks = {}
+    for c in sorted(set(labels)):
+        members = np.flatnonzero(labels == c)
+        n = min(per_cluster, len(members))
+        picks[c] = sorted(int(i) for i in rng.choice(members, n, replace=False))
+    return picks
+
+
+# --- Resume images ---
+
+def enc_lui(rd, imm):
+    return ((imm & 0xFFFFF) << 12) | (rd << 7) | 0x37
+
+def enc_addi(rd, imm):
+    return ((imm & 0xFFF) << 20) | (rd << 15) | (rd << 7) | 0x13
+
+def enc_jal(rd, off):
+    off &= 0x1FFFFF
+    return (((off >> 20) & 0x1) << 31) | (((off >> 1) & 0x3FF) << 21) \
+         | (((off >> 11) & 0x1) << 20) | (((off >> 12) & 0xFF) << 12) | (rd << 7) | 0x6F
+
+def enc_li(rd, val):
+    lo = val & 0xFFF
+    lo = lo - 0x1000 if lo & 0x800 else lo
+    return [enc_lui(rd, ((val - lo) >> 12) & 0xFFFFF), enc_addi(rd, lo)]
+
+
+def resume_image(state, memsize, sp_min):
+    """Memory image that boots into the given architectural state. The stub is
+       placed below the lowest stack pointer seen, the reset vector at 0 jumps
+       to it, the stub restores word 0 and all registers and jumps to pc."""
+    mem, x, pc = state
+    img = bytearray(mem[:memsize])
+    stub_adr = (sp_min - 1024 - 4*STUB_INSTRS) & ~0x3
+
+    word0 = int.from_bytes(img[0:4], 'little')
+    stub = enc_li(1, word0) + [(1 << 20) | (2 << 12) | 0x23]     # sw x1, 0(x0)
+    for r in range(1, 32):
+        stub += enc_li(r, x[r])
+    stub.append(enc_jal(0, pc - (stub_adr + 4*len(stub))))
+    assert len(stub) + 1 == STUB_INSTRS
+
+    for i, w in enumerate(stub):
+        img[stub_adr+4*i:stub_adr+4*i+4] = w.to_bytes(4, 'little')
+    img[0:4] = enc_jal(0, stub_adr).to_bytes(4, 'little')
+    return img
+
+
+def run_sample(model, hexfile, warmup, length, plusargs=""):
+    mark = STUB_INSTRS + warmup
+    cmd = [model, f"+firmware={hexfile}", f"+mark_instret={mark}",
+           f"+max_instret={mark + length}"] + plusargs.split()
+    res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=hexfile.parent)
+    cycles = re.findall(r'(?<=Sample cycles: )[0-9]+', res.stdout.decode('utf-8', errors='replace'))
+    assert cycles, f"no sample cycles reported for {hexfile}"
+    return int(cycles[-1])
+
+
+# --- Estimation ---
+
+def estimate(lengths, labels, cpi):
+    """Stratified estimate of the total cycles and its 95% bound. cpi maps a
+       cluster to the CPIs of its simulated intervals."""
+    total, var = 0.0, 0.0
+    cvs = [np.std(s, ddof=1) / np.mean(s) for s in cpi.values() if len(s) > 1]
+    cv_pool = float(np.mean(cvs)) if cvs else None
+    exact = True
+
+    for c, samples in cpi.items():
+        members = np.flatnonzero(labels == c)
+        instrs = sum(lengths[i] for i in members)
+        mean = float(np.mean(samples))
+        total += mean * instrs
+
+        n, N = len(samples), len(members)
+        if n == N:
+            continue
+        if n > 1:
+            s = float(np.std(samples, ddof=1))
+        elif cv_pool is not None:
+            s = cv_pool * mean
+        else:
+            exact = False
+            continue
+        var += (instrs**2) * (s**2) / n * (1 - n / N)
+
+    bound = 1.96 * math.sqrt(var) if exact else None
+    return total, bound
+
+
+def sampled_sim(firmware, model, memsize=131072, interval=100000, warmup=2000,
+                clusters=6, per_cluster=2, jobs=1, seed=0, workdir=Path("sampled"), plusargs="",
+                max_start=MAX_START):
+    """Return the estimated cycles of the measured region and the 95% bound
+       in cycles (None if it cannot be derived)."""
+    mem = read_hex(firmware, memsize)
+    region_start, bbvs, sp_min = profile(mem, interval, max_start)
+    lengths = [sum(v.values()) for v in bbvs]
+
+    k = min(clusters, len(bbvs))
+    labels = kmeans(bbv_matrix(bbvs, seed=seed), k, seed=seed)
+    picks = select(labels, per_cluster, seed=seed)
+
+    starts = {i: region_start + i*interval for p in picks.values() for i in p}
+    warmups = {i: min(warmup, s) for i, s in starts.items()}
+    states = snapshots(mem, sorted({s - warmups[i] for i, s in starts.items()}))
+
+    workdir = Path(workdir).resolve()
+    workdir.mkdir(parents=True, exist_ok=True)
+    for i, s in starts.items():
+        write_hex(resume_image(states[s - warmups[i]], memsize, sp_min), workdir / f"{i}.hex")
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = {i: pool.submit(run_sample, Path(model).resolve(), workdir / f"{i}.hex",
+                                  warmups[i], lengths[i], plusargs) for i in starts}
+        cycles = {i: f.result() for i, f in futures.items()}
+
+    cpi = {c: [cycles[i] / lengths[i] for i in p] for c, p in picks.items()}
+    for c, p in picks.items():
+        print(f"cluster {c}: {int((labels == c).sum()):4} intervals, "
+              f"simulated {p}, CPI {np.mean(cpi[c]):.2f}")
+    return estimate(lengths, labels, cpi)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    total, bound = sampled_sim(args.firmware, args.model, args.memsize, args.interval,
+                               args.warmup, args.clusters, args.per_cluster, args.jobs,
+                               args.seed, args.workdir, args.plusargs, args.max_start)
+
+    result = f"Bench time: {round(total)}\n"
+    if bound is not None:
+        result += f"Bench error: {100 * bound / total:.2f}\n"
+    print(result, end='')
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            f.write(result)
@@ -4,6 +4,8 @@ import json
 import argparse
 from pathlib import Path
 from py_markdown_table.markdown_table import markdown_table
+from seed_sweep import significant
+import results_db
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -13,7 +15,9 @@ def parse_args():
     parser.add_argument(
         "reportdir",
         type=Path,
-        help="Path to the directory containing parsed reports"
+        nargs="?",
+        default=None,
+        help="Path to the directory containing parsed reports (or use --db)"
     )
 
     # Optional argument with a short and long flag
@@ -24,12 +28,43 @@ def parse_args():
         help="Path to the summary file (default: %(default)s)"
     )
 
+    parser.add_argument(
+        "--compare",
+        type=str,
+        default=None,
+        help="Directory of baseline reports (revision with --db) to list per-module and fmax deltas against"
+    )
+
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=None,
+        help="Read the reports from a results database (results_db.py) instead of reportdir"
+    )
+
+    parser.add_argument(
+        "--rev",
+        type=str,
+        default=None,
+        help="Revision of the reports in --db (default: latest per arch)"
+    )
+
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="Significance level of fmax changes over placement seeds (default: %(default)s)"
+    )
+
     args = parser.parse_args()
+    if (args.reportdir is None) == (args.db is None):
+        parser.error("either reportdir or --db is required")
     return args
 
-def read(root_dir: str | Path) -> dict[str, dict[str, object]]:
-    grouped: dict[str, dict[str, object]] = {}
-    json_files = sorted(root_dir.rglob("*.json"), key=lambda p: p.name.lower())
+def load(root_dir: str | Path) -> dict[str, dict[str, dict]]:
+    """Reports of reporting.py, {arch: {config: report}}."""
+    grouped: dict[str, dict[str, dict]] = {}
+    json_files = sorted(Path(root_dir).rglob("*.json"), key=lambda p: p.name.lower())
 
     for path in json_files:
         stem = path.stem
@@ -44,22 +79,139 @@ def read(root_dir: str | Path) -> dict[str, dict[str, object]]:
             except json.JSONDecodeError as e:
                 raise RuntimeError(f"Invalid JSON in {path}: {e}") from e
 
-        grouped.setdefault(first, []).append({'Config': second} | content['summary'])
+        grouped.setdefault(first, {})[second] = content
 
     return grouped
 
-def summarize(data: dict[str, dict[str, object]]) -> str:
+def _reports(reports: str | Path | dict) -> dict[str, dict[str, dict]]:
+    """Reports as returned by load() or results_db.reports(), or a directory."""
+    return reports if isinstance(reports, dict) else load(reports)
+
+def read(reports: str | Path | dict) -> dict[str, list[dict]]:
+    grouped: dict[str, list[dict]] = {}
+    for first, configs in _reports(reports).items():
+        for second, content in configs.items():
+            entry = {'Config': second} | content['summary']
+            if 'fmax_seeds' in content:
+                seeds = content['fmax_seeds']
+                entry |= {'fmax min': seeds['min'], 'fmax median': seeds['median'],
+                          'fmax max': seeds['max'], 'seeds': len(seeds['fmax'])}
+            grouped.setdefault(first, []).append(entry)
+
+    return grouped
+
+def read_modules(reports: str | Path | dict) -> dict[str, dict[str, dict]]:
+    """Per-module counts of area_modules.py, {arch: {config: modules}}."""
+    return {arch: mods for arch, configs in _reports(reports).items()
+            if (mods := {c: r["modules"] for c, r in configs.items() if "modules" in r})}
+
+def read_seeds(reports: str | Path | dict) -> dict[str, dict[str, dict]]:
+    """fmax distributions of seed_sweep.py, {arch: {config: fmax_seeds}}."""
+    return {arch: seeds for arch, configs in _reports(reports).items()
+            if (seeds := {c: r["fmax_seeds"] for c, r in configs.items() if "fmax_seeds" in r})}
+
+def module_order(configs: dict[str, dict]) -> list[str]:
+    """Module names, largest first (LUTs summed over all configs)."""
+    total: dict[str, int] = {}
+    for mods in configs.values():
+        for m, r in mods.items():
+            total[m] = total.get(m, 0) + r["self"]["lut"]
+    return sorted(total, key=lambda m: -total[m])
+
+def modules_table(configs: dict[str, dict]) -> str:
+    """LUTs of each module (without submodules) per config."""
+    order = module_order(configs)
+    rows = [{'Config': c} | {m: mods[m]["self"]["lut"] if m in mods else "-" for m in order}
+            for c, mods in configs.items()]
+    return markdown_table(rows).set_params(row_sep = 'markdown', quote = False).get_markdown()
+
+def deltas_table(configs: dict[str, dict], baseline: dict[str, dict]) -> str | None:
+    """Changed modules of the configs that are in both directories."""
+    rows = []
+    for c, mods in configs.items():
+        if c not in baseline:
+            continue
+        base = baseline[c]
+        for m in module_order({c: mods, "_": base}):
+            new = mods.get(m, {}).get("self", {})
+            old = base.get(m, {}).get("self", {})
+            dl = new.get("lut", 0) - old.get("lut", 0)
+            df = new.get("ff", 0) - old.get("ff", 0)
+            if dl == 0 and df == 0:
+                continue
+            rows.append({'Config': c, 'Module': m,
+                         'LUT': f"{old.get('lut', 0)} -> {new.get('lut', 0)}", 'dLUT': f"{dl:+d}",
+                         'FF': f"{old.get('ff', 0)} -> {new.get('ff', 0)}", 'dFF': f"{df:+d}"})
+    if not rows:
+        return None
+    return markdown_table(rows).set_params(row_sep = 'markdown', quote = False).get_markdown()
+
+def fmax_table(seeds: dict[str, dict], baseline: dict[str, dict], alpha: float) -> str | None:
+    """fmax of the configs that have seed sweeps in both directories; only
+       changes with p < alpha (Mann-Whitney U) are flagged, and sweeps too
+       small to reach p < alpha are marked as such."""
+    rows = []
+    for c, new in seeds.items():
+        if c not in baseline:
+            continue
+        old = baseline[c]
+        p, flag = significant(new, old, alpha)
+        rows.append({'Config': c,
+                     'fmax': f"{old['median']:.2f} -> {new['median']:.2f}",
+                     'dfmax': f"{new['median'] - old['median']:+.2f}",
+                     'range': f"{old['min']:.1f}..{old['max']:.1f} -> {new['min']:.1f}..{new['max']:.1f}",
+                     'p': f"{p:.3f}",
+                     'significant': "too few seeds" if flag is None else "yes" if flag else ""})
+    if not rows:
+        return None
+    return markdown_table(rows).set_params(row_sep = 'markdown', quote = False).get_markdown()
+
+def summarize(data: dict[str, dict[str, object]],
+              modules: dict[str, dict[str, dict]] | None = None,
+              baseline: dict[str, dict[str, dict]] | None = None,
+              seeds: dict[str, dict[str, dict]] | None = None,
+              baseline_seeds: dict[str, dict[str, dict]] | None = None,
+              alpha: float = 0.05) -> str:
     str = "# Summary Report\n\n"
     for arch, entries in data.items():
         str += f"## {arch}\n\n"
+        # e.g., only some configs have a seed sweep
+        keys = list(dict.fromkeys(k for e in entries for k in e))
+        entries = [{k: e.get(k, "-") for k in keys} for e in entries]
         str += markdown_table(entries).set_params(row_sep = 'markdown', quote = False).get_markdown()
         str += "\n\n"
+        if modules and arch in modules:
+            str += f"### {arch}: LUTs per module\n\n"
+            str += modules_table(modules[arch])
+            str += "\n\n"
+        if modules and baseline and arch in modules and arch in baseline:
+            table = deltas_table(modules[arch], baseline[arch])
+            str += f"### {arch}: per-module deltas to baseline\n\n"
+            str += table if table is not None else "No changes."
+            str += "\n\n"
+        if seeds and baseline_seeds and arch in seeds and arch in baseline_seeds:
+            table = fmax_table(seeds[arch], baseline_seeds[arch], alpha)
+            if table is not None:
+                str += f"### {arch}: median fmax over placement seeds to baseline (alpha {alpha})\n\n"
+                str += table
+                str += "\n\n"
     return str
     
 def main():
     args = parse_args()
-    data = read(args.reportdir)
-    s = summarize(data)
+    if args.db is not None:
+        db = results_db.connect(args.db)
+        reports = results_db.reports(db, args.rev)
+        compare = results_db.reports(db, args.compare) if args.compare is not None else None
+    else:
+        reports = load(args.reportdir)
+        compare = load(args.compare) if args.compare is not None else None
+    data = read(reports)
+    modules = read_modules(reports)
+    seeds = read_seeds(reports)
+    baseline = read_modules(compare) if compare is not None else None
+    baseline_seeds = read_seeds(compare) if compare is not None else None
+    s = summarize(data, modules, baseline, seeds, baseline_seeds, args.alpha)
     with open(args.output, "w", encoding="utf-8") as f:
         f.write(s)
 
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  synth_cache.py
+# Usage  :  Content-addressed cache of implementation results. The key hashes
+#           the RTL (rtl/, soc/rtl/), the constraints (soc/synth/), the core
+#           files, the scripts that make the report, the fusesoc parameters of
+#           the variant, and the versions of the tools. An entry holds the
+#           report of reporting.py and the logs and bitstream of the
+#           implementation.
+#           python3 synth_cache.py get <cache> <arch> <variant> -o <report.json>
+#           python3 synth_cache.py put <cache> <arch> <variant> <workdir> <report.json>
+#           python3 synth_cache.py key <cache> <arch> <variant>
+#           get exits with 1 on a miss. --seeds keys the results of a seed
+#           sweep (seed_sweep.py) separately.
+# -----------------------------------------------------------------------------
+
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+from datetime import datetime, timezone
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Inputs of an implementation, relative to ROOT
+SOURCES = ["rtl/*.v", "rtl/*.sv", "soc/rtl/*.v", "soc/rtl/*.sv", "soc/synth/*",
+           "fazyrv.core", "fsoc.core", "script/reporting.py", "script/timing_paths.py",
+           "script/area_modules.py"]
+
+# Tools whose version is part of the key; the first one found is used
+TOOLS = {
+    "ice40":    [["yosys", "-V"], ["nextpnr-ice40", "--version"]],
+    "ecp5":     [["yosys", "-V"], ["nextpnr-ecp5", "--version"]],
+    "gowin":    [["yosys", "-V"], ["nextpnr-himbaechel", "--version"], ["nextpnr-gowin", "--version"]],
+    "gatemate": [["yosys", "-V"], ["nextpnr-himbaechel", "--version"]],
+    "xilinx":   [["vivado", "-version"]],
+}
+
+# Files of the work directory that are kept next to the report
+ARTIFACTS = ["*.log", "*.bin", "*.bit", "*.fs", "*.rpt", "*.tim"]
+
+RVC = ("NONE", "COMB", "REG", "HYBR")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cache of implementation results")
+
+    parser.add_argument(
+        'cmd',
+        choices=['get', 'put', 'key'],
+        help='Look up, store, or print the key of a variant'
+    )
+
+    parser.add_argument(
+        'cache',
+        type=Path,
+        help='Cache directory'
+    )
+
+    parser.add_argument(
+        'arch',
+        type=str,
+        help='Target architecture, e.g., ice40'
+    )
+
+    parser.add_argument(
+        'variant',
+        type=str,
+        help='Variant <CHUNKSIZE>-<CONF>-<RFTYPE>[-<RVC>][-PF][-HPM]'
+    )
+
+    parser.add_argument(
+        'workdir',
+        type=Path,
+        nargs='?',
+        default=None,
+        help='Work directory of the implementation (put)'
+    )
+
+    parser.add_argument(
+        'report',
+        type=Path,
+        nargs='?',
+        default=None,
+        help='Report of reporting.py (put)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Where to restore the report (get)'
+    )
+
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        default=0,
+        help='Number of placement seeds of the report (default: single run)'
+    )
+
+    return parser.parse_args()
+
+
+def params(variant):
+    """fusesoc parameters of a variant, as derived by impl.soc.% (Makefile)."""
+    f = variant.split('-')
+    return {
+        "CHUNKSIZE":    f[0],
+        "CONF":         f[1],
+        "RFTYPE":       f[2],
+        "RVC":          f[3] if len(f) > 3 and f[3] in RVC else "NONE",
+        "PREFETCH":     int("PF" in f),
+        "HPM":          int("HPM" in f),
+    }
+
+
+@lru_cache(maxsize=None)
+def tool_versions(arch):
+    versions = {}
+    for cmd in TOOLS.get(arch, []):
+        if cmd[0] in versions or shutil.which(cmd[0]) is None:
+            continue
+        # alternatives share a slot, e.g., nextpnr-himbaechel or nextpnr-gowin
+        if cmd[0].startswith("nextpnr") and any(k.startswith("nextpnr") for k in versions):
+            continue
+        try:
+            p = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=60)
+            versions[cmd[0]] = p.stdout.decode(errors='replace').strip()
+        except subprocess.TimeoutExpired:
+            versions[cmd[0]] = "n/a"
+    return versions
+
+
+def source_files():
+    """Hashes of the sources of the checked out tree."""
+    files = {}
+    for pattern in SOURCES:
+        for p in sorted(ROOT.glob(pattern)):
+            if p.is_file():
+                files[str(p.relative_to(ROOT))] = hashlib.sha256(p.read_bytes()).hexdigest()
+    return files
+
+
+def inputs(arch, variant, seeds=0):
+    """Everything the result depends on: file hashes, parameters, tools,
+       and the seeds of a seed sweep."""
+    deps = {"arch": arch, "params": params(variant), "files": source_files(), "tools": dict(tool_versions(arch))}
+    if seeds:
+        deps["seeds"] = seeds
+    return deps
+
+
+def key(deps):
+    return hashlib.sha256(json.dumps(deps, sort_keys=True).encode()).hexdigest()
+
+
+def entry(cache, k):
+    return cache / k[:2] / k
+
+
+def get(cache, arch, variant, output, seeds=0):
+    """Restore the report of a variant. Returns False on a miss."""
+    src = entry(cache, key(inputs(arch, variant, seeds))) / "report.json"
+    if not src.exists():
+        return False
+    output.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(src, output)
+    return True
+
+
+def put(cache, arch, variant, workdir, report, seeds=0):
+    deps = inputs(arch, variant, seeds)
+    dst = entry(cache, key(deps))
+    tmp = dst.with_name(dst.name + f".tmp{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    shutil.copyfile(report, tmp / "report.json")
+    if workdir is not None and workdir.is_dir():
+        for pattern in ARTIFACTS:
+            for p in workdir.glob(pattern):
+                shutil.copyfile(p, tmp / p.name)
+    with open(tmp / "meta.json", "w") as f:
+        json.dump({"variant": variant, "date": datetime.now(timezone.utc).isoformat()} | deps, f, indent=2)
+
+    # concurrent puts of the same key store the same result; keep the first
+    try:
+        tmp.rename(dst)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return dst
+
+
+def main():
+    args = parse_args()
+    if args.cmd == "key":
+        print(key(inputs(args.arch, args.variant, args.seeds)))
+    elif args.cmd == "get":
+        if args.output is None:
+            raise SystemExit("get requires -o <report.json>")
+        if not get(args.cache, args.arch, args.variant, args.output, args.seeds):
+            exit(1)
+        print(f"Restored {args.arch}-{args.variant} from {args.cache}")
+    else:
+        if args.report is None:
+            raise SystemExit("put requires <workdir> <report.json>")
+        dst = put(args.cache, args.arch, args.variant, args.workdir, args.report, args.seeds)
+        print(f"Stored {args.arch}-{args.variant} in {dst}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  synth_sweep.py
+# Usage  :  Implements many fsoc variants in parallel (make impl.soc.<arch>-<v>)
+#           and parses each with reporting.py. Every job is pinned to its own
+#           set of --threads CPUs, optionally limited to --mem GiB, and
+#           retried when place and route fails. The markdown summary is
+#           rewritten after each finished report. Reports of yosys flows get
+#           a per-module breakdown (area_modules.py). --seeds reruns place
+#           and route of each variant with several seeds on the job's CPUs
+#           (seed_sweep.py). With --cache, unchanged variants are restored
+#           from the cache (synth_cache.py).
+#           python3 synth_sweep.py <arch> <variant> [<variant> ...] -j <jobs>
+#           <variant> as in the Makefile, e.g., 4-MIN-BRAM-NONE[-PF][-HPM].
+# Limit. :  Linux only (taskset and prlimit of util-linux). The memory limit
+#           applies to each process of a job, not to the job as a whole.
+# -----------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import json
+import queue
+import signal
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import summary
+import synth_cache
+import seed_sweep
+import area_modules
+
+SCRIPT = Path(__file__).resolve().parent
+ROOT = SCRIPT.parent
+
+# Lines of the log that show that place and route has been started
+PNR_TOOLS = ("nextpnr", "vivado")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Implement fsoc variants in parallel and summarize them")
+
+    parser.add_argument(
+        'arch',
+        type=str,
+        help='Target architecture, e.g., ice40'
+    )
+
+    parser.add_argument(
+        'variants',
+        nargs='+',
+        help='Variants <CHUNKSIZE>-<CONF>-<RFTYPE>-<RVC>[-PF][-HPM]'
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Number of parallel jobs (default: CPUs / threads, bounded by --mem)'
+    )
+
+    parser.add_argument(
+        '--threads',
+        type=int,
+        default=1,
+        help='CPUs each job is pinned to (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--mem',
+        type=float,
+        default=None,
+        help='Memory limit per job in GiB (default: none)'
+    )
+
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=2,
+        help='Retries of a job that failed in place and route (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--timeout',
+        type=int,
+        default=None,
+        help='Seconds after which an attempt is killed and retried (default: none)'
+    )
+
+    parser.add_argument(
+        '--seeds',
+        type=int,
+        default=0,
+        help='Placement seeds per variant for the fmax distribution (default: single run)'
+    )
+
+    parser.add_argument(
+        '--cache',
+        type=Path,
+        default=None,
+        help='Cache of implementation results, see synth_cache.py (default: none)'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip variants that already have a report'
+    )
+
+    parser.add_argument(
+        '--work_soc',
+        type=Path,
+        default=Path("work/work_soc"),
+        help='Work directory of the implementations (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '--summary_dir',
+        type=Path,
+        default=Path("work/summary_fsoc_soc"),
+        help='Directory of the parsed reports (default: %(default)s)'
+    )
+
+    parser.add_argument(
+        '-o', '--output',
+        type=Path,
+        default=None,
+        help='Markdown summary (default: work/soc_<arch>.md)'
+    )
+
+    return parser.parse_args()
+
+
+def mem_available():
+    """Available memory in bytes."""
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) * 1024
+    return None
+
+
+def pool_size(args):
+    cpus = sorted(os.sched_getaffinity(0))
+    jobs = args.jobs if args.jobs is not None else max(len(cpus) // args.threads, 1)
+    if args.mem is not None:
+        avail = mem_available()
+        if avail is not None:
+            jobs = min(jobs, max(int(avail // (args.mem * 2**30)), 1))
+    return jobs
+
+
+def cpu_sets(jobs, threads):
+    """Disjoint CPU sets, one per job slot, as long as there are enough CPUs."""
+    cpus = sorted(os.sched_getaffinity(0))
+    return [{cpus[(s*threads + t) % len(cpus)] for t in range(threads)} for s in range(jobs)]
+
+
+def limits(cpus, mem):
+    """Command prefix that pins the job to its CPUs and limits its memory before
+       exec, inherited by all tools of the job."""
+    prefix = ["taskset", "-c", ",".join(str(c) for c in sorted(cpus))]
+    if mem is not None:
+        prefix += ["prlimit", f"--data={int(mem * 2**30)}"]
+    return prefix
+
+
+def run(cmd, log, cpus, args, env):
+    """Run cmd in its own process group, kill the group on timeout. Returns
+       the exit code, negative on a signal or timeout."""
+    with open(log, 'a') as f:
+        f.write(f"$ {' '.join(cmd)}\n")
+        f.flush()
+        p = subprocess.Popen(limits(cpus, args.mem) + cmd, stdout=f, stderr=subprocess.STDOUT,
+                             cwd=ROOT, env=env, start_new_session=True)
+        try:
+            return p.wait(timeout=args.timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(p.pid, signal.SIGKILL)
+            p.wait()
+            f.write(f"Killed after {args.timeout} s\n")
+            return -signal.SIGKILL
+
+
+def pnr_started(log):
+    with open(log, 'r', errors='replace') as f:
+        return any(t in line for line in f for t in PNR_TOOLS)
+
+
+def job(name, args, slots, env):
+    """Implement and report one variant. Returns (name, status, attempts,
+       seconds)."""
+    variant = name.split('-', 1)[1]
+    report = args.summary_dir / f"{name}.json"
+    seeds = args.seeds if args.arch in seed_sweep.ARCHS else 0
+    if args.cache is not None and synth_cache.get(args.cache, args.arch, variant, report, seeds):
+        return name, "ok", 0, 0.0
+
+    cpus = slots.get()
+    try:
+        start = time.time()
+        work = args.work_soc / name
+        log = args.work_soc / f"{name}.log"
+        if log.exists():
+            log.unlink()
+
+        for attempt in range(1, args.retries + 2):
+            shutil.rmtree(work, ignore_errors=True)
+            rc = run([os.environ.get("MAKE", "make"), "--no-print-directory", f"impl.soc.{name}",
+                      f"WORK_DIR_SOC={args.work_soc.resolve()}"], log, cpus, args, env)
+            if rc == 0:
+                break
+            # synthesis errors are deterministic, place and route may be flaky
+            if rc > 0 and not pnr_started(log):
+                return name, f"failed (rc {rc}, see {log})", attempt, time.time() - start
+        else:
+            return name, f"failed (rc {rc}, see {log})", attempt, time.time() - start
+
+        rc = run([sys.executable, str(SCRIPT / "reporting.py"), args.arch, str(work.resolve()),
+                  "-o", str(report.resolve())], log, cpus, args, env)
+        if rc != 0:
+            return name, f"report failed (rc {rc}, see {log})", attempt, time.time() - start
+        if args.arch in area_modules.SYNTH:
+            rc = run([sys.executable, str(SCRIPT / "area_modules.py"), args.arch, variant,
+                      "--report", str(report.resolve())], log, cpus, args, env)
+            if rc != 0:
+                return name, f"module area failed (rc {rc}, see {log})", attempt, time.time() - start
+        if seeds:
+            rc = run([sys.executable, str(SCRIPT / "seed_sweep.py"), args.arch, str(work.resolve()),
+                      "--seeds", str(seeds), "--report", str(report.resolve())], log, cpus, args, env)
+            if rc != 0:
+                return name, f"seed sweep failed (rc {rc}, see {log})", attempt, time.time() - start
+        if args.cache is not None:
+            synth_cache.put(args.cache, args.arch, variant, work, report, seeds)
+        return name, "ok", attempt, time.time() - start
+    finally:
+        slots.put(cpus)
+
+
+def write_summary(args):
+    data = summary.read(args.summary_dir)
+    modules = summary.read_modules(args.summary_dir)
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(summary.summarize(data, modules))
+
+
+def main():
+    args = parse_args()
+    if args.output is None:
+        args.output = Path(f"work/soc_{args.arch}.md")
+    args.work_soc.mkdir(parents=True, exist_ok=True)
+    args.summary_dir.mkdir(parents=True, exist_ok=True)
+
+    names = [f"{args.arch}-{v}" for v in dict.fromkeys(args.variants)]
+    if args.resume:
+        names = [n for n in names if not (args.summary_dir / f"{n}.json").exists()]
+
+    jobs = min(pool_size(args), max(len(names), 1))
+    slots = queue.Queue()
+    for s in cpu_sets(jobs, args.threads):
+        slots.put(s)
+
+    # no jobserver of a calling make; limit the tools to the job's CPUs
+    env = {k: v for k, v in os.environ.items() if k not in ("MAKEFLAGS", "MFLAGS", "MAKELEVEL")}
+    env["OMP_NUM_THREADS"] = str(args.threads)
+
+    print(f"Implementing {len(names)} variants, {jobs} jobs of {args.threads} CPUs"
+          + (f" and {args.mem} GiB" if args.mem is not None else ""))
+
+    start = time.time()
+    failed = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(job, n, args, slots, env) for n in names]
+        for i, fut in enumerate(as_completed(futures), 1):
+            name, status, attempts, secs = fut.result()
+            if attempts == 0:
+                print(f"[{i}/{len(names)}] {name}: {status} (cached)", flush=True)
+            else:
+                retry = f", {attempts} attempts" if attempts > 1 else ""
+                print(f"[{i}/{len(names)}] {name}: {status} ({secs:.0f} s{retry})", flush=True)
+            if status == "ok":
+                with open(args.summary_dir / f"{name}.json") as f:
+                    print(f"    {json.load(f).get('summary', {})}", flush=True)
+                write_summary(args)
+            else:
+                failed.append(name)
+
+    print(f"Finished in {time.time() - start:.0f} s, summary in {args.output}")
+    if failed:
+        print(f"Failed: {' '.join(failed)}")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
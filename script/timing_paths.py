@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  timing_paths.py
+# Usage  :  Critical paths of implementations. reporting.py extracts them from
+#           the logs of nextpnr or the timing summary of Vivado into the report
+#           ("critical_paths"): start and end point, logic levels, and the
+#           delay per module. The query counts how often each module is on
+#           the critical paths of a directory of reports.
+#           python3 timing_paths.py query <reportdir> [--arch ice40] [--worst]
+#           python3 timing_paths.py extract <arch> <workdir> [--report <report.json>]
+# Limit. :  nextpnr reports one critical path per pair of clock domains only.
+#           Vivado lists the paths of report_timing_summary (-max_paths).
+# -----------------------------------------------------------------------------
+
+import re
+import json
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TOP = "fsoc"
+
+RE_MODULE = re.compile(r"\bmodule\s+(\w+)")
+RE_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+
+# nextpnr
+RE_NP_HEAD = re.compile(r"Critical path report for (?:clock '([^']+)' \((\w+) -> (\w+)\)"
+                        r"|cross-domain path '([^']+)' -> '([^']+)')")
+RE_NP_SEG = re.compile(r"^Info:\s+([\w-]+)\s+([\d.]+)\s+([\d.]+)\s+(Source|Net)\s+(\S+)")
+RE_NP_SINK = re.compile(r"^Info:\s+Sink\s+(\S+)")
+
+# Vivado
+RE_VV_SLACK = re.compile(r"^Slack(?: \((\w+)\))?\s*:\s*(-?[\d.]+)ns")
+RE_VV_FIELD = re.compile(r"^\s+(Source|Destination|Path Group|Data Path Delay|Logic Levels):\s+(\S+)")
+RE_VV_ROW = re.compile(r"(net \(fo=\d+[^)]*\)|\w+ \((?:Prop|Setup|Hold)_\w+\))\s+(-?[\d.]+)\s+(-?[\d.]+)\s+[rf]?\s*(\S+)\s*$")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Critical paths of implementations")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    query = sub.add_parser('query', help='Modules on the critical paths of a directory of reports')
+
+    query.add_argument(
+        'reportdir',
+        type=Path,
+        help='Directory of reports (reporting.py)'
+    )
+
+    query.add_argument(
+        '--arch',
+        type=str,
+        default=None,
+        help='Only reports of this architecture'
+    )
+
+    query.add_argument(
+        '--worst',
+        action='store_true',
+        help='Only the worst path of each report'
+    )
+
+    query.add_argument(
+        '--io',
+        action='store_true',
+        help='Include paths from or to I/O (<async>)'
+    )
+
+    extract = sub.add_parser('extract', help='Critical paths of a work directory')
+
+    extract.add_argument(
+        'arch',
+        type=str,
+        help='Target architecture'
+    )
+
+    extract.add_argument(
+        'workdir',
+        type=Path,
+        help='Work directory of the implementation'
+    )
+
+    extract.add_argument(
+        '-n', '--paths',
+        type=int,
+        default=10,
+        help='Number of paths (default: %(default)s)'
+    )
+
+    extract.add_argument(
+        '--report',
+        type=Path,
+        default=None,
+        help='Report JSON to add the paths to, printed otherwise'
+    )
+
+    return parser.parse_args()
+
+
+# --- Hierarchy ---------------------------------------------------------------
+
+def _skip_parens(text, i):
+    depth = 0
+    while i < len(text):
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def instances(sources):
+    """{module: {instance name: module}} of the RTL sources."""
+    text = {}
+    for p in sources:
+        src = RE_COMMENT.sub("", p.read_text(errors='replace'))
+        for body in re.split(r"\bendmodule\b", src):
+            m = RE_MODULE.search(body)
+            if m:
+                text[m.group(1)] = body[m.end():]
+
+    pattern = re.compile(r"\b(" + "|".join(sorted(text, key=len, reverse=True)) + r")\b\s*")
+    insts = {}
+    for mod, body in text.items():
+        found = insts.setdefault(mod, {})
+        for m in pattern.finditer(body):
+            i = m.end()
+            if body.startswith('#', i):
+                i = _skip_parens(body, body.index('(', i))
+            n = re.match(r"\s*(\w+)\s*(?:\[[^\]]*\]\s*)?\(", body[i:])
+            if n:
+                found[n.group(1)] = m.group(1)
+    return insts
+
+
+def sources(workdir=None):
+    """RTL of the implementation (copied by fusesoc), or of the repository."""
+    if workdir is not None:
+        files = sorted(Path(workdir).glob("src/*/rtl/*.*v")) + sorted(Path(workdir).glob("src/*/soc/rtl/*.*v"))
+        if files:
+            return files
+    return sorted(ROOT.glob("rtl/*.*v")) + sorted(ROOT.glob("soc/rtl/*.*v"))
+
+
+def module_of(name, insts):
+    """Module of a flattened cell or net name, e.g., fazyrv_alu for
+       i_fazyrv_core.i_fazyrv_core.i_fazyrv_alu.cmp_r_SB_LUT4_O. Scopes
+       that are no instance (generate blocks) are skipped."""
+    mod = TOP
+    for comp in re.split(r"[./]", name)[:-1]:
+        comp = re.sub(r"\[\d+\]$", "", comp.lstrip('\\'))
+        if comp in insts.get(mod, {}):
+            mod = insts[mod][comp]
+    return mod
+
+
+# --- Parsers -----------------------------------------------------------------
+
+def _path(frm, to, segments, start, end, insts):
+    modules = {}
+    m = TOP
+    for kind, delay, name in segments:
+        # cells inserted by nextpnr, e.g., to feed carry chains, belong to
+        # the logic they are part of
+        if not name.startswith("$nextpnr"):
+            m = module_of(name, insts)
+        modules[m] = round(modules.get(m, 0.0) + delay, 3)
+    return {
+        "from":     frm,
+        "to":       to,
+        "delay":    round(sum(d for _, d, _ in segments), 3),
+        "logic":    round(sum(d for k, d, _ in segments if k != "routing"), 3),
+        "routing":  round(sum(d for k, d, _ in segments if k == "routing"), 3),
+        "levels":   sum(1 for k, _, _ in segments if k == "logic"),
+        "start":    start,
+        "end":      end,
+        "start_module": module_of(start, insts) if start else None,
+        "end_module":   module_of(end, insts) if end else None,
+        "modules":  dict(sorted(modules.items(), key=lambda x: -x[1])),
+    }
+
+
+def nextpnr_paths(log, insts):
+    """Critical paths of the last timing report of a nextpnr log (after
+       routing), one per pair of clock domains."""
+    reports = {}
+    cur = None
+    with open(log, errors='replace') as f:
+        for line in f:
+            h = RE_NP_HEAD.search(line)
+            if h:
+                if h.group(1):
+                    frm, to = f"{h.group(2)} {h.group(1)}", f"{h.group(3)} {h.group(1)}"
+                else:
+                    frm, to = h.group(4), h.group(5)
+                cur = {"from": frm, "to": to, "segments": [], "start": None, "end": None}
+                reports[(frm, to)] = cur
+                continue
+            if cur is None:
+                continue
+            s = RE_NP_SEG.match(line)
+            if s:
+                kind, delay, what, name = s.group(1), float(s.group(2)), s.group(4), s.group(5)
+                if what == "Source":
+                    # cell.port
+                    name = name.rsplit('.', 1)[0]
+                    if cur["start"] is None:
+                        cur["start"] = name
+                    cur["end"] = name
+                cur["segments"].append((kind, delay, name))
+                continue
+            k = RE_NP_SINK.match(line)
+            if k:
+                cur["end"] = k.group(1).rsplit('.', 1)[0]
+                continue
+            if not line.startswith("Info:   ") or line.startswith("Info: Max"):
+                cur = None
+    return [_path(r["from"], r["to"], r["segments"], r["start"], r["end"], insts)
+            for r in reports.values() if r["segments"]]
+
+
+def vivado_paths(rpt, insts):
+    """Max delay paths of a Vivado timing summary."""
+    paths = []
+    cur = None
+    in_data = False
+    with open(rpt, errors='replace') as f:
+        for line in f:
+            s = RE_VV_SLACK.match(line)
+            if s:
+                cur = {"slack": float(s.group(2)), "segments": []}
+                paths.append(cur)
+                in_data = False
+                continue
+            if cur is None:
+                continue
+            v = RE_VV_FIELD.match(line)
+            if v:
+                cur[v.group(1)] = v.group(2)
+                continue
+            r = RE_VV_ROW.search(line)
+            if r:
+                kind, incr, res = r.group(1), float(r.group(2)), r.group(4)
+                cell = res.rsplit('/', 1)[0]
+                # the data path starts at the source cell, after its clock path
+                if not in_data and "Prop_" in kind and cell == cur.get("Source", "").rsplit('/', 1)[0]:
+                    in_data = True
+                if in_data:
+                    typ = "routing" if kind.startswith("net") else ("setup" if "Setup_" in kind else "logic")
+                    cur["segments"].append((typ, incr, res if typ == "routing" else cell))
+                continue
+            if in_data and re.match(r"^\s+-{20,}", line):
+                in_data = False
+    out = []
+    for p in paths:
+        if "Source" not in p or not p["segments"]:
+            continue
+        path = _path(p.get("Path Group", ""), p.get("Path Group", ""), p["segments"],
+                     p["Source"].rsplit('/', 1)[0], p.get("Destination", "").rsplit('/', 1)[0], insts)
+        path["slack"] = p["slack"]
+        if "Logic Levels" in p:
+            path["levels"] = int(p["Logic Levels"])
+        out.append(path)
+    return out
+
+
+def extract(arch, workdir, n=10):
+    """Top n critical paths of a work directory, longest first."""
+    workdir = Path(workdir)
+    insts = instances(sources(workdir))
+    if arch.startswith("xilinx"):
+        rpts = sorted(workdir.glob("*.runs/impl_1/*timing_summary_routed.rpt"))
+        paths = vivado_paths(rpts[0], insts) if rpts else []
+    else:
+        # next.log of edalize, not the logs of seed_sweep.py
+        logs = [p for p in sorted(workdir.glob("*.log"), key=lambda p: p.name != "next.log")
+                if not p.name.startswith("seed") and "Critical path report" in p.read_text(errors='replace')]
+        paths = nextpnr_paths(logs[0], insts) if logs else []
+    return sorted(paths, key=lambda p: -p["delay"])[:n]
+
+
+# --- Query -------------------------------------------------------------------
+
+def query(reportdir, arch=None, worst=False, io=False):
+    """Per module: reports with the module on a critical path, on the worst
+       path, and its mean share of the delay of the paths it is on. Paths
+       from or to I/O are skipped unless io is set."""
+    stats = {}
+    reports = 0
+    for path in sorted(Path(reportdir).rglob("*.json")):
+        if "-" not in path.stem or (arch is not None and path.stem.split("-", 1)[0] != arch):
+            continue
+        with open(path) as f:
+            paths = json.load(f).get("critical_paths")
+        if not io:
+            paths = [p for p in paths or [] if "<async>" not in (p["from"], p["to"])]
+        if not paths:
+            continue
+        reports += 1
+        if worst:
+            paths = paths[:1]
+        seen = set()
+        for i, p in enumerate(paths):
+            for m, d in p["modules"].items():
+                s = stats.setdefault(m, {"reports": 0, "worst": 0, "paths": 0, "share": 0.0})
+                s["paths"] += 1
+                s["share"] += d / p["delay"] if p["delay"] else 0.0
+                if m not in seen:
+                    s["reports"] += 1
+                    seen.add(m)
+                if i == 0 and d > 0:
+                    s["worst"] += 1
+    for s in stats.values():
+        s["share"] /= s["paths"]
+    return reports, stats
+
+
+def main():
+    args = parse_args()
+    if args.cmd == "extract":
+        paths = extract(args.arch, args.workdir, args.paths)
+        if args.report is None:
+            print(json.dumps(paths, indent=4))
+            return
+        with open(args.report) as f:
+            data = json.load(f)
+        data["critical_paths"] = paths
+        with open(args.report, "w") as f:
+            json.dump(data, f, indent=4)
+        return
+
+    reports, stats = query(args.reportdir, args.arch, args.worst, args.io)
+    print(f"{reports} reports with critical paths" + (f" ({args.arch})" if args.arch else ""))
+    print(f"{'module':<20} {'reports':>8} {'worst':>6} {'paths':>6} {'share':>6}")
+    for m, s in sorted(stats.items(), key=lambda x: (-x[1]["worst"], -x[1]["reports"], -x[1]["share"])):
+        print(f"{m:<20} {s['reports']:>8} {s['worst']:>6} {s['paths']:>6} {100*s['share']:>5.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,10 +18,15 @@ with open(binfile, "rb") as f:
 assert len(bindata) < 4*nwords
 assert len(bindata) % 4 == 0
 
-for i in range(nwords):
-    if i < len(bindata) // 4:
-        w = bindata[4*i : 4*i+4]
-        print("%02x%02x%02x%02x" % (w[3], w[2], w[1], w[0]))
-    else:
-        print("0")
-
+# Only the populated ranges are emitted, each after an @<word address> record.
+# The testbench memory is zero-initialized.
+skip = True
+for i in range(len(bindata) // 4):
+    w = bindata[4*i : 4*i+4]
+    if w == bytes(4) and (skip or not any(bindata[4*i : 4*i+32])):
+        skip = True
+        continue
+    if skip:
+        print("@%08x" % i)
+        skip = False
+    print("%02x%02x%02x%02x" % (w[3], w[2], w[1], w[0]))
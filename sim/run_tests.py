@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 - 2026 Meinhard Kissich
+# -----------------------------------------------------------------------------
+# File   :  run_tests.py
+# Usage  :  Run per-test riscv-tests firmwares in parallel and report pass/fail
+#           and cycle count of each test in JSON format.
+# -----------------------------------------------------------------------------
+
+import re
+import sys
+import json
+import shlex
+import argparse
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Run riscv-tests firmwares in parallel"
+    )
+
+    parser.add_argument(
+        "tests",
+        type=str,
+        nargs="+",
+        help="Names of the tests to run"
+    )
+
+    parser.add_argument(
+        "--sim",
+        type=str,
+        required=True,
+        help="Simulator command, +firmware=<hex> is appended"
+    )
+
+    parser.add_argument(
+        "--dir",
+        type=Path,
+        default=Path("pertest"),
+        help="Directory containing <test>/firmware.hex (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Number of parallel simulations (default: %(default)s)"
+    )
+
+    parser.add_argument(
+        "-o", "--output",
+        type=Path,
+        default=None,
+        help="Path to the JSON results file"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=600,
+        help="Wall-clock timeout per test in seconds (default: %(default)s)"
+    )
+
+    return parser.parse_args()
+
+
+def decode_result(returncode, stdout):
+    """Derive the status of a run from its exit code and console output."""
+    cycles_re = re.findall(r'(?<=CYCLES: )[0-9]+', stdout)
+    cycles = int(cycles_re[-1]) if cycles_re else None
+
+    if "TIMEOUT" in stdout:
+        status = "TIMEOUT"
+    elif returncode == 0 and "DONE" in stdout and "ERR" not in stdout:
+        status = "PASS"
+    else:
+        status = "FAIL"
+
+    return {'status': status, 'cycles': cycles, 'returncode': returncode}
+
+
+def run_test(sim, firmware, log, timeout):
+    cmd = shlex.split(sim) + [f"+firmware={firmware}"]
+    try:
+        res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'status': "TIMEOUT", 'cycles': None, 'returncode': None}
+
+    stdout = res.stdout.decode('utf-8', errors='replace')
+    with open(log, 'w') as f:
+        f.write(stdout)
+    return decode_result(res.returncode, stdout)
+
+
+def main():
+    args = parse_args()
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {t: pool.submit(run_test, args.sim,
+                              args.dir / t / "firmware.hex",
+                              args.dir / t / "sim.log",
+                              args.timeout) for t in args.tests}
+        for t, fut in futures.items():
+            results[t] = fut.result()
+            print(f"{t:12} {results[t]['status']:8} {results[t]['cycles']}")
+
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    failed = [t for t, r in results.items() if r['status'] != "PASS"]
+    if failed:
+        print(f"Failed: {' '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ localparam RVC        = `RVC;
 localparam RFTYPE     = `RFTYPE;
 localparam CONF       = `CONF;
 localparam MEMDLY1    = `MEMDLY1;
+localparam PREFETCH   = `PREFETCH;
+localparam HPM        = `HPM;
 
 localparam MTVAL      = 'h0;
 localparam BOOTADR    = 'h0;
@@ -93,11 +95,20 @@ always_ff @(posedge clk) begin
   end
 end
 
+// Cycles since reset release, reported per run
+logic [63:0] cycles_r = 'b0;
+
+always_ff @(posedge clk) begin
+  if (rst_n) cycles_r <= cycles_r + 'b1;
+end
+
 always_ff @(posedge clk) begin
   if (shift_reg == {"D", "O", "N", "E"}) begin
+    $display("\nCYCLES: %0d", cycles_r);
     $finish;
   end
   if (shift_reg[23:0] == {"E", "R", "R"}) begin
+    $display("\nCYCLES: %0d", cycles_r);
     $fatal;
   end
 end
@@ -153,7 +164,9 @@ fazyrv_top #(
   .MTVAL      ( MTVAL     ),
   .BOOTADR    ( BOOTADR   ),
   .RFTYPE     ( RFTYPE    ),
-  .MEMDLY1    ( MEMDLY1   )
+  .MEMDLY1    ( MEMDLY1   ),
+  .PREFETCH   ( PREFETCH  ),
+  .HPM        ( HPM       )
 ) i_fazyrv_core (
   .clk_i          ( clk          ),
   .rst_in         ( rst_n        ),
@@ -47,8 +47,18 @@ always @(posedge clk_i) begin
    end
 end
 
+logic [4095:0] firmware_file;
+
 initial begin
-	if(memfile != "") begin
+`ifdef SIM
+	// firmware images are sparse, unlisted words read as zero
+	for (int i = 0; i < depth; i++)
+	   mem_r[i] = '0;
+`endif
+	if ($value$plusargs("firmware=%s", firmware_file)) begin
+	   $display("Preloading %m from %0s", firmware_file);
+	   $readmemh(firmware_file, mem_r);
+	end else if(memfile != "") begin
 	   $display("Preloading %m from %s", memfile);
 	   $readmemh(memfile, mem_r);
 	end
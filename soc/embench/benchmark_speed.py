@@ -26,7 +26,7 @@ import sys
 import threading
 import queue
 
-from json import loads
+from json import loads, dump
 
 sys.path.append(
     os.path.join(os.path.abspath(os.path.dirname(__file__)), 'pylib')
@@ -42,6 +42,16 @@ from embench_core import log_benchmarks
 from embench_core import embench_stats
 from embench_core import output_format
 
+# Error bounds (percent) of estimated results, if the target module reports them
+error_data = {}
+
+# Exact cycles and cycles per instruction class of each benchmark, if the
+# target module reports them (gate mode)
+cycle_data = {}
+class_data = {}
+
+# Exit code of a run that the simulator's watchdog stopped early
+EXIT_HANG = 3
 
 def get_common_args():
     """Build a parser for all the arguments"""
@@ -132,6 +142,33 @@ def get_common_args():
         action='store_false',
         help='Launch all benchmarks in series (the default)'
     )
+    parser.add_argument(
+        '--gate',
+        type=str,
+        default=None,
+        help='Compare the cycles of each benchmark with the baseline of the '
+             'configuration in this JSON file and fail on regressions',
+    )
+    parser.add_argument(
+        '--gate-update',
+        action='store_true',
+        help='Store the cycles as the baseline of the configuration in the '
+             '--gate file instead of comparing',
+    )
+    parser.add_argument(
+        '--gate-tolerance',
+        type=float,
+        default=0.0,
+        help='Increase of cycles in percent of the baseline that is no '
+             'regression (default: 0)',
+    )
+    parser.add_argument(
+        '--gate-slack',
+        type=int,
+        default=0,
+        help='Increase of cycles that is no regression (default: 0); the '
+             'larger of both tolerances applies',
+    )
 
     return parser.parse_known_args()
 
@@ -179,6 +216,18 @@ def validate_args(args):
     globals()['get_target_args'] = newmodule.get_target_args
     globals()['build_benchmark_cmd'] = newmodule.build_benchmark_cmd
     globals()['decode_results'] = newmodule.decode_results
+    # optional: error bound of estimated (e.g., sampled) results
+    globals()['decode_error'] = getattr(newmodule, 'decode_error', None)
+    # optional: exact cycles, cycles per instruction class, and configuration
+    # name for the gate mode
+    globals()['decode_cycles'] = getattr(newmodule, 'decode_cycles', None)
+    globals()['decode_classes'] = getattr(newmodule, 'decode_classes', None)
+    globals()['target_config'] = getattr(newmodule, 'target_config', None)
+
+    if args.gate is not None and decode_cycles is None:
+        log.error(f'ERROR: Target module {args.target_module} does not '
+                  'report cycles for --gate: exiting')
+        sys.exit(1)
 
 
 def benchmark_speed(bench, target_args):
@@ -201,7 +250,11 @@ def benchmark_speed(bench, target_args):
                 cwd=appdir,
                 timeout=gp['timeout'],
             )
-            if res.returncode != 0:
+            if res.returncode == EXIT_HANG:
+                log.warning(f'Warning: Run of {bench} hung: '
+                            f'{res.stdout.decode("utf-8").strip().splitlines()[-1]}')
+                succeeded = False
+            elif res.returncode != 0:
                 log.warning(f'Warning: Run of {bench} failed.')
                 succeeded = False
         except subprocess.TimeoutExpired:
@@ -217,6 +270,16 @@ def benchmark_speed(bench, target_args):
             res.stdout.decode('utf-8'), res.stderr.decode('utf-8')
         )
         succeeded = exec_time > 0
+        if decode_error is not None:
+            error_data[bench] = decode_error(
+                res.stdout.decode('utf-8'), res.stderr.decode('utf-8')
+            )
+        if decode_cycles is not None:
+            cycle_data[bench] = decode_cycles(
+                res.stdout.decode('utf-8'), res.stderr.decode('utf-8')
+            )
+        if decode_classes is not None:
+            class_data[bench] = decode_classes(bench, appdir)
 
     if succeeded:
         return exec_time
@@ -324,6 +387,8 @@ def collect_data(benchmarks, remnant):
                     output = f'{round(raw_data[bench]):8,}'
                 else:
                     output = f'  {rel_data[bench]:6.6f}'
+                if error_data.get(bench) is not None:
+                    output += f'  +/- {error_data[bench]:.2f}%'
             # Want relative results (the default). Only use non-zero values.
             log.info(f'{bench:15}  {output:8}')
     elif gp['output_format'] == output_format.BASELINE:
@@ -342,6 +407,97 @@ def collect_data(benchmarks, remnant):
     return [], []
 
 
+def gate_config(remnant):
+    """Name of the configuration the baseline is stored under"""
+    if target_config is None:
+        return 'default'
+    return target_config(get_target_args(remnant))
+
+
+def gate_update(path, config, benchmarks):
+    """Store the cycles of all benchmarks as the baseline of config"""
+    baseline = {}
+    if os.path.isfile(path):
+        with open(path) as fileh:
+            baseline = loads(fileh.read())
+
+    baseline[config] = {}
+    for bench in benchmarks:
+        if cycle_data.get(bench) is None:
+            continue
+        baseline[config][bench] = {'cycles': cycle_data[bench]}
+        if class_data.get(bench):
+            baseline[config][bench]['classes'] = class_data[bench]
+
+    with open(path, 'w') as fileh:
+        dump(baseline, fileh, indent=4, sort_keys=True)
+    log.info(f'Gate: stored the cycles of {len(baseline[config])} benchmarks '
+             f'as baseline of {config} in {path}')
+
+
+def class_deltas(bench, old, new):
+    """Log the cycles per instruction class of a regression, largest
+       increase first"""
+    if not old or not new:
+        log.info(f'  {bench}: no cycles per instruction class, store the '
+                 'baseline and run with --insn_timing')
+        return
+    classes = sorted(set(old) | set(new),
+                     key=lambda c: (old.get(c, [0, 0])[1]
+                                    - new.get(c, [0, 0])[1]))
+    for cls in classes:
+        ocount, ocycles = old.get(cls, [0, 0])
+        ncount, ncycles = new.get(cls, [0, 0])
+        if ocount == ncount and ocycles == ncycles:
+            continue
+        log.info(f'  {bench:15}  {cls:7}  insns {ocount:>10,} -> '
+                 f'{ncount:>10,}  cycles {ocycles:>12,} -> {ncycles:>12,}  '
+                 f'({ncycles - ocycles:+,})')
+
+
+def gate_check(path, config, benchmarks, tolerance, slack):
+    """Compare the cycles of all benchmarks with the baseline of config.
+       Return the benchmarks that regressed."""
+    baseline = {}
+    if os.path.isfile(path):
+        with open(path) as fileh:
+            baseline = loads(fileh.read())
+    if config not in baseline:
+        log.warning(f'Warning: No baseline of {config} in {path}, nothing '
+                    'compared (see --gate-update)')
+        return []
+    baseline = baseline[config]
+
+    regressions = []
+    log.info(f'Gate: cycles of {config} against {path}')
+    log.info('Benchmark            Baseline         Cycles        Delta')
+    log.info('---------            --------         ------        -----')
+    for bench in benchmarks:
+        if bench not in baseline:
+            log.warning(f'Warning: No baseline of {bench}')
+            continue
+        if cycle_data.get(bench) is None:
+            log.warning(f'Warning: No exact cycles of {bench}')
+            continue
+        old = baseline[bench]['cycles']
+        new = cycle_data[bench]
+        limit = old + max(slack, old * tolerance / 100)
+        status = ''
+        if new > limit:
+            regressions.append(bench)
+            status = 'REGRESSION'
+        elif new < old:
+            status = 'improved'
+        log.info(f'{bench:15}  {old:12,}  {new:12,}  {new - old:+11,}  '
+                 f'{status}')
+
+    for bench in regressions:
+        class_deltas(bench, baseline[bench].get('classes'),
+                     class_data.get(bench))
+
+    return regressions
+
+
 def main():
     """Main program driving measurement of benchmark size"""
     # Establish the root directory of the repository, since we know this file is
@@ -381,6 +537,19 @@ def main():
         log.info('ERROR: Failed to compute speed benchmarks')
         sys.exit(1)
 
+    # Gate mode: fail on regressions of the cycles against a stored baseline
+    if args.gate is not None:
+        config = gate_config(remnant)
+        if args.gate_update:
+            gate_update(args.gate, config, benchmarks)
+        else:
+            regressions = gate_check(args.gate, config, benchmarks,
+                                     args.gate_tolerance, args.gate_slack)
+            if regressions:
+                log.info(f'ERROR: Cycles of {config} regressed: '
+                         f'{" ".join(regressions)}')
+                return 1
+
 
 # Make sure we have new enough Python and only run if this is the main package
 
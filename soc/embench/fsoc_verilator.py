@@ -15,14 +15,26 @@ __all__ = [
     'get_target_args',
     'build_benchmark_cmd',
     'decode_results',
+    'decode_error',
+    'decode_cycles',
+    'decode_classes',
+    'target_config',
 ]
 
 import argparse
+import os
 import re
 import sys
 
 from embench_core import log
 
+# script/ of the repository, next to soc/ (also via the symlink in pylib/)
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'script')
+)
+
+from hpm_decode import parse_timing, class_cycles
+
 cpu_mhz = 1
 
 def get_target_args(remnant):
@@ -57,12 +69,100 @@ def get_target_args(remnant):
         help='Regfile implementation ("LOGIC", "BRAM", "BRAM_BP")'
     )
 
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Build the core with the instruction prefetch buffer'
+    )
+
+    parser.add_argument(
+        '--hpm',
+        action='store_true',
+        help='Build the core with the event counters and dump the memory'
+    )
+
     parser.add_argument(
         '--insn_timing',
         action='store_true',
         help='Report insn timing'
     )
 
+    parser.add_argument(
+        '--model',
+        type=str,
+        default=None,
+        help='Prebuilt Vfsoc_sim model to run all benchmarks on'
+    )
+
+    parser.add_argument(
+        '--max_cycles',
+        type=int,
+        default=None,
+        help='Simulated cycle limit per benchmark'
+    )
+
+    parser.add_argument(
+        '--watchdog',
+        type=int,
+        default=None,
+        help='Cycles without progress until a run is reported as hung'
+    )
+
+    parser.add_argument(
+        '--sampled',
+        action='store_true',
+        help='Estimate bench times from sampled intervals'
+    )
+
+    parser.add_argument(
+        '--interval',
+        type=int,
+        default=100000,
+        help='Instructions per interval in sampled mode'
+    )
+
+    parser.add_argument(
+        '--imem_latency',
+        type=int,
+        default=None,
+        help='Wait states of instruction fetches'
+    )
+
+    parser.add_argument(
+        '--imem_burst',
+        type=int,
+        default=None,
+        help='Wait states of sequential instruction fetches'
+    )
+
+    parser.add_argument(
+        '--dmem_latency',
+        type=int,
+        default=None,
+        help='Wait states of data accesses'
+    )
+
+    parser.add_argument(
+        '--dmem_burst',
+        type=int,
+        default=None,
+        help='Wait states of sequential data accesses'
+    )
+
+    parser.add_argument(
+        '--mem_jitter',
+        type=int,
+        default=None,
+        help='Random 0..n additional wait states per memory access'
+    )
+
+    parser.add_argument(
+        '--mem_seed',
+        type=int,
+        default=None,
+        help='Seed of the memory jitter'
+    )
+
     return parser.parse_args(remnant)
 
 
@@ -82,9 +182,31 @@ def build_benchmark_cmd(bench, args):
             "--conf", f"{conf}",
             "--rftype", f"{rftype}"]
     
+    if args.prefetch:
+        cmd.append("--prefetch")
+
+    if args.hpm:
+        cmd.append("--hpm")
+
     if args.insn_timing:
         cmd.append("--insn_timing")
 
+    if args.max_cycles is not None:
+        cmd += ["--max_cycles", f"{args.max_cycles}"]
+
+    if args.watchdog is not None:
+        cmd += ["--watchdog", f"{args.watchdog}"]
+
+    if args.model is not None:
+        cmd += ["--model", f"{os.path.abspath(args.model)}"]
+
+    if args.sampled:
+        cmd += ["--sampled", "--interval", f"{args.interval}"]
+
+    for arg in ["imem_latency", "imem_burst", "dmem_latency", "dmem_burst", "mem_jitter", "mem_seed"]:
+        if getattr(args, arg) is not None:
+            cmd += [f"--{arg}", f"{getattr(args, arg)}"]
+
     return cmd
 
 def decode_results(stdout_str, stderr_str):
@@ -99,3 +221,57 @@ def decode_results(stdout_str, stderr_str):
 
     return int(time_re[0]) / cpu_mhz / 1000.0
 
+
+def decode_error(stdout_str, stderr_str):
+    """Extract the 95% error bound in percent of a sampled run. Return None
+        for full runs or if the bound could not be derived."""
+
+    error_re = re.findall(r'(?<=Bench error: )[0-9.]+', stdout_str)
+
+    if not error_re:
+        return None
+
+    return float(error_re[0])
+
+
+def decode_cycles(stdout_str, stderr_str):
+    """Extract the exact cycles of a run. Return None for sampled runs, whose
+        bench time is an estimate."""
+
+    if re.search('Bench error: ', stdout_str):
+        return None
+
+    time_re = re.findall('(?<=Bench time: )[0-9]+', stdout_str)
+
+    if not time_re:
+        return None
+
+    return int(time_re[0])
+
+
+def decode_classes(bench, appdir):
+    """Cycles and count per instruction class of the timing trace of a run
+        with --insn_timing, {class: [count, cycles]}. Return None without
+        a trace."""
+
+    trace = os.path.join(appdir, f'{bench}.timing')
+    if not os.path.isfile(trace):
+        return None
+
+    return {c: list(v) for c, v in class_cycles(parse_timing(trace)).items()}
+
+
+def target_config(args):
+    """Name of the simulated configuration, e.g., 4-MIN-BRAM-NONE-PF, with
+        the memory wait states, if any."""
+
+    name = [f'{args.chunksize}', args.conf, args.rftype, 'NONE']
+    if args.prefetch:
+        name.append('PF')
+    if args.hpm:
+        name.append('HPM')
+    for arg in ["imem_latency", "imem_burst", "dmem_latency", "dmem_burst", "mem_jitter", "mem_seed"]:
+        if getattr(args, arg) is not None:
+            name.append(f'{arg}{getattr(args, arg)}')
+
+    return '-'.join(name)
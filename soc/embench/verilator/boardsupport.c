@@ -10,6 +10,13 @@
 #include <support.h>
 #include "boardsupport.h"
 
+#ifdef FAZYRV_HPM
+#include "fazyrv_hpm.h"
+
+/* Counters at start [0] and stop [1] of the benchmark */
+volatile struct fazyrv_hpm fazyrv_hpm_dump[2];
+#endif
+
 void
 initialise_board ()
 {
@@ -21,11 +28,17 @@ start_trigger ()
   __asm__ volatile ("li a0, 1\n\t");
   __asm__ volatile ("li a1, %0\n\t" : : "i"(PIN_ADR));
   __asm__ volatile ("sw a0, 0(a1)\n\t" : : : "memory");
+#ifdef FAZYRV_HPM
+  fazyrv_hpm_snapshot (&fazyrv_hpm_dump[0], 0);
+#endif
 }
 
 void __attribute__ ((noinline)) __attribute__ ((externally_visible))
 stop_trigger ()
 {
+#ifdef FAZYRV_HPM
+  fazyrv_hpm_snapshot (&fazyrv_hpm_dump[1], 1);
+#endif
   __asm__ volatile ("li a0, 0\n\t");
   __asm__ volatile ("li a1, %0\n\t" : : "i"(PIN_ADR));
   __asm__ volatile ("sw a0, 0(a1)\n\t" : : : "memory");
@@ -0,0 +1,57 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  fazyrv_hpm.h
+// Usage :  Snapshot of the FazyRV counters into a record in memory, to be
+//          read from a memory dump by script/hpm_decode.py. Requires a core
+//          with CONF = "CSR" and HPM = 1.
+//            static struct fazyrv_hpm rec;
+//            fazyrv_hpm_snapshot(&rec, 0);
+// -----------------------------------------------------------------------------
+
+#ifndef FAZYRV_HPM_H
+#define FAZYRV_HPM_H
+
+#include <stdint.h>
+
+// "FHPM", marks a valid record
+#define FAZYRV_HPM_MAGIC 0x4d504846u
+
+// Layout is fixed, see RECORD in script/hpm_decode.py
+struct fazyrv_hpm {
+  uint32_t magic;
+  uint32_t tag;       // user defined, e.g., 0 at start and 1 at stop
+  uint32_t cycle;     // cycle
+  uint32_t instret;   // instret
+  uint32_t ifstall;   // hpmcounter3: instruction fetch stall cycles
+  uint32_t dmstall;   // hpmcounter4: data memory stall cycles
+  uint32_t branch;    // hpmcounter5: taken branches
+  uint32_t shift;     // hpmcounter6: shift cycles
+  uint32_t ldst;      // hpmcounter7: loads and stores
+};
+
+#define FAZYRV_CSRR(csr) \
+  ({ uint32_t v; __asm__ volatile ("csrr %0, " #csr : "=r"(v)); v; })
+
+static inline void __attribute__ ((always_inline))
+fazyrv_hpm_snapshot (volatile struct fazyrv_hpm *r, uint32_t tag)
+{
+  uint32_t cycle    = FAZYRV_CSRR(cycle);
+  uint32_t instret  = FAZYRV_CSRR(instret);
+  uint32_t ifstall  = FAZYRV_CSRR(hpmcounter3);
+  uint32_t dmstall  = FAZYRV_CSRR(hpmcounter4);
+  uint32_t branch   = FAZYRV_CSRR(hpmcounter5);
+  uint32_t shift    = FAZYRV_CSRR(hpmcounter6);
+  uint32_t ldst     = FAZYRV_CSRR(hpmcounter7);
+
+  r->tag      = tag;
+  r->cycle    = cycle;
+  r->instret  = instret;
+  r->ifstall  = ifstall;
+  r->dmstall  = dmstall;
+  r->branch   = branch;
+  r->shift    = shift;
+  r->ldst     = ldst;
+  r->magic    = FAZYRV_HPM_MAGIC;
+}
+
+#endif
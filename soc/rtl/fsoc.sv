@@ -13,6 +13,8 @@
 //  - MEMFILE   Firmware.
 //  - MEMSIZE   Memory size in _words_.
 //  - MEMDLY1   Flag whether to use memory with fixed delay (see FazyRV core).
+//  - PREFETCH  Flag whether to prefetch the next instruction (see FazyRV core).
+//  - HPM       Flag whether to implement the event counters (see FazyRV core).
 //  - GPOCNT    Number of outputs.
 //
 // Ports
@@ -20,6 +22,8 @@
 //  - rst_in    Reset, low active.
 //  - gpi_i     General purpose inputs.
 //  - gpo_o     General purpose outputs.
+//  - mem_wait_i  Holds back requests to the memory (SIM only), e.g., by the
+//                wait-state model of soc/tb/fsoc_sim.sv.
 // -----------------------------------------------------------------------------
 
 module fsoc #( 
@@ -32,6 +36,8 @@ module fsoc #(
   parameter MEMFILE   = "",
   parameter MEMSIZE   = 64,
   parameter MEMDLY1   = 0,
+  parameter PREFETCH  = 0,
+  parameter HPM       = 0,
   parameter GPOCNT    = 1
 ) (
   input  logic              clk_i,
@@ -39,6 +45,10 @@ module fsoc #(
 
   input  logic              gpi_i,
   output logic [GPOCNT-1:0] gpo_o
+`ifdef SIM
+  ,
+  input  logic              mem_wait_i
+`endif
 );
 
 // GPIO: 0x1xxxxxxx
@@ -97,7 +107,12 @@ assign wb_mem_wdat  = wb_cpu_dmem_wdat;
 assign wb_mem_be    = wb_cpu_dmem_be;
 assign wb_mem_we    = wb_cpu_dmem_we & wb_cpu_dmem_stb;
 assign wb_mem_cyc   = ~sel_gpio & (wb_cpu_imem_stb | wb_cpu_dmem_stb);
+
+`ifdef SIM
+assign wb_mem_stb   = wb_mem_cyc & ~mem_wait_i;
+`else
 assign wb_mem_stb   = wb_mem_cyc;
+`endif
 
 assign wb_gpio_cyc   = sel_gpio & wb_cpu_dmem_stb;
 assign wb_gpio_stb   = wb_gpio_cyc;
@@ -154,7 +169,9 @@ fazyrv_top #(
   .MTVAL      ( MTVAL     ),
   .BOOTADR    ( BOOTADR   ),
   .RFTYPE     ( RFTYPE    ),
-  .MEMDLY1    ( MEMDLY1   )
+  .MEMDLY1    ( MEMDLY1   ),
+  .PREFETCH   ( PREFETCH  ),
+  .HPM        ( HPM       )
 ) i_fazyrv_core (
   .clk_i          ( clk_i             ),
   .rst_in         ( rst_in            ),
@@ -200,10 +217,13 @@ initial
   always @(posedge clk_i) begin
     if (sig_en & (f != 0))
       $fwrite(f, "%c", wb_mem_wdat[7:0]);
+`ifndef FSOC_BATCH
+    // soc/tb/fsoc_batch.sv observes halt_en per instance instead
     else if(halt_en) begin
       $display("Test complete");
       $finish;
     end
+`endif
   end
 `endif
 
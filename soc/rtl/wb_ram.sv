@@ -13,14 +13,64 @@ module wb_ram #(parameter DEPTH=128, parameter MEMFILE="")
 
 );
 
-(* ram_style = "block" *) logic [31:0] mem_r [0:DEPTH-1];
-
 logic read_enable;
 logic write_enable;
 
 assign read_enable   = cyc_i & stb_i & ~we_i;
 assign write_enable  = cyc_i & stb_i & we_i;
 
+`ifdef SPARSE_MEM
+
+// Simulation only: paged memory in soc/tb/sparse_mem.cpp, pages are allocated
+// on first write and unallocated pages read as zero. Startup time and memory
+// footprint do not depend on DEPTH.
+import "DPI-C" context function int  sparse_mem_read(input int adr);
+import "DPI-C" context function void sparse_mem_write(input int adr, input int dat, input int be);
+import "DPI-C" context function void sparse_mem_load(input string file);
+import "DPI-C" context function void sparse_mem_free();
+
+always @(posedge clk_i) begin
+   ack_o <= 'b0;
+
+   if (read_enable) begin
+      dat_o <= sparse_mem_read({{(32-$clog2(DEPTH)){1'b0}}, adr_i});
+      ack_o <= ~ack_o;
+   end else if (write_enable) begin
+      sparse_mem_write({{(32-$clog2(DEPTH)){1'b0}}, adr_i}, dat_i, {28'b0, be_i});
+      ack_o <= ~ack_o;
+   end
+end
+
+initial begin
+	if(MEMFILE != "") begin
+	   $display("Preloading %m from %s", MEMFILE);
+	   sparse_mem_load(MEMFILE);
+	end
+end
+
+final sparse_mem_free();
+
+// Testbench access
+function int peek(input int idx);
+   return sparse_mem_read(idx % DEPTH);
+endfunction
+
+function void poke(input int idx, input int val);
+   sparse_mem_write(idx % DEPTH, val, 'hf);
+endfunction
+
+function void load(input string file);
+   sparse_mem_load(file);
+endfunction
+
+function void clear();
+   sparse_mem_free();
+endfunction
+
+`else
+
+(* ram_style = "block" *) logic [31:0] mem_r [0:DEPTH-1];
+
 always @(posedge clk_i) begin
    ack_o <= 'b0;
 
@@ -43,5 +93,26 @@ initial begin
 	end
 end
 
+`ifdef SIM
+// Testbench access
+function int peek(input int idx);
+   return mem_r[idx % DEPTH];
+endfunction
+
+function void poke(input int idx, input int val);
+   mem_r[idx % DEPTH] = val;
+endfunction
+
+function void load(input string file);
+   $readmemh(file, mem_r);
+endfunction
+
+function void clear();
+   for (int i = 0; i < DEPTH; i++)
+      mem_r[i] = '0;
+endfunction
+`endif
+
+`endif
 
 endmodule
\ No newline at end of file
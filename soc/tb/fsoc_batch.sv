@@ -0,0 +1,201 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  fsoc_batch.sv
+// Usage :  NINST independent fsoc instances (slots) in one simulation model,
+//          each with its own memory and reset. Built as shared library by
+//          the fusesoc target verilator_batch and driven by
+//          script/fsoc_batch.py.
+// Param
+//  - NINST     Number of slots (at most 64).
+//  - others    See fsoc.
+//
+// Ports
+//  - clk_i     Clock input, shared by all slots.
+//  - rst_in    Reset per slot, low active.
+//  - done_o    Slot completed: success/fail GPO set or signature halt.
+// -----------------------------------------------------------------------------
+
+`default_nettype none
+
+module fsoc_batch_slot #(
+  parameter SLOT      = 0,
+  parameter MEMFILE   = "",
+  parameter MEMSIZE   = 8192,
+  parameter CHUNKSIZE = 1,
+  parameter RVC       = "NONE",
+  parameter RFTYPE    = "BRAM",
+  parameter CONF      = "MIN",
+  parameter MTVAL     = 'h0,
+  parameter BOOTADR   = 'h0,
+  parameter PREFETCH  = 0,
+  parameter HPM       = 0
+) (
+  input  logic clk_i,
+  input  logic rst_in,
+  output logic done_o
+);
+
+localparam GPOCNT = 3;
+
+logic [GPOCNT-1:0] gpo;
+logic [GPOCNT-1:0] slot_gpo;
+logic              gpo_valid_r;
+logic              halt_r;
+logic [63:0]       cycles_r;
+logic [63:0]       instret_r;
+
+// --- Memory wait states ---
+// Set by plusargs (soc/tb/wb_latency.sv), on the memory bus of the core
+logic mem_wait;
+
+wb_latency i_latency (
+  .clk_i    ( clk_i                  ),
+  .cyc_i    ( i_fsoc.wb_mem_cyc      ),
+  .instr_i  ( i_fsoc.wb_cpu_imem_stb ),
+  .adr_i    ( i_fsoc.wb_mem_adr      ),
+  .ack_i    ( i_fsoc.wb_mem_ack      ),
+  .wait_o   ( mem_wait               )
+);
+
+fsoc #(
+  .CHUNKSIZE  ( CHUNKSIZE ),
+  .RVC        ( RVC       ),
+  .CONF       ( CONF      ),
+  .RFTYPE     ( RFTYPE    ),
+  .MTVAL      ( MTVAL     ),
+  .BOOTADR    ( BOOTADR   ),
+  .MEMFILE    ( MEMFILE   ),
+  .MEMSIZE    ( MEMSIZE   ),
+  .MEMDLY1    ( 0         ),
+  .PREFETCH   ( PREFETCH  ),
+  .HPM        ( HPM       ),
+  .GPOCNT     ( GPOCNT    )
+) i_fsoc (
+  .clk_i      ( clk_i   ),
+  .rst_in     ( rst_in  ),
+  .gpi_i      ( 1'b0    ),
+  .gpo_o      ( gpo     ),
+  .mem_wait_i ( mem_wait )
+);
+
+logic halt;
+`ifdef SIGNATURE
+assign halt = i_fsoc.halt_en;
+`else
+assign halt = 1'b0;
+`endif
+
+// The GPIO has no reset, ignore its value until the firmware writes it
+always @(posedge clk_i) begin
+  if (~rst_in)
+    gpo_valid_r <= 1'b0;
+  else if (i_fsoc.wb_gpio_cyc & i_fsoc.wb_gpio_we)
+    gpo_valid_r <= 1'b1;
+end
+
+assign slot_gpo = gpo_valid_r ? gpo : '0;
+assign done_o   = halt_r | slot_gpo[1] | slot_gpo[2];
+
+always @(posedge clk_i) begin
+  if (~rst_in) begin
+    halt_r    <= 'b0;
+    cycles_r  <= 'b0;
+    instret_r <= 'b0;
+  end else if (~done_o) begin
+    halt_r    <= halt;
+    cycles_r  <= cycles_r + 'b1;
+    if (i_fsoc.i_fazyrv_core.wb_core_imem_stb & i_fsoc.i_fazyrv_core.i_fazyrv_core.if_imem_ack)
+      instret_r <= instret_r + 'b1;
+  end
+end
+
+// --- In-process access (soc/tb/fsoc_batch_lib.cpp) ---
+// Each slot registers its DPI scope, the exports below act on that slot.
+import "DPI-C" context function void fsoc_batch_register(input int slot);
+
+initial fsoc_batch_register(SLOT);
+
+export "DPI-C" function fsoc_slot_mem_read;
+export "DPI-C" function fsoc_slot_mem_write;
+export "DPI-C" function fsoc_slot_mem_clear;
+export "DPI-C" function fsoc_slot_gpo;
+export "DPI-C" function fsoc_slot_halted;
+export "DPI-C" function fsoc_slot_cycles;
+export "DPI-C" function fsoc_slot_instret;
+
+function int fsoc_slot_mem_read(input int idx);
+  return i_fsoc.i_mem.peek(idx);
+endfunction
+
+function void fsoc_slot_mem_write(input int idx, input int val);
+  i_fsoc.i_mem.poke(idx, val);
+endfunction
+
+function void fsoc_slot_mem_clear();
+  i_fsoc.i_mem.clear();
+endfunction
+
+function int fsoc_slot_gpo();
+  return {{(32-GPOCNT){1'b0}}, slot_gpo};
+endfunction
+
+function int fsoc_slot_halted();
+  return {31'b0, halt_r};
+endfunction
+
+function longint fsoc_slot_cycles();
+  return cycles_r;
+endfunction
+
+function longint fsoc_slot_instret();
+  return instret_r;
+endfunction
+
+endmodule
+
+
+module fsoc_batch #(
+  parameter NINST     = 8,
+  parameter MEMFILE   = "",
+  parameter MEMSIZE   = 8192,
+  parameter CHUNKSIZE = 1,
+  parameter RVC       = "NONE",
+  parameter RFTYPE    = "BRAM",
+  parameter CONF      = "MIN",
+  parameter MTVAL     = 'h0,
+  parameter BOOTADR   = 'h0,
+  parameter PREFETCH  = 0,
+  parameter HPM       = 0
+) (
+  input  logic             clk_i,
+  input  logic [NINST-1:0] rst_in,
+  output logic [NINST-1:0] done_o
+);
+
+export "DPI-C" function fsoc_top_memsize;
+
+function int fsoc_top_memsize();
+  return MEMSIZE;
+endfunction
+
+for (genvar i = 0; i < NINST; i++) begin : g_slot
+  fsoc_batch_slot #(
+    .SLOT       ( i         ),
+    .CHUNKSIZE  ( CHUNKSIZE ),
+    .RVC        ( RVC       ),
+    .CONF       ( CONF      ),
+    .RFTYPE     ( RFTYPE    ),
+    .MTVAL      ( MTVAL     ),
+    .BOOTADR    ( BOOTADR   ),
+    .MEMFILE    ( MEMFILE   ),
+    .MEMSIZE    ( MEMSIZE   ),
+    .PREFETCH   ( PREFETCH  ),
+    .HPM        ( HPM       )
+  ) i_slot (
+    .clk_i      ( clk_i     ),
+    .rst_in     ( rst_in[i] ),
+    .done_o     ( done_o[i] )
+  );
+end
+
+endmodule
@@ -0,0 +1,157 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  fsoc_batch_lib.cpp
+// Usage :  C API of the fsoc_batch model, built as shared library by the
+//          verilator_batch target and used by script/fsoc_batch.py. Slots
+//          are reset and loaded individually while the others keep running.
+// -----------------------------------------------------------------------------
+
+#include <stdint.h>
+#include <string.h>
+#include <vector>
+
+#include "verilated.h"
+#include "svdpi.h"
+#include "Vfsoc_batch.h"
+#include "Vfsoc_batch__Dpi.h"
+
+typedef struct {
+  VerilatedContext *ctx;
+  Vfsoc_batch *top;
+  std::vector<svScope> scopes;
+  std::vector<uint32_t> rst_cnt;
+  uint64_t rst_n;
+  uint64_t cycles;
+} fsoc_batch_t;
+
+static const uint64_t half_period = 500;  // 1MHz clock with 1us/1ns timescale
+
+// Filled by fsoc_batch_register() during construction of the model
+static fsoc_batch_t *registering = NULL;
+
+extern "C" void fsoc_batch_register(int slot) {
+  if (registering->scopes.size() <= (size_t)slot)
+    registering->scopes.resize(slot + 1);
+  registering->scopes[slot] = svGetScope();
+}
+
+static void fsoc_batch_slot(fsoc_batch_t *h, uint32_t slot) {
+  Verilated::threadContextp(h->ctx);
+  svSetScope(h->scopes[slot]);
+}
+
+static void fsoc_batch_cycle(fsoc_batch_t *h) {
+  for (int edge = 0; edge < 2; edge++) {
+    h->ctx->timeInc(half_period);
+    h->top->clk_i = !h->top->clk_i;
+    h->top->eval();
+  }
+  h->cycles++;
+
+  // release slots whose reset is over
+  for (size_t i = 0; i < h->rst_cnt.size(); i++) {
+    if (h->rst_cnt[i] && !--h->rst_cnt[i])
+      h->rst_n |= (uint64_t)1 << i;
+  }
+  h->top->rst_in = h->rst_n;
+}
+
+extern "C" {
+
+fsoc_batch_t *fsoc_batch_new(void) {
+  fsoc_batch_t *h = new fsoc_batch_t;
+  h->ctx = new VerilatedContext;
+  const char *argv[] = { "fsoc_batch" };
+  h->ctx->commandArgs(1, argv);
+  registering = h;
+  h->top = new Vfsoc_batch(h->ctx);
+  h->rst_n = 0;
+  h->cycles = 0;
+  h->top->clk_i = 1;
+  h->top->rst_in = h->rst_n;
+  h->top->eval();
+  registering = NULL;
+  h->rst_cnt.assign(h->scopes.size(), 0);
+  return h;
+}
+
+void fsoc_batch_delete(fsoc_batch_t *h) {
+  h->top->final();
+  delete h->top;
+  delete h->ctx;
+  delete h;
+}
+
+uint32_t fsoc_batch_slots(fsoc_batch_t *h) {
+  return h->scopes.size();
+}
+
+uint32_t fsoc_batch_memsize(fsoc_batch_t *h) {
+  Verilated::threadContextp(h->ctx);
+  svSetScope(svGetScopeFromName("TOP.fsoc_batch"));
+  return fsoc_top_memsize();
+}
+
+// Hold a slot in reset for the given cycles; the other slots keep running
+void fsoc_batch_reset(fsoc_batch_t *h, uint32_t slot, uint32_t cycles) {
+  h->rst_n &= ~((uint64_t)1 << slot);
+  h->rst_cnt[slot] = cycles ? cycles : 1;
+  h->top->rst_in = h->rst_n;
+}
+
+void fsoc_batch_write(fsoc_batch_t *h, uint32_t slot, uint32_t adr,
+                      const uint8_t *data, uint32_t len) {
+  fsoc_batch_slot(h, slot);
+  for (uint32_t i = 0; i < len; i += 4) {
+    uint32_t w = 0;
+    memcpy(&w, data + i, (len - i) < 4 ? (len - i) : 4);
+    fsoc_slot_mem_write((adr + i) >> 2, w);
+  }
+}
+
+void fsoc_batch_clear(fsoc_batch_t *h, uint32_t slot) {
+  fsoc_batch_slot(h, slot);
+  fsoc_slot_mem_clear();
+}
+
+void fsoc_batch_read(fsoc_batch_t *h, uint32_t slot, uint32_t adr,
+                     uint8_t *data, uint32_t len) {
+  fsoc_batch_slot(h, slot);
+  for (uint32_t i = 0; i < len; i += 4) {
+    uint32_t w = fsoc_slot_mem_read((adr + i) >> 2);
+    memcpy(data + i, &w, (len - i) < 4 ? (len - i) : 4);
+  }
+}
+
+// Run for at most the given cycles. Stops early when a slot in active
+// (bit mask) completes. Returns the mask of completed active slots.
+uint64_t fsoc_batch_run(fsoc_batch_t *h, uint64_t cycles, uint64_t active) {
+  uint64_t done = 0;
+  for (uint64_t i = 0; (i < cycles) && !done; i++) {
+    fsoc_batch_cycle(h);
+    done = (uint64_t)h->top->done_o & h->rst_n & active;
+  }
+  return done;
+}
+
+uint32_t fsoc_batch_gpo(fsoc_batch_t *h, uint32_t slot) {
+  fsoc_batch_slot(h, slot);
+  return fsoc_slot_gpo();
+}
+
+int fsoc_batch_halted(fsoc_batch_t *h, uint32_t slot) {
+  fsoc_batch_slot(h, slot);
+  return fsoc_slot_halted();
+}
+
+uint64_t fsoc_batch_cycles(fsoc_batch_t *h, uint32_t slot) {
+  fsoc_batch_slot(h, slot);
+  return fsoc_slot_cycles();
+}
+
+uint64_t fsoc_batch_instret(fsoc_batch_t *h, uint32_t slot) {
+  fsoc_batch_slot(h, slot);
+  return fsoc_slot_instret();
+}
+
+}
@@ -0,0 +1,156 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  fsoc_lib.cpp
+// Usage :  C API of the fsoc_sim model, built as shared library by the
+//          verilator_lib target and used in-process by script/fsoc_lib.py.
+//          Each handle owns its own VerilatedContext, such that several models
+//          (with individual plusargs) can live in one process.
+// -----------------------------------------------------------------------------
+
+#include <stdint.h>
+#include <string.h>
+#include <string>
+#include <vector>
+
+#include "verilated.h"
+#include "svdpi.h"
+#include "Vfsoc_sim.h"
+#include "Vfsoc_sim__Dpi.h"
+
+typedef struct {
+  VerilatedContext *ctx;
+  Vfsoc_sim *top;
+  uint64_t cycles;
+} fsoc_t;
+
+static const uint64_t half_period = 500;  // 1MHz clock with 1us/1ns timescale
+
+// DPI exports of fsoc_sim must be called in the scope of the handle's model
+static void fsoc_scope(fsoc_t *h) {
+  Verilated::threadContextp(h->ctx);
+  svSetScope(svGetScopeFromName("TOP.fsoc_sim"));
+}
+
+static void fsoc_cycle(fsoc_t *h) {
+  for (int edge = 0; edge < 2; edge++) {
+    h->ctx->timeInc(half_period);
+    h->top->clk_i = !h->top->clk_i;
+    h->top->eval();
+  }
+  h->cycles++;
+}
+
+extern "C" {
+
+// plusargs: space-separated, e.g., "+signature=DUT-fazyrv.signature"
+fsoc_t *fsoc_new(const char *plusargs) {
+  fsoc_t *h = new fsoc_t;
+  h->ctx = new VerilatedContext;
+
+  std::vector<std::string> args = { "fsoc_lib" };
+  std::string arg;
+  for (const char *c = plusargs ? plusargs : ""; ; c++) {
+    if (*c == ' ' || *c == '\0') {
+      if (!arg.empty())
+        args.push_back(arg);
+      arg.clear();
+      if (*c == '\0')
+        break;
+    } else {
+      arg += *c;
+    }
+  }
+  std::vector<const char *> argv;
+  for (auto &a : args)
+    argv.push_back(a.c_str());
+  h->ctx->commandArgs(argv.size(), argv.data());
+
+  h->top = new Vfsoc_sim(h->ctx);
+  h->top->clk_i = 1;
+  h->top->rst_in = 0;
+  h->top->restore_i = 0;
+  h->top->eval();
+  h->cycles = 0;
+  return h;
+}
+
+void fsoc_delete(fsoc_t *h) {
+  h->top->final();
+  delete h->top;
+  delete h->ctx;
+  delete h;
+}
+
+// Hold the core in reset for the given number of cycles and clear the
+// counters. The memory keeps its contents.
+void fsoc_reset(fsoc_t *h, uint32_t cycles) {
+  h->ctx->gotFinish(false);
+  h->top->rst_in = 0;
+  for (uint32_t i = 0; i < cycles; i++)
+    fsoc_cycle(h);
+  h->top->rst_in = 1;
+  h->cycles = 0;
+}
+
+uint32_t fsoc_memsize(fsoc_t *h) {
+  fsoc_scope(h);
+  return fsoc_sim_memsize();
+}
+
+// Copy len bytes from/to the memory at byte address adr (word aligned)
+void fsoc_write(fsoc_t *h, uint32_t adr, const uint8_t *data, uint32_t len) {
+  fsoc_scope(h);
+  for (uint32_t i = 0; i < len; i += 4) {
+    uint32_t w = 0;
+    memcpy(&w, data + i, (len - i) < 4 ? (len - i) : 4);
+    fsoc_sim_mem_write((adr + i) >> 2, w);
+  }
+}
+
+void fsoc_read(fsoc_t *h, uint32_t adr, uint8_t *data, uint32_t len) {
+  fsoc_scope(h);
+  for (uint32_t i = 0; i < len; i += 4) {
+    uint32_t w = fsoc_sim_mem_read((adr + i) >> 2);
+    memcpy(data + i, &w, (len - i) < 4 ? (len - i) : 4);
+  }
+}
+
+// Run for at most the given number of cycles. Stops early when one of the
+// GPOs in gpo_mask changes, the model calls $finish (e.g., the signature
+// halt), or the watchdog detects a hang. Returns the number of cycles run.
+uint64_t fsoc_run(fsoc_t *h, uint64_t cycles, uint32_t gpo_mask) {
+  fsoc_scope(h);
+  uint32_t gpo = fsoc_sim_gpo() & gpo_mask;
+  uint64_t i = 0;
+  while ((i < cycles) && !h->ctx->gotFinish() && !h->top->hang_o) {
+    fsoc_cycle(h);
+    i++;
+    if ((fsoc_sim_gpo() & gpo_mask) != gpo)
+      break;
+  }
+  return i;
+}
+
+uint32_t fsoc_gpo(fsoc_t *h) {
+  fsoc_scope(h);
+  return fsoc_sim_gpo();
+}
+
+uint64_t fsoc_cycles(fsoc_t *h) {
+  return h->cycles;
+}
+
+uint64_t fsoc_instret(fsoc_t *h) {
+  fsoc_scope(h);
+  return fsoc_sim_instret();
+}
+
+int fsoc_finished(fsoc_t *h) {
+  return h->ctx->gotFinish();
+}
+
+int fsoc_hang(fsoc_t *h) {
+  return h->top->hang_o;
+}
+
+}
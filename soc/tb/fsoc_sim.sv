@@ -14,21 +14,25 @@ module fsoc_sim #(
   parameter RFTYPE    = "BRAM",
   parameter CONF      = "MIN",
   parameter MTVAL     = 'h0,
-  parameter BOOTADR   = 'h1000
+  parameter BOOTADR   = 'h1000,
+  parameter PREFETCH  = 0,
+  parameter HPM       = 0
 ) (
   input  logic clk_i,
   input  logic rst_in,
-  output logic q
+  input  logic restore_i,
+  output logic q,
+  output logic hang_o
 );
 
 localparam MEMDLY1  = 0;
 localparam GPOCNT   = 3;
 
-logic [4095:0] firmware_file;
+string firmware_file;
 initial
   if ($value$plusargs("firmware=%s", firmware_file)) begin
 	  $display("Loading RAM from %0s", firmware_file);
-	  $readmemh(firmware_file, i_fsoc.i_mem.mem_r);
+	  i_fsoc.i_mem.load(firmware_file);
   end
 
 logic [GPOCNT-1:0] gpo;
@@ -86,6 +90,19 @@ always @(posedge clk_i) begin
 end
 
 
+// --- Memory wait states ---
+// Set by plusargs (soc/tb/wb_latency.sv), on the memory bus of the core
+logic mem_wait;
+
+wb_latency i_latency (
+  .clk_i    ( clk_i                  ),
+  .cyc_i    ( i_fsoc.wb_mem_cyc      ),
+  .instr_i  ( i_fsoc.wb_cpu_imem_stb ),
+  .adr_i    ( i_fsoc.wb_mem_adr      ),
+  .ack_i    ( i_fsoc.wb_mem_ack      ),
+  .wait_o   ( mem_wait               )
+);
+
 fsoc #( 
   .CHUNKSIZE  ( CHUNKSIZE ),
   .RVC        ( RVC       ),
@@ -96,6 +113,8 @@ fsoc #(
   .MEMFILE    ( MEMFILE   ),
   .MEMSIZE    ( MEMSIZE   ),
   .MEMDLY1    ( MEMDLY1   ),
+  .PREFETCH   ( PREFETCH  ),
+  .HPM        ( HPM       ),
   .GPOCNT     ( GPOCNT    )
 ) i_fsoc (
   .clk_i      ( clk_i   ),
@@ -103,7 +122,8 @@ fsoc #(
   //.tirq_i     ( 1'b0    ),
   //.trap_o     ( ),
   .gpi_i      ( 1'b0    ),
-  .gpo_o      ( gpo     )
+  .gpo_o      ( gpo     ),
+  .mem_wait_i ( mem_wait )
 );
 
 
@@ -122,10 +142,12 @@ end
 /* verilator lint_off WIDTHEXPAND */
 logic [128:0] dbg_ascii_instr;
 logic [31:0] instr;
+logic [31:0] instr_pc;
 logic is_rvc;
 logic instr_ack;
 
 assign instr = i_fsoc.i_fazyrv_core.i_fazyrv_core.if_imem_dat;
+assign instr_pc = i_fsoc.i_fazyrv_core.i_fazyrv_core.pc;
 assign instr_ack = i_fsoc.i_fazyrv_core.i_fazyrv_core.if_imem_ack;
 assign is_rvc = i_fsoc.i_fazyrv_core.i_fazyrv_core.id_rvc_is_c;
 
@@ -298,6 +320,9 @@ always_comb begin
 end
 /* verilator lint_on WIDTHEXPAND */
 
+// --- Instruction timing ---
+// +timing=<file> writes a line per instruction of the measured region (gpo[0])
+// when it is fetched: ## <mnemonic> <cycle>, <instr> <pc>
 logic [4095:0] timing_file;
 integer f_timing = 0;
 logic q_r;
@@ -308,13 +333,29 @@ initial begin
   end
 end
 
+// File handles are not part of a checkpoint; the restored ones belong to the
+// saving run, so drop them and reopen the files of this run
+always @(posedge restore_i) begin
+  f = 0;
+  f_timing = 0;
+  /* verilator lint_off WIDTH */
+  if ($value$plusargs("embench=%s", embench_file)) begin
+    $display("Writing embench_file timing to %0s", embench_file);
+    f = $fopen(embench_file, "w");
+  end
+  if ($value$plusargs("timing=%s", timing_file)) begin
+    f_timing = $fopen(timing_file, "a");
+  end
+  /* verilator lint_on WIDTH */
+end
+
 always_ff @(posedge clk_i) begin
   q_r <= q;
 end
 
 (* keep *) logic dly_stb;
 always_ff @(posedge clk_i) begin
-  dly_stb <= i_fsoc.i_fazyrv_core.wb_imem_stb_o;
+  dly_stb <= i_fsoc.i_fazyrv_core.wb_core_imem_stb;
 end
 
 (* keep *) logic fwrite_stb;
@@ -323,15 +364,177 @@ generate
 if (MEMDLY1 == 1) begin
   assign fwrite_stb = dly_stb;
 end else begin
-  assign fwrite_stb = i_fsoc.i_fazyrv_core.wb_imem_stb_o & instr_ack;
+  assign fwrite_stb = i_fsoc.i_fazyrv_core.wb_core_imem_stb & instr_ack;
 end
 
 endgenerate
 
+// --- Sampled simulation (script/simpoint.py) ---
+// Count fetched instructions; report the cycles between the instructions
+// +mark_instret=<n> and +max_instret=<m> and stop.
+logic [63:0] instret_r;
+logic [63:0] mark_instret = '0;
+logic [63:0] max_instret  = '0;
+logic [63:0] mark_cycle   = '0;
+
+initial begin
+  if ($value$plusargs("max_instret=%d", max_instret)) begin
+    $display("Sampling until instruction %0d", max_instret);
+  end
+  if ($value$plusargs("mark_instret=%d", mark_instret)) begin
+    $display("Sampling from instruction %0d", mark_instret);
+  end
+end
+
+always @(posedge clk_i) begin
+  if (~rst_in) begin
+    instret_r <= 'b0;
+  end else if (fwrite_stb) begin
+    instret_r <= instret_r + 'b1;
+    if (instret_r == mark_instret) begin
+      mark_cycle <= mcycle_r;
+    end
+    if ((max_instret != 0) && (instret_r == max_instret)) begin
+      $display("Sample cycles: %0d", mcycle_r - mark_cycle);
+      $finish;
+    end
+  end
+end
+
+// --- Watchdog ---
+// Flags a hang when, before the success/fail GPO is set, the core jumps to
+// itself, retires no instruction, or a Wishbone request is not acknowledged
+// for +watchdog=<cycles> (default 100000, 0 disables). The testbench exits
+// with a distinct code. After the end marker, the same conditions just end
+// the simulation.
+localparam SELF_LOOP_FETCHES = 16;
+
+logic [63:0] watchdog = 64'd100000;
+logic [63:0] idle_cnt_r;
+logic [63:0] imem_stall_r;
+logic [63:0] dmem_stall_r;
+logic [31:0] last_pc_r;
+logic [7:0]  self_loop_r;
+logic        hang_r;
+
+logic [31:0] fetch_pc;
+logic        imem_stb;
+logic        imem_ack;
+logic        dmem_stb;
+logic        dmem_ack;
+logic        end_marker;
+
+assign fetch_pc   = i_fsoc.i_fazyrv_core.wb_core_imem_adr;
+assign imem_stb   = i_fsoc.i_fazyrv_core.wb_core_imem_stb;
+assign imem_ack   = i_fsoc.i_fazyrv_core.wb_core_imem_ack;
+assign dmem_stb   = i_fsoc.i_fazyrv_core.wb_dmem_stb_o;
+assign dmem_ack   = i_fsoc.i_fazyrv_core.wb_dmem_ack_i;
+assign end_marker = gpo[1] | gpo[2];
+assign hang_o     = hang_r;
+
+initial begin
+  if ($value$plusargs("watchdog=%d", watchdog)) begin
+    $display("Watchdog set: %0d cycles", watchdog);
+  end
+end
+
+task automatic watchdog_trip(input string reason);
+  if (end_marker) begin
+    $display("Idle after end marker (%0s), exiting", reason);
+    $finish;
+  end else if (~hang_r) begin
+    $display("HANG: %0s at pc 0x%08x after %0d cycles", reason, fetch_pc, mcycle_r);
+    hang_r <= 1'b1;
+  end
+endtask
+
+always @(posedge clk_i) begin
+  if (~rst_in) begin
+    idle_cnt_r    <= 'b0;
+    imem_stall_r  <= 'b0;
+    dmem_stall_r  <= 'b0;
+    self_loop_r   <= 'b0;
+    last_pc_r     <= 'b0;
+    hang_r        <= 1'b0;
+  end else if (watchdog != 0) begin
+    idle_cnt_r   <= fwrite_stb ? 'b0 : idle_cnt_r + 'b1;
+    imem_stall_r <= (imem_stb & ~imem_ack) ? imem_stall_r + 'b1 : 'b0;
+    dmem_stall_r <= (dmem_stb & ~dmem_ack) ? dmem_stall_r + 'b1 : 'b0;
+
+    if (fwrite_stb) begin
+      last_pc_r   <= fetch_pc;
+      self_loop_r <= (fetch_pc == last_pc_r) ? self_loop_r + 'b1 : 'b0;
+    end
+
+    if (self_loop_r >= SELF_LOOP_FETCHES)
+      watchdog_trip("pc self-loop");
+    else if (imem_stall_r >= watchdog)
+      watchdog_trip("instruction bus stall");
+    else if (dmem_stall_r >= watchdog)
+      watchdog_trip("data bus stall");
+    else if (idle_cnt_r >= watchdog)
+      watchdog_trip("no instruction retired");
+  end
+end
+
+// --- Memory dump ---
+// +memdump=<file> writes the memory as sparse hex image (see makehex.py) at
+// the end of the simulation, e.g., for the counters stored by the firmware
+// (script/hpm_decode.py).
+string memdump_file;
+
+final begin
+  if ($value$plusargs("memdump=%s", memdump_file)) begin
+    integer fd;
+    integer word;
+    logic   gap;
+
+    fd  = $fopen(memdump_file, "w");
+    gap = 1'b1;
+    for (integer i = 0; i < MEMSIZE/4; i++) begin
+      word = i_fsoc.i_mem.peek(i);
+      if (word != 0) begin
+        if (gap)
+          $fwrite(fd, "@%08X\n", i);
+        $fwrite(fd, "%08X\n", word);
+      end
+      gap = (word == 0);
+    end
+    $fclose(fd);
+  end
+end
+
+// --- In-process access (soc/tb/fsoc_lib.cpp) ---
+export "DPI-C" function fsoc_sim_memsize;
+export "DPI-C" function fsoc_sim_mem_read;
+export "DPI-C" function fsoc_sim_mem_write;
+export "DPI-C" function fsoc_sim_gpo;
+export "DPI-C" function fsoc_sim_instret;
+
+function int fsoc_sim_memsize();
+  return MEMSIZE;
+endfunction
+
+function int fsoc_sim_mem_read(input int idx);
+  return i_fsoc.i_mem.peek(idx);
+endfunction
+
+function void fsoc_sim_mem_write(input int idx, input int val);
+  i_fsoc.i_mem.poke(idx, val);
+endfunction
+
+function int fsoc_sim_gpo();
+  return {{(32-GPOCNT){1'b0}}, gpo};
+endfunction
+
+function longint fsoc_sim_instret();
+  return instret_r;
+endfunction
+
 always @(posedge clk_i) begin
   if ((f_timing != 0) && (q | q_r)) begin
     if (fwrite_stb) begin
-      $fwrite(f_timing, "## %-s %d, %x\n", dbg_ascii_instr, mcycle_r, instr);
+      $fwrite(f_timing, "## %-s %d, %x %x\n", dbg_ascii_instr, mcycle_r, instr, instr_pc);
     end
   end
 
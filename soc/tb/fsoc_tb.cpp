@@ -3,13 +3,27 @@
 
 #include <fcntl.h>
 #include <stdint.h>
+#include <stdlib.h>
 #include <signal.h>
 
 #include "verilated_fst_c.h"
 #include "Vfsoc_sim.h"
 
+#ifdef FSOC_SAVABLE
+#include <stdio.h>
+#include <string>
+#include "verilated_save.h"
+
+// soc/tb/sparse_mem.cpp, empty without SPARSE_MEM
+void sparse_mem_save(VerilatedSerialize &os);
+void sparse_mem_restore(VerilatedDeserialize &os);
+#endif
+
 using namespace std;
 
+// Exit code when the watchdog detects a hang
+#define EXIT_HANG 3
+
 static bool done;
 
 vluint64_t main_time = 0;     // Current simulation time
@@ -38,9 +52,42 @@ void do_gpio(gpio_context_t *context, bool gpio) {
   }
 }
 
+#ifdef FSOC_SAVABLE
+// Checkpoints hold the testbench state followed by the full model state,
+// including the memory contents and the pages of the sparse memory. Written to a temporary file first, such
+// that a killed run never leaves a truncated checkpoint behind.
+void save_model(const char *filename, Vfsoc_sim *top, vluint64_t cycles,
+                gpio_context_t *context) {
+  std::string tmp = std::string(filename) + ".tmp";
+  VerilatedSave os;
+  os.open(tmp.c_str());
+  os << main_time;
+  os << cycles;
+  os << context->last_value;
+  os << *top;
+  sparse_mem_save(os);
+  os.close();
+  rename(tmp.c_str(), filename);
+  printf("%lu checkpoint saved to %s after %lu cycles\n", main_time, filename, cycles);
+}
+
+void restore_model(const char *filename, Vfsoc_sim *top, vluint64_t *cycles,
+                   gpio_context_t *context) {
+  VerilatedRestore os;
+  os.open(filename);
+  os >> main_time;
+  os >> *cycles;
+  os >> context->last_value;
+  os >> *top;
+  sparse_mem_restore(os);
+  os.close();
+  printf("%lu checkpoint restored from %s at %lu cycles\n", main_time, filename, *cycles);
+}
+#endif
+
 int main(int argc, char **argv, char **env)
 {
-  gpio_context_t gpio_context;
+  gpio_context_t gpio_context = { false };
   Verilated::commandArgs(argc, argv);
 
   Vfsoc_sim* top = new Vfsoc_sim;
@@ -73,34 +120,100 @@ int main(int argc, char **argv, char **env)
   if (arg_vcd_start[0])
     vcd_start = 1000 * 1000 * 1000 * (vluint64_t)(atoi(arg_vcd_start+11));
 
+  vluint64_t max_cycles = 0;
+  const char *arg_max_cycles = Verilated::commandArgsPlusMatch("max_cycles=");
+  if (arg_max_cycles[0]) {
+    max_cycles = strtoull(arg_max_cycles+12, NULL, 10);
+    printf("Max cycles set: %lu\n", max_cycles);
+  }
+
+#ifdef FSOC_SAVABLE
+  // +save_at_gpio=<file>   save when q turns on, i.e., the measured region starts
+  // +save_every=<cycles>   periodically save to +checkpoint=<file> (default checkpoint.vlt)
+  // +restore=<file>        resume from a checkpoint of the same model
+  const char *save_at_gpio = Verilated::commandArgsPlusMatch("save_at_gpio=");
+  if (save_at_gpio[0])
+    save_at_gpio += 14;
+
+  vluint64_t save_every = 0;
+  const char *arg_save_every = Verilated::commandArgsPlusMatch("save_every=");
+  if (arg_save_every[0])
+    save_every = strtoull(arg_save_every+12, NULL, 10);
+
+  const char *checkpoint = Verilated::commandArgsPlusMatch("checkpoint=");
+  checkpoint = checkpoint[0] ? checkpoint+12 : "checkpoint.vlt";
+
+  const char *arg_restore = Verilated::commandArgsPlusMatch("restore=");
+#endif
+
   const vluint64_t half_period = 500;  // Half period for 1MHz clock (500ns)
+  const vluint64_t rst_release = 2000; // Release reset after 2000ns
 
-  bool dump = false;
+  // Only evaluate the model on clock edges. Per-cycle checks are done
+  // after the rising edge, when all registered outputs are updated.
+  vluint64_t cycles = 0;
+  bool dump = tfp && (vcd_start == 0);
   top->clk_i = 1;
-  bool q = top->q;
+  top->rst_in = 0;
+  top->restore_i = 0;
+#ifdef FSOC_SAVABLE
+  if (arg_restore[0]) {
+    restore_model(arg_restore+9, top, &cycles, &gpio_context);
+    // let the model reopen its output files
+    top->restore_i = 1;
+    top->eval();
+    top->restore_i = 0;
+  }
+#endif
+  top->eval();
+  if (dump)
+    tfp->dump(main_time);
+
   while (!(done || Verilated::gotFinish())) {
-    if (tfp && !dump && (main_time > vcd_start)) {
-      dump = true;
-    }
-    top->rst_in = main_time > 2000;
+    main_time += half_period;
+    top->clk_i = !top->clk_i;
+    if (!top->rst_in && (main_time > rst_release))
+      top->rst_in = 1;
     top->eval();
     if (dump)
       tfp->dump(main_time);
+
+    if (!top->clk_i)
+      continue;
+
+    cycles++;
+#ifdef FSOC_SAVABLE
+    if (save_at_gpio[0] && top->q && !gpio_context.last_value) {
+      save_model(save_at_gpio, top, cycles, &gpio_context);
+      save_at_gpio = "";
+    }
+    if (save_every && (cycles % save_every == 0))
+      save_model(checkpoint, top, cycles, &gpio_context);
+#endif
     do_gpio(&gpio_context, top->q);
 
+    if (tfp && !dump && (main_time > vcd_start))
+      dump = true;
+
     if (timeout && (main_time >= timeout)) {
       printf("Timeout: Exiting at time %lu\n", main_time);
       printf("Timeout: %lu \t MainTime: %lu\n", timeout, main_time);
       done = true;
     }
 
-    if (main_time % half_period == 0) {
-      top->clk_i = !top->clk_i;
+    if (max_cycles && (cycles >= max_cycles)) {
+      printf("Max cycles: Exiting after %lu cycles at time %lu\n", cycles, main_time);
+      done = true;
     }
-    main_time+=half_period/2;
+
+    // the watchdog in fsoc_sim reports the reason
+    if (top->hang_o)
+      done = true;
   }
+  printf("Simulated cycles: %lu\n", cycles);
+  top->final();
   close(tf);
   if (tfp)
     tfp->close();
-  exit(0);
+  exit(top->hang_o ? EXIT_HANG : 0);
 }
\ No newline at end of file
@@ -0,0 +1,133 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  sparse_mem.cpp
+// Usage :  Paged backend of soc/rtl/wb_ram.sv when built with SPARSE_MEM.
+//          Each wb_ram instance (DPI scope) owns its pages, which are
+//          allocated on the first non-zero write. Unallocated pages read as
+//          zero, such that a large MEMSIZE costs neither startup time nor
+//          memory. Loads $readmemh images, dense or sparse (@<word address>).
+//          With FSOC_SAVABLE, fsoc_tb.cpp appends the pages to checkpoints.
+// -----------------------------------------------------------------------------
+
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <map>
+#include <unordered_map>
+
+#include "svdpi.h"
+
+#ifdef FSOC_SAVABLE
+#include <string>
+#include "verilated_save.h"
+#endif
+
+static const uint32_t PAGE_BITS  = 10;  // 1024 words = 4 KiB pages
+static const uint32_t PAGE_WORDS = 1 << PAGE_BITS;
+
+typedef std::unordered_map<uint32_t, uint32_t *> sparse_mem_t;
+
+static std::map<svScope, sparse_mem_t> mems;
+
+static uint32_t *sparse_mem_page(uint32_t adr, bool alloc) {
+  sparse_mem_t &mem = mems[svGetScope()];
+  auto it = mem.find(adr >> PAGE_BITS);
+  if (it != mem.end())
+    return it->second;
+  if (!alloc)
+    return NULL;
+  uint32_t *page = (uint32_t *)calloc(PAGE_WORDS, sizeof(uint32_t));
+  mem[adr >> PAGE_BITS] = page;
+  return page;
+}
+
+static void sparse_mem_store(uint32_t adr, uint32_t dat, uint32_t mask) {
+  uint32_t *page = sparse_mem_page(adr, (dat & mask) != 0);
+  if (page) {
+    uint32_t *w = &page[adr & (PAGE_WORDS - 1)];
+    *w = (*w & ~mask) | (dat & mask);
+  }
+}
+
+extern "C" {
+
+int sparse_mem_read(int adr) {
+  uint32_t *page = sparse_mem_page(adr, false);
+  return page ? page[adr & (PAGE_WORDS - 1)] : 0;
+}
+
+void sparse_mem_write(int adr, int dat, int be) {
+  uint32_t mask = 0;
+  for (int i = 0; i < 4; i++)
+    if (be & (1 << i))
+      mask |= 0xffu << (8 * i);
+  sparse_mem_store(adr, dat, mask);
+}
+
+void sparse_mem_load(const char *file) {
+  FILE *f = fopen(file, "r");
+  if (!f) {
+    fprintf(stderr, "sparse_mem: cannot open %s\n", file);
+    return;
+  }
+  char tok[64];
+  uint32_t adr = 0;
+  while (fscanf(f, "%63s", tok) == 1) {
+    if (tok[0] == '@')
+      adr = strtoul(tok + 1, NULL, 16);
+    else
+      sparse_mem_store(adr++, strtoul(tok, NULL, 16), 0xffffffffu);
+  }
+  fclose(f);
+}
+
+void sparse_mem_free(void) {
+  auto it = mems.find(svGetScope());
+  if (it == mems.end())
+    return;
+  for (auto &page : it->second)
+    free(page.second);
+  mems.erase(it);
+}
+
+}
+
+#ifdef FSOC_SAVABLE
+// Pages of all instances, keyed by the scope name, which is stable across
+// runs of the same model (the svScope pointers are not).
+void sparse_mem_save(VerilatedSerialize &os) {
+  os << (uint32_t)mems.size();
+  for (auto &mem : mems) {
+    os << std::string(svGetNameFromScope(mem.first));
+    os << (uint32_t)mem.second.size();
+    for (auto &page : mem.second) {
+      os << page.first;
+      os.write(page.second, PAGE_WORDS * sizeof(uint32_t));
+    }
+  }
+}
+
+void sparse_mem_restore(VerilatedDeserialize &os) {
+  for (auto &mem : mems)
+    for (auto &page : mem.second)
+      free(page.second);
+  mems.clear();
+
+  uint32_t nr_mems;
+  os >> nr_mems;
+  for (uint32_t i = 0; i < nr_mems; i++) {
+    std::string name;
+    uint32_t nr_pages;
+    os >> name;
+    os >> nr_pages;
+    sparse_mem_t &mem = mems[svGetScopeFromName(name.c_str())];
+    for (uint32_t j = 0; j < nr_pages; j++) {
+      uint32_t idx;
+      os >> idx;
+      uint32_t *page = (uint32_t *)malloc(PAGE_WORDS * sizeof(uint32_t));
+      os.read(page, PAGE_WORDS * sizeof(uint32_t));
+      mem[idx] = page;
+    }
+  }
+}
+#endif
@@ -0,0 +1,85 @@
+// Copyright (c) 2023 - 2026 Meinhard Kissich
+// -----------------------------------------------------------------------------
+// File  :  wb_latency.sv
+// Usage :  Simulation only. Wait states of the Wishbone requests to the fsoc
+//          memory (mem_wait_i of fsoc) to model slow memories, e.g., SPI
+//          flash or SRAM. The wait states are set at runtime:
+//            +imem_latency=<n>  wait states of instruction fetches
+//            +imem_burst=<n>    ... of fetches from the next sequential word
+//            +dmem_latency=<n>  wait states of data accesses
+//            +dmem_burst=<n>    ... of accesses to the next sequential word
+//            +mem_jitter=<n>    random 0..n additional wait states
+//            +mem_seed=<n>      seed of the jitter
+//          The burst latencies default to the non-sequential ones. All
+//          default to 0, which leaves the timing of the memory unchanged.
+// Limit. :  Not for use with MEMDLY1, which assumes a fixed fetch latency.
+// -----------------------------------------------------------------------------
+
+`default_nettype none
+
+module wb_latency (
+  input  logic        clk_i,
+  input  logic        cyc_i,
+  input  logic        instr_i,
+  input  logic [31:0] adr_i,
+  input  logic        ack_i,
+  output logic        wait_o
+);
+
+integer imem_latency  = 0;
+integer imem_burst    = -1;
+integer dmem_latency  = 0;
+integer dmem_burst    = -1;
+integer mem_jitter    = 0;
+integer mem_seed      = 0;
+
+initial begin
+  void'($value$plusargs("imem_latency=%d", imem_latency));
+  void'($value$plusargs("imem_burst=%d", imem_burst));
+  void'($value$plusargs("dmem_latency=%d", dmem_latency));
+  void'($value$plusargs("dmem_burst=%d", dmem_burst));
+  void'($value$plusargs("mem_jitter=%d", mem_jitter));
+  if (imem_burst < 0)
+    imem_burst = imem_latency;
+  if (dmem_burst < 0)
+    dmem_burst = dmem_latency;
+  if ($value$plusargs("mem_seed=%d", mem_seed))
+    void'($urandom(mem_seed));
+  if ((imem_latency | imem_burst | dmem_latency | dmem_burst | mem_jitter) != 0)
+    $display("Memory wait states: imem %0d/%0d, dmem %0d/%0d (single/burst), jitter %0d",
+             imem_latency, imem_burst, dmem_latency, dmem_burst, mem_jitter);
+end
+
+logic [31:0]  next_iadr_r = '1;
+logic [31:0]  next_dadr_r = '1;
+integer       jitter_r    = 0;
+integer       wait_r      = 0;
+integer       latency;
+
+always_comb begin
+  if (instr_i)
+    latency = (adr_i == next_iadr_r) ? imem_burst : imem_latency;
+  else
+    latency = (adr_i == next_dadr_r) ? dmem_burst : dmem_latency;
+  latency = latency + jitter_r;
+end
+
+assign wait_o = (wait_r < latency);
+
+always @(posedge clk_i) begin
+  if (ack_i) begin
+    wait_r <= 0;
+    if (instr_i)
+      next_iadr_r <= adr_i + 'd4;
+    else
+      next_dadr_r <= adr_i + 'd4;
+    if (mem_jitter > 0)
+      jitter_r <= $urandom % (mem_jitter + 1);
+  end else if (cyc_i & wait_o) begin
+    wait_r <= wait_r + 1;
+  end else if (~cyc_i) begin
+    wait_r <= 0;
+  end
+end
+
+endmodule